@@ -0,0 +1,6 @@
+"""Offline benchmarks for the multi-agent RAG system.
+
+Benchmarks run against deterministic local stand-ins for the LLM, embeddings
+and vector store (see `benchmarks.stubs`), so they cost no API credits.
+Run them from the repository root, e.g. `python -m benchmarks.async_load`.
+"""
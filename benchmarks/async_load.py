@@ -0,0 +1,77 @@
+"""Load benchmark for `/qa/conversation` with stubbed LLM and vector store.
+
+Fires `--concurrency` questions at once and compares the wall time with the
+single-request latency. On the async path the requests overlap, so the wall
+time stays close to one request; a blocking path would serialize them and
+take roughly `concurrency` times as long. `/health` is probed while the batch
+is in flight to show the event loop stays responsive.
+
+Usage:
+    python -m benchmarks.async_load --concurrency 20 --llm-latency 0.1
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from .stubs import install_stubs
+
+
+async def _ask(client: httpx.AsyncClient, question: str) -> float:
+    start = time.perf_counter()
+    response = await client.post("/qa/conversation", json={"question": question})
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def _probe_health(client: httpx.AsyncClient, stop: asyncio.Event) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+    return latencies
+
+
+async def run(concurrency: int) -> None:
+    from src.app.api import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        single = await _ask(client, "What is HNSW?")
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe_health(client, stop))
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(_ask(client, f"Question {i}?") for i in range(concurrency)))
+        wall = time.perf_counter() - start
+        stop.set()
+        health = await probe
+
+    print(f"single request latency : {single * 1000:8.1f} ms")
+    print(f"concurrent requests    : {concurrency}")
+    print(f"concurrent wall time   : {wall * 1000:8.1f} ms")
+    print(f"serialized estimate    : {single * concurrency * 1000:8.1f} ms")
+    print(f"overlap factor         : {single * concurrency / wall:8.1f}x")
+    print(f"mean request latency   : {sum(latencies) / len(latencies) * 1000:8.1f} ms")
+    if health:
+        print(f"/health max latency    : {max(health) * 1000:8.1f} ms over {len(health)} probes")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.1)
+    parser.add_argument("--embed-latency", type=float, default=0.02)
+    parser.add_argument("--search-latency", type=float, default=0.03)
+    args = parser.parse_args()
+
+    install_stubs(args.llm_latency, args.embed_latency, args.search_latency)
+    asyncio.run(run(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
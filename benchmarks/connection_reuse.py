@@ -0,0 +1,116 @@
+"""Connections opened and per-call latency with shared vs per-call HTTP clients.
+
+Runs the same embedding calls against `StubEmbeddingServer` twice: once
+with a fresh `httpx` client per call (a new pool, so a new connection and
+handshake every time), and once through the shared pooled clients from
+`core/clients.py` that every agent and vector operation now uses. The
+server delays each new connection by `--connect-latency` to stand in for
+the TCP + TLS handshake. A fresh client also rebuilds its SSL context
+(loading the CA bundle, tens of milliseconds of CPU under the GIL), which
+shows up in the per-call variant as well.
+
+Usage:
+    python -m benchmarks.connection_reuse --calls 200 --concurrency 8 --connect-latency 0.03
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+import httpx
+import numpy as np
+from langchain_openai import OpenAIEmbeddings
+
+from .embedding_server import StubEmbeddingServer
+
+
+def _embeddings(server: StubEmbeddingServer, **clients) -> OpenAIEmbeddings:
+    return OpenAIEmbeddings(
+        model="stub", api_key="stub", base_url=server.base_url, check_embedding_ctx_length=False, **clients
+    )
+
+
+def _sync_run(calls: int, concurrency: int, call: Callable[[int], None]) -> List[float]:
+    def timed(i: int) -> float:
+        start = time.perf_counter()
+        call(i)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(timed, range(calls)))
+
+
+async def _async_run(calls: int, concurrency: int, call) -> List[float]:
+    slots = asyncio.Semaphore(concurrency)
+
+    async def timed(i: int) -> float:
+        async with slots:
+            start = time.perf_counter()
+            await call(i)
+            return time.perf_counter() - start
+
+    return list(await asyncio.gather(*(timed(i) for i in range(calls))))
+
+
+def _report(label: str, server: StubEmbeddingServer, latencies: List[float], wall: float) -> None:
+    ms = np.asarray(latencies) * 1000
+    print(f"{label:<24} {server.counters['connections']:>11} {ms.mean():>9.1f} "
+          f"{np.percentile(ms, 95):>9.1f} {wall * 1000:>9.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--connect-latency", type=float, default=0.03)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    from src.app.core.clients import close_http_clients, get_async_http_client, get_http_client
+
+    print(f"{'variant':<24} {'connections':>11} {'mean ms':>9} {'p95 ms':>9} {'wall ms':>9}")
+
+    def server() -> StubEmbeddingServer:
+        return StubEmbeddingServer(latency=args.latency, connect_latency=args.connect_latency)
+
+    with server() as stub:
+        def per_call(i: int) -> None:
+            with httpx.Client() as client:
+                _embeddings(stub, http_client=client).embed_query(f"query {i}")
+
+        start = time.perf_counter()
+        latencies = _sync_run(args.calls, args.concurrency, per_call)
+        _report("sync, client per call", stub, latencies, time.perf_counter() - start)
+
+    with server() as stub:
+        shared = _embeddings(stub, http_client=get_http_client())
+        start = time.perf_counter()
+        latencies = _sync_run(args.calls, args.concurrency, lambda i: shared.embed_query(f"query {i}"))
+        _report("sync, shared pool", stub, latencies, time.perf_counter() - start)
+
+    async def run_async() -> None:
+        with server() as stub:
+            async def per_call(i: int) -> None:
+                async with httpx.AsyncClient() as client:
+                    await _embeddings(stub, http_async_client=client).aembed_query(f"query {i}")
+
+            start = time.perf_counter()
+            latencies = await _async_run(args.calls, args.concurrency, per_call)
+            _report("async, client per call", stub, latencies, time.perf_counter() - start)
+
+        with server() as stub:
+            shared = _embeddings(stub, http_async_client=get_async_http_client())
+            start = time.perf_counter()
+            latencies = await _async_run(args.calls, args.concurrency, lambda i: shared.aembed_query(f"query {i}"))
+            _report("async, shared pool", stub, latencies, time.perf_counter() - start)
+        await close_http_clients()
+
+    asyncio.run(run_async())
+
+
+if __name__ == "__main__":
+    main()
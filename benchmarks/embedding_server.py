@@ -0,0 +1,110 @@
+"""Local stand-in for the OpenAI embeddings HTTP API.
+
+Serves `POST /v1/embeddings` with deterministic vectors after a configurable
+latency, optionally answering a fraction of requests with 429 to exercise
+retry and backoff. New connections can be delayed by `connect_latency` to
+mimic handshake cost. Counts requests and accepted TCP connections so
+benchmarks can report rate-limit hits and connection reuse.
+"""
+
+import base64
+import hashlib
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StubEmbeddingServer"
+
+    def log_message(self, format, *args):  # silence per-request logging
+        pass
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out as separate writes; without this, Nagle's
+        # algorithm and delayed ACKs add ~40 ms to every response.
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.count("connections")
+        # Stands in for the TCP + TLS handshake a real API connection costs.
+        time.sleep(self.server.connect_latency)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))))
+        self.server.count("requests")
+        time.sleep(self.server.latency)
+
+        if random.random() < self.server.rate_limit_ratio:
+            self.server.count("rate_limited")
+            self._send(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                       {"retry-after": "0.05"})
+            return
+
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        data = []
+        for i, text in enumerate(inputs):
+            vector = self.server.vector(text if isinstance(text, str) else json.dumps(text))
+            if body.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.tobytes()).decode()
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        self.server.count("embedded", len(inputs))
+        self._send(200, {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "stub"),
+            "usage": {"prompt_tokens": len(inputs), "total_tokens": len(inputs)},
+        })
+
+    def _send(self, code: int, payload: dict, headers: dict | None = None):
+        raw = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(raw)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+class StubEmbeddingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+            self, dim: int = 256, latency: float = 0.05, rate_limit_ratio: float = 0.0, connect_latency: float = 0.0
+    ):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.dim = dim
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.counters = {"connections": 0, "requests": 0, "rate_limited": 0, "embedded": 0}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def vector(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,315 @@
+"""Offline end-to-end benchmark of `/index-pdf` and `/qa/conversation`.
+
+The chat model, embeddings and vector store are the deterministic stubs
+from `stubs.py`, with configurable latency and decode speed, so a run costs
+nothing and is repeatable. The harness:
+- uploads `--documents` synthetic PDFs and polls `/jobs/{id}` until each is
+  indexed through the real ingestion path,
+- runs `--sessions` conversations of `--turns` questions each, at most
+  `--concurrency` at a time,
+- reports p50/p95/p99 latency, throughput, the per-node, LLM and vector
+  breakdown returned with `include_timings`, and peak RSS,
+- writes the results to `--output` as JSON; `--compare` prints the change
+  against an earlier result file, e.g. one saved on the previous commit.
+
+Usage:
+    python -m benchmarks.end_to_end --sessions 32 --turns 4 --output bench.json
+    python -m benchmarks.end_to_end --sessions 32 --turns 4 --compare bench.json
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from .pdf_fixture import make_pdf
+
+QUESTIONS = [
+    "What is HNSW?",
+    "How does product quantization save memory?",
+    "Which lists does IVF probe?",
+    "How is cosine similarity computed?",
+    "What do vector databases add on top of ANN indexes?",
+    "How does LSH bucket similar vectors?",
+]
+
+# (label, path into the results) of the headline numbers `--compare` reports.
+COMPARED = [
+    ("qa p50 ms", ("qa", "latency", "p50_ms")),
+    ("qa p95 ms", ("qa", "latency", "p95_ms")),
+    ("qa p99 ms", ("qa", "latency", "p99_ms")),
+    ("qa requests/s", ("qa", "requests_per_second")),
+    ("index p50 ms", ("ingestion", "latency", "p50_ms")),
+    ("index p95 ms", ("ingestion", "latency", "p95_ms")),
+    ("chunks/s", ("ingestion", "chunks_per_second")),
+    ("peak RSS MB", ("peak_rss_mb",)),
+]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux.
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _distribution(seconds: List[float]) -> dict:
+    """Mean and percentiles of `seconds`, in milliseconds."""
+    if not seconds:
+        return {"count": 0}
+    ms = np.asarray(seconds) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": len(seconds),
+        "mean_ms": round(float(ms.mean()), 2),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(ms.max()), 2),
+    }
+
+
+async def _index(client: httpx.AsyncClient, pdf: Path) -> dict:
+    """Upload one PDF and wait for its ingestion job to finish."""
+    start = time.perf_counter()
+    while True:
+        response = await client.post("/index-pdf", files={"file": (pdf.name, pdf.read_bytes(), "application/pdf")})
+        # The job queue is bounded; back off and retry like a client would.
+        if response.status_code != 429:
+            break
+        await asyncio.sleep(0.1)
+    response.raise_for_status()
+
+    job_id = response.json()["job_id"]
+    while True:
+        job = (await client.get(f"/jobs/{job_id}")).json()
+        if job["status"] in ("succeeded", "failed"):
+            break
+        await asyncio.sleep(0.02)
+    return {
+        "seconds": time.perf_counter() - start,
+        "status": job["status"],
+        "chunks": job["chunks_upserted"],
+    }
+
+
+async def _conversation(client: httpx.AsyncClient, index: int, turns: int) -> List[dict]:
+    """Ask `turns` follow-up questions in one session."""
+    session_id = None
+    results = []
+    for turn in range(turns):
+        question = f"{QUESTIONS[(index + turn) % len(QUESTIONS)]} (session {index}, turn {turn + 1})"
+        start = time.perf_counter()
+        response = await client.post(
+            "/qa/conversation",
+            json={"question": question, "session_id": session_id, "include_timings": True},
+        )
+        seconds = time.perf_counter() - start
+        if response.status_code != 200:
+            results.append({"seconds": seconds, "error": response.status_code})
+            continue
+        body = response.json()
+        session_id = body["session_id"]
+        results.append({"seconds": seconds, "timings": body.get("timings") or {}})
+    return results
+
+
+def _breakdown(results: List[dict]) -> dict:
+    """Aggregate the per-request `timings` into per-node, LLM and vector distributions."""
+    nodes: Dict[str, List[float]] = defaultdict(list)
+    vector: Dict[str, List[float]] = defaultdict(list)
+    llm_seconds: Dict[str, List[float]] = defaultdict(list)
+    calls, input_tokens, output_tokens = [], [], []
+    for result in results:
+        timings = result.get("timings")
+        if not timings:
+            continue
+        for node, seconds in timings.get("nodes", {}).items():
+            nodes[node].append(seconds)
+        for phase, totals in timings.get("vector", {}).items():
+            vector[phase].append(totals["seconds"])
+        llm_calls = timings.get("llm_calls", [])
+        for call in llm_calls:
+            llm_seconds[call["node"]].append(call["seconds"])
+        calls.append(len(llm_calls))
+        input_tokens.append(sum(call["input_tokens"] for call in llm_calls))
+        output_tokens.append(sum(call["output_tokens"] for call in llm_calls))
+
+    return {
+        "nodes": {node: _distribution(values) for node, values in sorted(nodes.items())},
+        "vector": {phase: _distribution(values) for phase, values in sorted(vector.items())},
+        "llm": {
+            "calls_per_request": round(float(np.mean(calls)), 2) if calls else 0.0,
+            "input_tokens_per_request": round(float(np.mean(input_tokens)), 1) if calls else 0.0,
+            "output_tokens_per_request": round(float(np.mean(output_tokens)), 1) if calls else 0.0,
+            "call_latency_by_node": {node: _distribution(values) for node, values in sorted(llm_seconds.items())},
+        },
+    }
+
+
+async def run(args: argparse.Namespace, workdir: Path) -> dict:
+    from src.app import api
+    from src.app.services.ingestion_jobs import get_ingestion_jobs
+    from src.app.services.post_response import get_post_response_scheduler
+
+    api.UPLOAD_DIR = workdir / "uploads"
+    pdfs = [make_pdf(workdir / f"doc-{i}.pdf", args.pages) for i in range(args.documents)]
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        jobs = await asyncio.gather(*(_index(client, pdf) for pdf in pdfs))
+        ingest_wall = time.perf_counter() - start
+        rss_after_ingestion = _peak_rss_mb()
+
+        slots = asyncio.Semaphore(args.concurrency)
+
+        async def bounded(index: int) -> List[dict]:
+            async with slots:
+                return await _conversation(client, index, args.turns)
+
+        start = time.perf_counter()
+        sessions = await asyncio.gather(*(bounded(i) for i in range(args.sessions)))
+        qa_wall = time.perf_counter() - start
+
+    # Let post-response work (titles, memory folding) finish so RSS includes it.
+    await get_post_response_scheduler().shutdown()
+    get_ingestion_jobs().shutdown()
+
+    requests = [result for session in sessions for result in session]
+    succeeded = [result for result in requests if "error" not in result]
+    chunks = sum(job["chunks"] for job in jobs)
+    return {
+        "ingestion": {
+            "documents": len(jobs),
+            "failed": sum(job["status"] != "succeeded" for job in jobs),
+            "chunks": chunks,
+            "wall_seconds": round(ingest_wall, 3),
+            "chunks_per_second": round(chunks / ingest_wall, 1) if ingest_wall else 0.0,
+            "latency": _distribution([job["seconds"] for job in jobs]),
+            "peak_rss_mb": rss_after_ingestion,
+        },
+        "qa": {
+            "requests": len(requests),
+            "errors": len(requests) - len(succeeded),
+            "wall_seconds": round(qa_wall, 3),
+            "requests_per_second": round(len(succeeded) / qa_wall, 2) if qa_wall else 0.0,
+            "latency": _distribution([result["seconds"] for result in succeeded]),
+            "first_turn_latency": _distribution([session[0]["seconds"] for session in sessions if session]),
+            **_breakdown(succeeded),
+        },
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _lookup(results: dict, path: tuple):
+    for key in path:
+        results = results.get(key) if isinstance(results, dict) else None
+    return results
+
+
+def _print_summary(results: dict) -> None:
+    qa, ingestion = results["qa"], results["ingestion"]
+    latency = qa["latency"]
+    print(f"indexed {ingestion['documents']} documents ({ingestion['chunks']} chunks) "
+          f"in {ingestion['wall_seconds']:.2f} s, {ingestion['chunks_per_second']} chunks/s")
+    print(f"qa: {qa['requests']} requests, {qa['errors']} errors, {qa['requests_per_second']} requests/s")
+    if latency["count"]:
+        print(f"qa latency ms: p50 {latency['p50_ms']}  p95 {latency['p95_ms']}  "
+              f"p99 {latency['p99_ms']}  max {latency['max_ms']}")
+    print(f"{'stage':<24} {'p50 ms':>9} {'p95 ms':>9}")
+    for section, prefix in (("nodes", "node"), ("vector", "vector")):
+        for name, dist in qa[section].items():
+            print(f"{prefix + ':' + name:<24} {dist['p50_ms']:>9} {dist['p95_ms']:>9}")
+    llm = qa["llm"]
+    print(f"llm: {llm['calls_per_request']} calls, {llm['input_tokens_per_request']} input / "
+          f"{llm['output_tokens_per_request']} output tokens per request")
+    print(f"peak RSS: {results['peak_rss_mb']} MB")
+
+
+def _print_comparison(results: dict, baseline: dict) -> None:
+    base_commit = baseline.get("meta", {}).get("commit")
+    print(f"\n{'metric':<16} {'baseline':>10} {'current':>10} {'change':>8}   (baseline {base_commit})")
+    for label, path in COMPARED:
+        before, after = _lookup(baseline, path), _lookup(results, path)
+        if before is None or after is None:
+            continue
+        change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+        print(f"{label:<16} {before:>10} {after:>10} {change:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--documents", type=int, default=2)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="Stub decode speed in output words per second (0: instant).")
+    parser.add_argument("--embed-latency", type=float, default=0.01)
+    parser.add_argument("--search-latency", type=float, default=0.02)
+    parser.add_argument("--answer-cache", action="store_true",
+                        help="Keep the semantic answer cache on (off by default so every request runs the graph).")
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file.")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to compare against.")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="e2e-bench-"))
+    os.environ.update({
+        "ANSWER_CACHE_ENABLED": str(args.answer_cache).lower(),
+        "EMBEDDING_CACHE_DIR": "",
+        "INGESTION_CHECKPOINT_DIR": "",
+        "SESSION_STORE_BACKEND": "memory",
+    })
+    from .stubs import install_stubs
+    from src.app.core.config import get_settings
+
+    token_latency = 1 / args.tokens_per_second if args.tokens_per_second else 0.0
+    install_stubs(args.llm_latency, args.embed_latency, args.search_latency, token_latency, local=True)
+
+    try:
+        results = asyncio.run(run(args, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    settings = get_settings()
+    results["meta"] = {
+        "commit": _commit(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "retrieval_mode": settings.retrieval_mode,
+        "verification_mode": settings.verification_mode,
+        "args": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+    }
+
+    _print_summary(results)
+    if args.compare:
+        _print_comparison(results, json.loads(args.compare.read_text()))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"\nresults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
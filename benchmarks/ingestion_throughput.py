@@ -0,0 +1,73 @@
+"""Chunks/sec of the ingestion writer against a local stub embedding server.
+
+Uses the real `OpenAIEmbeddings` client pointed at `StubEmbeddingServer`
+and the local vector store, sweeping embedding batch size and in-flight
+batches. A fraction of requests can be answered with 429 to show that
+backoff keeps the upload going instead of failing it.
+
+Usage:
+    python -m benchmarks.ingestion_throughput --chunks 4000 --latency 0.1 --rate-limit-ratio 0.05
+"""
+
+import argparse
+import time
+
+from langchain_core.documents import Document
+from langchain_openai import OpenAIEmbeddings
+
+from .embedding_server import StubEmbeddingServer
+
+
+def _chunks(count: int) -> list[Document]:
+    return [
+        Document(page_content=f"Chunk {i}: vector databases trade recall for latency.",
+                 metadata={"source": "bench.pdf", "page": i // 10 + 1})
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=4000)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    from src.app.core.retrieval.ingestion import IngestionWriter
+    from src.app.core.retrieval.local_store import LocalVectorStore
+
+    print(f"{'batch':>6} {'in-flight':>10} {'chunks/s':>10} {'requests':>9} {'429s':>6}")
+    for batch_size in args.batch_sizes:
+        for in_flight in args.in_flight:
+            with StubEmbeddingServer(latency=args.latency, rate_limit_ratio=args.rate_limit_ratio) as server:
+                embeddings = OpenAIEmbeddings(
+                    model="text-embedding-3-large",
+                    api_key="stub",
+                    base_url=server.base_url,
+                    check_embedding_ctx_length=False,
+                    max_retries=0,
+                    chunk_size=batch_size,
+                )
+                store = LocalVectorStore(embeddings)
+                writer = IngestionWriter(
+                    embeddings=embeddings,
+                    upsert=lambda docs, vectors: store.add_embeddings(
+                        [d.page_content for d in docs], vectors, [d.metadata for d in docs], [d.id for d in docs]),
+                    embedding_batch_size=batch_size,
+                    max_in_flight=in_flight,
+                    backoff_base=0.05,
+                    requests_per_minute=60_000,
+                    tokens_per_minute=100_000_000,
+                )
+                start = time.perf_counter()
+                written = writer.write("bench.pdf", _chunks(args.chunks), fingerprint="bench")
+                elapsed = time.perf_counter() - start
+                assert written == len(store) == args.chunks
+                print(f"{batch_size:>6} {in_flight:>10} {written / elapsed:>10.0f} "
+                      f"{server.counters['requests']:>9} {server.counters['rate_limited']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Search latency of the in-process `LocalVectorStore`.
+
+Fills the index with random unit vectors (3072 dimensions, matching
+`text-embedding-3-large`) spread over several sources, then times top-k
+searches with and without a `source` filter. Embedding time is excluded:
+only the vector search itself is measured.
+
+Usage:
+    python -m benchmarks.local_index --chunks 20000 --queries 200
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .stubs import StubEmbeddings
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    return float(np.percentile(values, pct)) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=3072)
+    parser.add_argument("--sources", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    args = parser.parse_args()
+
+    from src.app.core.retrieval.local_store import LocalVectorStore
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.chunks, args.dim), dtype=np.float32)
+    texts = [f"chunk {i}" for i in range(args.chunks)]
+    metadatas = [{"source": f"doc-{i % args.sources}.pdf"} for i in range(args.chunks)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalVectorStore(StubEmbeddings(size=args.dim, latency=0), persist_dir=Path(tmp))
+        start = time.perf_counter()
+        store.add_embeddings(texts, vectors, metadatas)
+        print(f"bulk insert + persist : {(time.perf_counter() - start) * 1000:8.1f} ms for {args.chunks} chunks")
+
+        start = time.perf_counter()
+        store = LocalVectorStore(StubEmbeddings(size=args.dim, latency=0), persist_dir=Path(tmp))
+        print(f"reload (memory map)   : {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+        queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+        for label, search_filter in (("unfiltered", None), ("source filter", {"source": {"$eq": "doc-3.pdf"}})):
+            store.similarity_search_by_vector(queries[0].tolist(), k=args.k, filter=search_filter)
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                store.similarity_search_by_vector(query.tolist(), k=args.k, filter=search_filter)
+                latencies.append(time.perf_counter() - start)
+            print(
+                f"{label:<22}: p50 {_percentile(latencies, 50):7.3f} ms  "
+                f"p99 {_percentile(latencies, 99):7.3f} ms  mean {statistics.mean(latencies) * 1000:7.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Wall-clock cost of multi-query retrieval: serial vs batched fan-out.
+
+For each number of sub-queries, compares searching them one after another
+with `retrieve` (one embedding call and one search each, as the Retrieval
+Agent's repeated tool calls do) against `retrieve_many` (one batched
+embedding call, concurrent searches), both sync and async.
+
+Usage:
+    python -m benchmarks.multi_query --embed-latency 0.05 --search-latency 0.08
+"""
+
+import argparse
+import asyncio
+import time
+
+from .stubs import install_stubs
+
+QUERIES = [
+    "advantages of HNSW graphs",
+    "HNSW advantages",
+    "HNSW",
+    "layered proximity graph for approximate nearest neighbour search",
+]
+
+
+def _timed(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--search-latency", type=float, default=0.08)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    install_stubs(embed_latency=args.embed_latency, search_latency=args.search_latency)
+    from src.app.core.retrieval.vector_store import aretrieve, aretrieve_many, retrieve, retrieve_many
+
+    print(f"{'queries':>7} {'serial ms':>10} {'fan-out ms':>11} {'async serial ms':>16} {'async fan-out ms':>17}")
+    for n in range(1, len(QUERIES) + 1):
+        queries = QUERIES[:n]
+
+        async def serial():
+            for query in queries:
+                await aretrieve(query)
+
+        row = [
+            _timed(lambda: [retrieve(query) for query in queries], args.repeats),
+            _timed(lambda: retrieve_many(queries), args.repeats),
+            _timed(lambda: asyncio.run(serial()), args.repeats),
+            _timed(lambda: asyncio.run(aretrieve_many(queries)), args.repeats),
+        ]
+        print(f"{n:>7} {row[0]:>10.1f} {row[1]:>11.1f} {row[2]:>16.1f} {row[3]:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
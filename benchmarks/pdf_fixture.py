@@ -0,0 +1,52 @@
+"""Generate synthetic text PDFs for ingestion benchmarks."""
+
+from pathlib import Path
+
+_SENTENCES = [
+    "Vector databases index embeddings for approximate nearest neighbour search.",
+    "HNSW builds a layered proximity graph that is searched greedily from the top layer.",
+    "IVF partitions vectors into clusters and probes only the closest inverted lists.",
+    "Product quantization splits vectors into sub-spaces and stores short codes.",
+    "Metadata filters restrict the search to documents matching a predicate.",
+]
+
+
+def make_pdf(path: Path, pages: int, lines_per_page: int = 45) -> Path:
+    """Write a `pages`-page PDF of plain Helvetica text lines to `path`."""
+    page_ids = [4 + 2 * i for i in range(pages)]
+    parts: list[bytes] = [b"%PDF-1.4\n"]
+    offsets: dict[int, int] = {}
+    size = len(parts[0])
+
+    def add(number: int, body: bytes) -> None:
+        nonlocal size
+        offsets[number] = size
+        chunk = f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+        parts.append(chunk)
+        size += len(chunk)
+
+    add(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    add(2, f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+    add(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    for page, page_id in enumerate(page_ids, start=1):
+        lines = [
+            f"Page {page}, line {line}: {_SENTENCES[(page + line) % len(_SENTENCES)]}"
+            for line in range(lines_per_page)
+        ]
+        stream = ("BT /F1 9 Tf 36 806 Td 11 TL " + " ".join(f"({text}) '" for text in lines) + " ET").encode()
+        add(page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        ).encode())
+        add(page_id + 1, f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+
+    count = 4 + 2 * pages
+    xref = [f"xref\n0 {count}\n0000000000 65535 f \n"] + [f"{offsets[i]:010d} 00000 n \n" for i in range(1, count)]
+    parts.append("".join(xref).encode())
+    parts.append(f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{size}\n%%EOF\n".encode())
+
+    path = Path(path)
+    path.write_bytes(b"".join(parts))
+    return path
@@ -0,0 +1,92 @@
+"""Peak memory and throughput of PDF ingestion.
+
+Compares the streaming, page-parallel pipeline in `index_documents` with
+the previous approach (`PyPDFLoader(mode="single")` + one split over the
+whole text). Each variant runs in a fresh subprocess so `ru_maxrss` reflects
+only that variant. Embeddings and the vector store are local stubs.
+
+Usage:
+    python -m benchmarks.pdf_ingestion --pages 1000
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .pdf_fixture import make_pdf
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_variant(variant: str, pdf: Path, workers: int) -> dict:
+    os.environ.update({
+        "VECTOR_STORE_BACKEND": "local",
+        "EMBEDDING_CACHE_DIR": "",
+        "INGESTION_PARSE_WORKERS": str(workers),
+    })
+    from .stubs import StubEmbeddings, install_stubs
+    from src.app.core.retrieval import vector_store
+    from src.app.core.retrieval.local_store import LocalVectorStore
+
+    install_stubs(0, 0, 0)
+    store = LocalVectorStore(StubEmbeddings(size=256, latency=0))
+    vector_store._get_vector_store = lambda workspace=None, create=False: store
+
+    baseline_rss = _peak_rss_mb()
+    start = time.perf_counter()
+    if variant == "streaming":
+        chunks = vector_store.index_documents(pdf)
+    else:
+        from langchain_community.document_loaders import PyPDFLoader
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+        docs = PyPDFLoader(str(pdf), mode="single").load()
+        texts = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50).split_documents(docs)
+        store.add_documents(texts)
+        chunks = len(texts)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "variant": variant,
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "chunks_per_second": round(chunks / elapsed, 1),
+        "peak_rss_growth_mb": round(_peak_rss_mb() - baseline_rss, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--variant", choices=["streaming", "single"], help=argparse.SUPPRESS)
+    parser.add_argument("--pdf", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(_run_variant(args.variant, args.pdf, args.workers)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = make_pdf(Path(tmp) / "bench.pdf", args.pages)
+        print(f"{args.pages}-page PDF, {pdf.stat().st_size / 1e6:.1f} MB")
+        for variant in ("single", "streaming"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.pdf_ingestion", "--variant", variant,
+                 "--pdf", str(pdf), "--workers", str(args.workers)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            print(json.loads(output.strip().splitlines()[-1]))
+
+
+if __name__ == "__main__":
+    main()
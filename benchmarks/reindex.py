@@ -0,0 +1,96 @@
+"""Embedding calls and upsert volume when re-indexing documents.
+
+Indexes a synthetic PDF, then re-indexes it unchanged, indexes an extended
+version of it (extra pages appended) and uploads a copy under another name.
+Content-addressed chunk ids make the unchanged re-index a near no-op; the
+copy is stored again under its own source, and near-duplicate removal keeps
+its chunks from crowding the top-k. Embeddings and the vector store are
+local stubs with counters.
+
+Usage:
+    python -m benchmarks.reindex --pages 40
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from .pdf_fixture import make_pdf
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--extra-pages", type=int, default=4)
+    parser.add_argument("--k", type=int, default=8)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="reindex-"))
+    os.environ.update({
+        "VECTOR_STORE_BACKEND": "local",
+        "EMBEDDING_CACHE_DIR": "",
+        "INGESTION_CHECKPOINT_DIR": "",
+        "BM25_INDEX_DIR": str(workdir / "bm25"),
+    })
+    from .stubs import StubEmbeddings, install_stubs
+    from src.app.core.config import get_settings
+    from src.app.core.retrieval import vector_store
+    from src.app.core.retrieval.bm25 import BM25Index
+    from src.app.core.retrieval.local_store import LocalVectorStore
+
+    install_stubs(0, 0, 0)
+    calls = {"texts": 0, "upserted": 0}
+
+    class CountingEmbeddings(StubEmbeddings):
+        def embed_documents(self, texts: List[str]) -> List[List[float]]:
+            calls["texts"] += len(texts)
+            return super().embed_documents(texts)
+
+    store = LocalVectorStore(CountingEmbeddings(size=64, latency=0))
+    bm25 = BM25Index()
+    add_embeddings = store.add_embeddings
+
+    def counting_add(texts, vectors, metadatas, ids):
+        calls["upserted"] += len(texts)
+        return add_embeddings(texts, vectors, metadatas, ids)
+
+    store.add_embeddings = counting_add
+    vector_store._get_vector_store = lambda workspace=None, create=False: store
+    vector_store.get_bm25_index = lambda workspace=None, create=False: bm25
+
+    original = make_pdf(workdir / "paper.pdf", args.pages)
+    copy = workdir / "paper-copy.pdf"
+
+    def run(label: str, path: Path) -> None:
+        calls.update(texts=0, upserted=0)
+        start = time.perf_counter()
+        chunks = vector_store.index_documents(path)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<22} {chunks:>7} {calls['texts']:>14} {calls['upserted']:>9} "
+              f"{len(store._ids):>7} {elapsed * 1000:>9.0f}")
+
+    print(f"{'step':<22} {'chunks':>7} {'texts embedded':>14} {'upserted':>9} {'stored':>7} {'ms':>9}")
+    run("first index", original)
+    run("unchanged re-index", original)
+    make_pdf(original, args.pages + args.extra_pages)
+    run(f"+{args.extra_pages} pages", original)
+    shutil.copy(original, copy)
+    run("copy under new name", copy)
+
+    query = "HNSW builds a layered proximity graph"
+    for max_distance in (-1, 3):
+        get_settings().near_duplicate_max_distance = max_distance
+        docs = vector_store.retrieve_many([query, "HNSW layered graph"], k=args.k)
+        distinct = len({doc.page_content for doc in docs})
+        label = "off" if max_distance < 0 else f"<= {max_distance} bits"
+        print(f"near-duplicate removal {label:<10}: {distinct}/{len(docs)} distinct chunks in top-{args.k}")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Compare LLM call counts and latency of the retrieval modes.
+
+Runs the same scripted conversation (one self-contained question followed
+by follow-ups) through graphs built with `retrieval_mode="agent"`,
+`"direct"` and `"multi_query"`, counting every chat-model call made by the
+retrieval stage and by the whole pipeline.
+
+Usage:
+    python -m benchmarks.retrieval_modes --llm-latency 0.2
+"""
+
+import argparse
+import time
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .stubs import install_stubs
+
+CONVERSATION = [
+    "What is HNSW?",
+    "What are its advantages?",
+    "How does IVF compare to it?",
+    "What is product quantization?",
+]
+
+
+class _LLMCallCounter(BaseCallbackHandler):
+    """Count chat-model calls, split by the graph node that made them."""
+
+    def __init__(self) -> None:
+        self.by_node: dict[str, int] = {}
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, metadata: dict | None = None, **kwargs: Any):
+        node = (metadata or {}).get("langgraph_node", "other")
+        # Agents run as subgraphs; attribute their calls to the outer node.
+        namespace = (metadata or {}).get("langgraph_checkpoint_ns", "")
+        if namespace:
+            node = namespace.split("|")[0].split(":")[0]
+        self.by_node[node] = self.by_node.get(node, 0) + 1
+
+
+def run_mode(mode: str) -> dict:
+    from src.app.core.agents.graph import create_qa_graph, _initial_state
+
+    graph = create_qa_graph(retrieval_mode=mode)
+    counter = _LLMCallCounter()
+    history: list[dict] = []
+    retrieval_latency = 0.0
+    total_latency = 0.0
+
+    for question in CONVERSATION:
+        start = time.perf_counter()
+        state = _initial_state(question, history)
+        for update in graph.stream(state, config={"callbacks": [counter]}, stream_mode="updates"):
+            if "retrieval" in update:
+                retrieval_latency += time.perf_counter() - start
+            for value in update.values():
+                state.update(value or {})
+        total_latency += time.perf_counter() - start
+        history.append({"question": question, "answer": state.get("answer", "")})
+
+    turns = len(CONVERSATION)
+    return {
+        "retrieval_calls": counter.by_node.get("retrieval", 0) / turns,
+        "total_calls": sum(counter.by_node.values()) / turns,
+        "retrieval_ms": retrieval_latency / turns * 1000,
+        "total_ms": total_latency / turns * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--embed-latency", type=float, default=0.02)
+    parser.add_argument("--search-latency", type=float, default=0.03)
+    args = parser.parse_args()
+
+    install_stubs(args.llm_latency, args.embed_latency, args.search_latency)
+
+    print(f"{'mode':<11} {'retrieval LLM calls':>20} {'total LLM calls':>16} {'retrieval ms':>13} {'total ms':>9}")
+    for mode in ("agent", "direct", "multi_query"):
+        result = run_mode(mode)
+        print(
+            f"{mode:<11} {result['retrieval_calls']:>20.2f} {result['total_calls']:>16.2f} "
+            f"{result['retrieval_ms']:>13.1f} {result['total_ms']:>9.1f}"
+        )
+    print("(averaged per question)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Offline retrieval quality and latency: dense vs BM25 vs hybrid.
+
+Builds a fixture corpus of definition chunks for vector-search terms
+(acronyms and method names) buried among distractor chunks that mention the
+same terms in passing. Each term gets an exact-term query ("How does OPQ
+work?") and a descriptive query paraphrasing its definition; the relevant
+chunk is the term's definition.
+
+No embedding API is called. The dense retriever is a stand-in model that
+hashes character trigrams into a small vector, so like a real embedding model
+it captures overall wording but blurs rare exact tokens. Hybrid results go
+through the same `retrieve` code path the app uses.
+
+Usage:
+    python -m benchmarks.retrieval_quality --distractors 2000 --k 4
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+import zlib
+from typing import Callable, Dict, List
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+TERMS = {
+    "HNSW": "builds a hierarchy of navigable small world graphs and greedily descends layers toward the query",
+    "IVF": "partitions vectors into coarse clusters with k-means and probes only the nearest inverted lists",
+    "PQ": "splits each vector into subvectors and encodes every subvector by its nearest codebook centroid",
+    "OPQ": "learns a rotation before product quantization so subspaces carry balanced variance",
+    "LSH": "hashes vectors with random projections so nearby points collide in the same buckets",
+    "DiskANN": "keeps a Vamana graph on SSD and caches compressed vectors in memory for billion-scale search",
+    "ScaNN": "applies anisotropic quantization that penalizes error parallel to the datapoint for inner product search",
+    "NSG": "approximates a monotonic search network by pruning a kNN graph around a navigating node",
+    "SPANN": "stores posting lists on disk and keeps only centroid vectors in memory for balanced partitions",
+    "Annoy": "builds a forest of random projection trees that are memory-mapped from static files",
+    "BM25": "ranks documents by term frequency saturation and inverse document frequency with length normalization",
+    "RRF": "fuses several rankings by summing reciprocal ranks so no score calibration is required",
+    "MMR": "selects results that balance relevance to the query against redundancy with already chosen results",
+    "SQ8": "scalar quantizes every dimension to one byte using per-dimension minimum and maximum values",
+    "Vamana": "constructs a graph with a robust pruning rule that keeps long range edges for fewer hops",
+    "ColBERT": "scores late interaction between per-token query and document embeddings with a max-sim operator",
+    "SPLADE": "expands queries and documents into sparse weighted vocabularies learned by a masked language model",
+    "FAISS": "library offering flat, inverted file and quantized indexes with GPU acceleration",
+    "RaBitQ": "quantizes normalized vectors to bit strings with a theoretical error bound on distance estimates",
+    "FreshDiskANN": "supports streaming inserts and deletes by merging an in-memory graph into the SSD index",
+}
+
+FILLER = (
+    "vector databases trade recall for latency and memory when serving approximate nearest neighbour "
+    "queries over embeddings produced by neural encoders for semantic retrieval workloads in production "
+    "systems that combine metadata filtering persistence replication and sharding across many nodes"
+).split()
+
+
+class TrigramEmbeddings(Embeddings):
+    """Hashed character-trigram bag of words: a deterministic stand-in for a dense model."""
+
+    def __init__(self, size: int = 96):
+        self.size = size
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.size, dtype=np.float32)
+        for word in text.lower().split():
+            padded = f"#{word}#"
+            for i in range(len(padded) - 2):
+                vector[zlib.crc32(padded[i:i + 3].encode()) % self.size] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def _build_corpus(distractors: int, seed: int) -> tuple[List[Document], List[tuple[str, str, str]]]:
+    rng = random.Random(seed)
+    terms = list(TERMS)
+    docs = [
+        Document(id=f"def-{term}", page_content=f"{term} {description}.", metadata={"source": "fixture.pdf"})
+        for term, description in TERMS.items()
+    ]
+    for i in range(distractors):
+        mentioned = rng.sample(terms, 2)
+        words = rng.sample(FILLER, 18)
+        text = f"Unlike {mentioned[0]}, {' '.join(words[:9])} as {mentioned[1]} {' '.join(words[9:])}."
+        docs.append(Document(id=f"noise-{i}", page_content=text, metadata={"source": "fixture.pdf"}))
+
+    queries = []
+    for term, description in TERMS.items():
+        queries.append(("exact", f"How does {term} work?", f"def-{term}"))
+        words = description.split()
+        queries.append(("descriptive", f"which index {' '.join(words[1:7])}", f"def-{term}"))
+    return docs, queries
+
+
+def _evaluate(
+        label: str, search: Callable[[str], List[Document]], queries: List[tuple[str, str, str]], k: int
+) -> None:
+    by_kind: Dict[str, List[float]] = {}
+    reciprocal_ranks, latencies = [], []
+    for kind, query, relevant in queries:
+        start = time.perf_counter()
+        results = search(query)[:k]
+        latencies.append(time.perf_counter() - start)
+        ids = [doc.id for doc in results]
+        hit = relevant in ids
+        by_kind.setdefault(kind, []).append(1.0 if hit else 0.0)
+        reciprocal_ranks.append(1.0 / (ids.index(relevant) + 1) if hit else 0.0)
+
+    recalls = "  ".join(f"recall@{k} {kind:<11} {statistics.mean(v):5.2f}" for kind, v in sorted(by_kind.items()))
+    print(
+        f"{label:<8}: {recalls}  MRR {statistics.mean(reciprocal_ranks):5.2f}  "
+        f"p50 {np.percentile(latencies, 50) * 1000:6.2f} ms  p95 {np.percentile(latencies, 95) * 1000:6.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--distractors", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--pool", type=int, default=20, help="Candidates taken from each retriever.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for key in ("OPENAI_API_KEY", "PINECONE_API_KEY", "PINECONE_INDEX_NAME"):
+        os.environ.setdefault(key, "stub")
+    os.environ["RETRIEVAL_CANDIDATE_POOL"] = str(args.pool)
+    os.environ["HYBRID_RETRIEVAL_ENABLED"] = "true"
+
+    from src.app.core.retrieval import vector_store
+    from src.app.core.retrieval.bm25 import BM25Index
+    from src.app.core.retrieval.local_store import LocalVectorStore
+
+    docs, queries = _build_corpus(args.distractors, args.seed)
+    embeddings = TrigramEmbeddings()
+    store = LocalVectorStore(embeddings)
+    bm25 = BM25Index()
+
+    start = time.perf_counter()
+    store.add_embeddings(
+        [doc.page_content for doc in docs],
+        embeddings.embed_documents([doc.page_content for doc in docs]),
+        [doc.metadata for doc in docs],
+        [doc.id for doc in docs],
+    )
+    dense_build = time.perf_counter() - start
+    start = time.perf_counter()
+    bm25.add_documents(docs)
+    print(f"corpus: {len(docs)} chunks, {len(queries)} queries  "
+          f"(dense build {dense_build * 1000:.0f} ms, BM25 build {(time.perf_counter() - start) * 1000:.0f} ms)")
+
+    vector_store._get_vector_store = lambda workspace=None, create=False: store
+    vector_store.get_bm25_index = lambda workspace=None, create=False: bm25
+
+    _evaluate("dense", lambda q: store.similarity_search(q, k=args.k), queries, args.k)
+    _evaluate("bm25", lambda q: [doc for doc, _ in bm25.search(q, args.k)], queries, args.k)
+    _evaluate("hybrid", lambda q: vector_store.retrieve(q, k=args.k), queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
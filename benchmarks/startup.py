@@ -0,0 +1,90 @@
+"""Cold-start cost of the API: import time, startup and first-request latency.
+
+Each variant runs in a fresh interpreter:
+- `lazy`: import the app, run its startup, then ask two questions; the
+  first one builds the agents, graph, models and vector store.
+- `warmup`: same, but `POST /warmup` runs before the first question.
+- `wipe`: like `lazy` with `WIPE_ON_STARTUP=true`, the old clean-slate startup.
+
+The app is imported before the stubs are installed so the import time is the
+real one; the chat model and vector store are stubs for the requests. Also
+lists which heavy modules the import alone pulled in. The stubs never load
+the OpenAI SDK, so `deferred_imports_s` reports what importing the deferred
+modules costs: a real first request pays it, unless `/warmup` ran.
+
+Usage:
+    python -m benchmarks.startup --llm-latency 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+HEAVY_MODULES = ["langchain_openai", "langchain.agents", "langchain_pinecone", "langchain_community", "pypdf"]
+
+
+async def _measure(variant: str, llm_latency: float) -> dict:
+    start = time.perf_counter()
+    from src.app import api
+    import_seconds = time.perf_counter() - start
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    from .stubs import install_stubs
+
+    install_stubs(llm_latency, 0, 0)
+    result = {"variant": variant, "import_s": round(import_seconds, 3), "heavy_modules_at_import": loaded}
+
+    start = time.perf_counter()
+    async with api.app.router.lifespan_context(api.app):
+        result["startup_s"] = round(time.perf_counter() - start, 3)
+
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            if variant == "warmup":
+                start = time.perf_counter()
+                (await client.post("/warmup")).raise_for_status()
+                result["warmup_s"] = round(time.perf_counter() - start, 3)
+
+            for label, question in (("first_request_ms", "What is HNSW?"), ("second_request_ms", "What is IVF?")):
+                start = time.perf_counter()
+                (await client.post("/qa/conversation", json={"question": question})).raise_for_status()
+                result[label] = round((time.perf_counter() - start) * 1000, 1)
+
+    start = time.perf_counter()
+    import langchain.agents, langchain_openai, langchain_pinecone  # noqa: E401,F401
+    result["deferred_imports_s"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-latency", type=float, default=0.02)
+    parser.add_argument("--variant", choices=["lazy", "warmup", "wipe"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        os.environ.update({
+            "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "stub"),
+            "EMBEDDING_CACHE_DIR": "",
+            "WIPE_ON_STARTUP": str(args.variant == "wipe").lower(),
+        })
+        print(json.dumps(asyncio.run(_measure(args.variant, args.llm_latency))))
+        return
+
+    for variant in ("wipe", "lazy", "warmup"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", "--variant", variant,
+             "--llm-latency", str(args.llm_latency)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        print(json.loads(output.strip().splitlines()[-1]))
+
+
+if __name__ == "__main__":
+    main()
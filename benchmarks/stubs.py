@@ -0,0 +1,291 @@
+"""Deterministic local stand-ins for OpenAI and Pinecone.
+
+`install_stubs` must be called before the first question is answered,
+because the agents build (and then keep) their chat model on first use.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langchain_core.vectorstores import InMemoryVectorStore, VectorStore
+
+from src.app.core.retrieval.local_store import LocalVectorStore
+
+FIXTURE_TEXTS = [
+    "HNSW builds a layered proximity graph for approximate nearest neighbour search.",
+    "Product quantization compresses vectors into short codes to save memory.",
+    "IVF partitions the vector space into clusters and probes only the closest lists.",
+    "Cosine similarity compares the angle between two embedding vectors.",
+    "Vector databases combine ANN indexes with metadata filtering and persistence.",
+    "LSH hashes similar vectors into the same buckets with high probability.",
+]
+
+
+def _stub_args(schema: dict) -> dict:
+    """Fill a tool's JSON schema with placeholder values."""
+    args = {}
+    for name, prop in schema.get("properties", {}).items():
+        kind = prop.get("type")
+        if kind == "boolean":
+            args[name] = False
+        elif kind in ("integer", "number"):
+            args[name] = 0
+        else:
+            args[name] = f"stub {name}"
+    return args
+
+
+def _words(text: str) -> List[str]:
+    """Split text into word-sized stream tokens, keeping the separators."""
+    words = text.split(" ")
+    return [word if i == len(words) - 1 else word + " " for i, word in enumerate(words)]
+
+
+def _usage(messages: List[BaseMessage], reply: str) -> dict:
+    """Word counts standing in for provider-reported token usage."""
+    input_tokens = sum(len(str(message.content).split()) for message in messages)
+    output_tokens = len(reply.split())
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+
+class StubChatModel(BaseChatModel):
+    """Chat model that sleeps for `latency` seconds and returns canned output.
+
+    When tools are bound it calls the first tool once, then answers in plain
+    text after the tool result, which is enough to drive `create_agent` loops
+    and `with_structured_output`. Each output word adds `token_latency`
+    seconds; when streamed, plain-text replies are emitted word by word at
+    that pace. Word counts are reported as token usage.
+    """
+
+    model_name: str = "stub-chat"
+    latency: float = 0.05
+    token_latency: float = 0.0
+    reply: str = "Stub answer grounded in the retrieved context."
+    bound_tools: List[dict] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat"
+
+    def bind_tools(self, tools, **kwargs: Any):
+        return self.model_copy(update={"bound_tools": [convert_to_openai_tool(t) for t in tools]})
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        if self.bound_tools and not isinstance(messages[-1], ToolMessage):
+            function = self.bound_tools[0]["function"]
+            args = _stub_args(function.get("parameters", {}))
+            message = AIMessage(
+                content="",
+                tool_calls=[{"name": function["name"], "args": args, "id": f"call_{len(messages)}"}],
+                usage_metadata=_usage(messages, json.dumps(args)),
+            )
+        else:
+            message = AIMessage(content=self.reply, usage_metadata=_usage(messages, self.reply))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _decode_seconds(self, result: ChatResult) -> float:
+        return self.token_latency * result.generations[0].message.usage_metadata["output_tokens"]
+
+    def _generate(
+            self,
+            messages: List[BaseMessage],
+            stop: Optional[List[str]] = None,
+            run_manager: Optional[CallbackManagerForLLMRun] = None,
+            **kwargs: Any,
+    ) -> ChatResult:
+        result = self._respond(messages)
+        time.sleep(self.latency + self._decode_seconds(result))
+        return result
+
+    async def _agenerate(
+            self,
+            messages: List[BaseMessage],
+            stop: Optional[List[str]] = None,
+            run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+            **kwargs: Any,
+    ) -> ChatResult:
+        result = self._respond(messages)
+        await asyncio.sleep(self.latency + self._decode_seconds(result))
+        return result
+
+    def _stream(
+            self,
+            messages: List[BaseMessage],
+            stop: Optional[List[str]] = None,
+            run_manager: Optional[CallbackManagerForLLMRun] = None,
+            **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        message = self._respond(messages).generations[0].message
+        if message.tool_calls:
+            time.sleep(self.token_latency * message.usage_metadata["output_tokens"])
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {**call, "args": json.dumps(call["args"]), "index": 0} for call in message.tool_calls
+                ],
+                usage_metadata=message.usage_metadata,
+            ))
+            return
+        words = _words(message.content)
+        for i, word in enumerate(words):
+            time.sleep(self.token_latency)
+            usage = message.usage_metadata if i == len(words) - 1 else None
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word, usage_metadata=usage))
+            if run_manager:
+                run_manager.on_llm_new_token(word, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+            self,
+            messages: List[BaseMessage],
+            stop: Optional[List[str]] = None,
+            run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+            **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        message = self._respond(messages).generations[0].message
+        if message.tool_calls:
+            await asyncio.sleep(self.token_latency * message.usage_metadata["output_tokens"])
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {**call, "args": json.dumps(call["args"]), "index": 0} for call in message.tool_calls
+                ],
+                usage_metadata=message.usage_metadata,
+            ))
+            return
+        words = _words(message.content)
+        for i, word in enumerate(words):
+            await asyncio.sleep(self.token_latency)
+            usage = message.usage_metadata if i == len(words) - 1 else None
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word, usage_metadata=usage))
+            if run_manager:
+                await run_manager.on_llm_new_token(word, chunk=chunk)
+            yield chunk
+
+
+class StubEmbeddings(DeterministicFakeEmbedding):
+    """Deterministic embeddings with a fixed per-call latency."""
+
+    latency: float = 0.01
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency)
+        return super().embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self.latency)
+        return super().embed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await asyncio.sleep(self.latency)
+        return super().embed_query(text)
+
+
+class StubVectorStore(InMemoryVectorStore):
+    """In-memory vector store that adds a fixed search latency."""
+
+    def __init__(self, embedding: StubEmbeddings, latency: float = 0.02):
+        super().__init__(embedding=embedding)
+        self.latency = latency
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        time.sleep(self.latency)
+        return super().similarity_search(query, k=k, **kwargs)
+
+    async def asimilarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        await asyncio.sleep(self.latency)
+        return await super().asimilarity_search(query, k=k, **kwargs)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        time.sleep(self.latency)
+        return super().similarity_search_by_vector(embedding, k=k, **kwargs)
+
+    async def asimilarity_search_by_vector(
+            self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        await asyncio.sleep(self.latency)
+        return super().similarity_search_by_vector(embedding, k=k, **kwargs)
+
+
+class StubLocalVectorStore(LocalVectorStore):
+    """`LocalVectorStore` that adds a fixed search latency; supports ingestion."""
+
+    def __init__(self, embedding: StubEmbeddings, latency: float = 0.02):
+        super().__init__(embedding=embedding)
+        self.latency = latency
+
+    def similarity_search_with_score_by_vector(
+            self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        time.sleep(self.latency)
+        return super().similarity_search_with_score_by_vector(embedding, k=k, **kwargs)
+
+
+def install_stubs(
+        llm_latency: float = 0.05,
+        embed_latency: float = 0.01,
+        search_latency: float = 0.02,
+        token_latency: float = 0.0,
+        local: bool = False,
+) -> VectorStore:
+    """Swap the OpenAI chat model, the Pinecone vector stores and the BM25 indexes for stubs.
+
+    With `local`, the vector store is a `StubLocalVectorStore`, so uploaded
+    PDFs can be indexed through the real ingestion path. The fixtures are in
+    the default workspace; other workspaces start out empty. Returns the
+    default workspace's store.
+    """
+    for key in ("OPENAI_API_KEY", "PINECONE_API_KEY", "PINECONE_INDEX_NAME"):
+        os.environ.setdefault(key, "stub")
+
+    from src.app.core.llm import factory
+    from src.app.core.retrieval import vector_store
+    from src.app.core.retrieval.bm25 import BM25Index
+    from src.app.core.workspaces import DEFAULT_WORKSPACE
+
+    def create_stub_chat_model(temperature: float = 0.0) -> StubChatModel:
+        return StubChatModel(latency=llm_latency, token_latency=token_latency)
+
+    store_class = StubLocalVectorStore if local else StubVectorStore
+    embeddings = StubEmbeddings(size=64, latency=embed_latency)
+    store = store_class(embeddings, latency=search_latency)
+    metadatas = [{"source": "fixture.pdf"} for _ in FIXTURE_TEXTS]
+    ids = store.add_texts(FIXTURE_TEXTS, metadatas=metadatas)
+    bm25 = BM25Index()
+    bm25.add_documents([
+        Document(id=doc_id, page_content=text, metadata=metadata)
+        for doc_id, text, metadata in zip(ids, FIXTURE_TEXTS, metadatas)
+    ])
+
+    stores = {DEFAULT_WORKSPACE: store}
+    bm25_indexes = {DEFAULT_WORKSPACE: bm25}
+
+    def get_stub_vector_store(workspace: str = DEFAULT_WORKSPACE, create: bool = False) -> VectorStore:
+        return stores.setdefault(workspace, store_class(embeddings, latency=search_latency))
+
+    def get_stub_bm25_index(workspace: str = DEFAULT_WORKSPACE, create: bool = False) -> BM25Index:
+        return bm25_indexes.setdefault(workspace, BM25Index())
+
+    factory.create_chat_model = create_stub_chat_model
+    factory.get_chat_model.cache_clear()
+    vector_store._get_vector_store = get_stub_vector_store
+    vector_store.get_bm25_index = get_stub_bm25_index
+    vector_store.list_workspaces = lambda: [DEFAULT_WORKSPACE, *sorted(set(stores) - {DEFAULT_WORKSPACE})]
+    return store
@@ -0,0 +1,100 @@
+"""Per-workspace search cost: one shared index vs an index per workspace.
+
+Builds `--workspaces` synthetic corpora whose sizes grow geometrically from
+`--smallest` chunks, then times `retrieve` for each workspace twice: once
+with every workspace's chunks in one shared vector and BM25 index (how all
+uploads used to land), and once with each workspace in its own index, as
+`_get_vector_store(workspace)` and `get_bm25_index(workspace)` now provide.
+Also reports how many of the top-k results belong to the asking workspace.
+
+Usage:
+    python -m benchmarks.workspaces --workspaces 4 --smallest 500 --growth 8
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+from langchain_core.documents import Document
+
+from .stubs import StubEmbeddings, install_stubs
+
+
+def _corpus(workspace: str, size: int, rng: np.random.Generator) -> List[Document]:
+    vocabulary = [f"{workspace}term{i}" for i in range(200)] + [f"shared{i}" for i in range(200)]
+    return [
+        Document(
+            id=f"{workspace}-{i}",
+            page_content=" ".join(rng.choice(vocabulary, size=40)),
+            metadata={"source": f"{workspace}.pdf", "page": i // 10 + 1},
+        )
+        for i in range(size)
+    ]
+
+
+def _timed(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workspaces", type=int, default=4)
+    parser.add_argument("--smallest", type=int, default=500)
+    parser.add_argument("--growth", type=int, default=8)
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--k", type=int, default=4)
+    args = parser.parse_args()
+
+    install_stubs(0, 0, 0)
+    from src.app.core.retrieval import vector_store
+    from src.app.core.retrieval.bm25 import BM25Index
+    from src.app.core.retrieval.local_store import LocalVectorStore
+
+    rng = np.random.default_rng(0)
+    embeddings = StubEmbeddings(size=args.dimensions, latency=0)
+    corpora = {
+        f"ws{i}": _corpus(f"ws{i}", args.smallest * args.growth ** i, rng) for i in range(args.workspaces)
+    }
+
+    def build(docs: List[Document]):
+        store = LocalVectorStore(embeddings)
+        vectors = rng.standard_normal((len(docs), args.dimensions)).astype(np.float32)
+        store.add_embeddings(
+            [doc.page_content for doc in docs], vectors, [doc.metadata for doc in docs], [doc.id for doc in docs]
+        )
+        bm25 = BM25Index()
+        bm25.add_documents(docs)
+        return store, bm25
+
+    shared_store, shared_bm25 = build([doc for docs in corpora.values() for doc in docs])
+    indexes: Dict[str, tuple] = {workspace: build(docs) for workspace, docs in corpora.items()}
+    total = sum(len(docs) for docs in corpora.values())
+
+    print(f"{'workspace':<10} {'chunks':>8} {'shared ms':>10} {'own ms':>8} {'shared own-hits':>16} {'own-hits':>9}")
+    for workspace, docs in corpora.items():
+        query = " ".join(docs[0].page_content.split()[:6])
+        row = {}
+        for variant in ("shared", "own"):
+            if variant == "shared":
+                vector_store._get_vector_store = lambda workspace=None, create=False: shared_store
+                vector_store.get_bm25_index = lambda workspace=None, create=False: shared_bm25
+            else:
+                # `get_embeddings` asks for the default workspace's store; any will do.
+                vector_store._get_vector_store = lambda workspace=workspace, create=False: indexes[workspace][0]
+                vector_store.get_bm25_index = lambda workspace=workspace, create=False: indexes[workspace][1]
+            results = vector_store.retrieve(query, k=args.k, workspace=workspace)
+            own = sum(doc.metadata["source"] == f"{workspace}.pdf" for doc in results)
+            milliseconds = _timed(lambda: vector_store.retrieve(query, k=args.k, workspace=workspace), args.repeats)
+            row[variant] = (milliseconds, own)
+        print(f"{workspace:<10} {len(docs):>8} {row['shared'][0]:>10.2f} {row['own'][0]:>8.2f} "
+              f"{row['shared'][1]:>13}/{args.k} {row['own'][1]:>7}/{args.k}")
+    print(f"shared index: {total} chunks across {len(corpora)} workspaces")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,65 @@
 import datetime
+import json
 import os
 import shutil
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, Any
-
-from fastapi import FastAPI, File, HTTPException, Request, UploadFile, status
-from fastapi.responses import JSONResponse
-
-from .core.agents.agents import generate_chat_title
-from .core.agents.graph import run_conversational_qa_flow
-from .core.retrieval.vector_store import index_documents, delete_document_vectors, delete_all_vectors
+from typing import AsyncIterator, Dict, Any, List
+
+from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile, status
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from .core.agents.agents import agenerate_chat_title
+from .core.agents.grounding import verification_stats
+from .core.agents.graph import (
+    arun_conversational_qa_flow,
+    arun_memory_summarization,
+    astream_conversational_qa_flow,
+    warm_up,
+)
+from .core.cache.answer_cache import get_answer_cache
+from .core.clients import close_http_clients
+from .core.config import get_settings
+from .core.retrieval.embedding_cache import CachedEmbeddings
+from .core.retrieval.serialization import citations, format_chunks
+from .core.retrieval.vector_store import delete_document_vectors, delete_all_vectors, get_chunks, get_embeddings
+from .core.telemetry import render_metrics, request_trace, timed_node
+from .core.utils import generate_session_id
+from .core.workspaces import DEFAULT_WORKSPACE, WORKSPACE_PATTERN
 from .models import ConversationalQAResponse, ConversationalQARequest, ConversationHistory
+from .services.ingestion_jobs import IngestionQueueFullError, get_ingestion_jobs
+from .services.post_response import get_post_response_scheduler
+from .services.session_store import decode_cursor, encode_cursor, get_session_store, new_session
 
 UPLOAD_DIR = Path("/tmp/uploads")
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    print("Server Starting... Cleaning up...")
+def _upload_dir(workspace: str) -> Path:
+    """Where uploads of `workspace` are kept; the default workspace uses `UPLOAD_DIR` itself."""
+    if workspace == DEFAULT_WORKSPACE:
+        return UPLOAD_DIR
+    return UPLOAD_DIR / "workspaces" / workspace
 
-    delete_all_vectors()
 
-    if UPLOAD_DIR.exists():
-        shutil.rmtree(UPLOAD_DIR)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Agents, models and the vector store are built on first use (or by
+    # `/warmup`), so startup does no network or model work by default.
+    if get_settings().wipe_on_startup:
+        print("Server Starting... Cleaning up...")
+        await run_in_threadpool(delete_all_vectors)
+        if UPLOAD_DIR.exists():
+            shutil.rmtree(UPLOAD_DIR)
+        print("System Ready: Clean Slate.")
     UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
-    print("System Ready: Clean Slate.")
-
     yield
 
     print("Server Shutting Down...")
+    await get_post_response_scheduler().shutdown()
+    get_ingestion_jobs().shutdown()
+    await close_http_clients()
 
 
 app = FastAPI(
@@ -44,14 +73,44 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-SESSIONS: Dict[str, Dict[str, Any]] = {}
-
-
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
 
 
+@app.post("/warmup")
+async def warmup() -> dict:
+    """Build the agents, graph, models and vector store ahead of the first question.
+
+    Call it from a readiness probe so a new replica pays its cold-start cost
+    before it takes traffic. Repeated calls are cheap.
+    """
+    seconds = await run_in_threadpool(warm_up)
+    return {"status": "ok", "seconds": seconds}
+
+
+@app.get("/cache/stats")
+async def cache_stats() -> dict:
+    """Answer and embedding cache counters, for tuning thresholds and sizing."""
+    embeddings = get_embeddings()
+    return {
+        "answer_cache": get_answer_cache().stats(),
+        "embedding_cache": embeddings.stats() if isinstance(embeddings, CachedEmbeddings) else None,
+    }
+
+
+@app.get("/verification/stats")
+async def get_verification_stats() -> dict:
+    """How often each verification path was taken and the latency skipping saved."""
+    return verification_stats.snapshot()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Node, LLM-call and vector-query latencies, token and cost counters (Prometheus text format)."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.exception_handler(Exception)
 async def unhandled_exception_handler(
         request: Request, exc: Exception
@@ -74,126 +133,373 @@ async def unhandled_exception_handler(
 
 
 @app.get("/sessions", status_code=status.HTTP_200_OK)
-async def list_sessions() -> dict:
-    session_list = []
-    for session_id, data in SESSIONS.items():
-        last_updated = data.get("last_updated")
-        if not last_updated and data.get("history"):
-            last_updated = data["history"][-1].get("timestamp")
+async def list_sessions(
+        limit: int = Query(default=50, ge=1, le=200),
+        after: str | None = None
+) -> dict:
+    """List sessions, most recently updated first, one page at a time.
+
+    Pass the returned `next_cursor` as `after` to fetch the next page; it is
+    null on the last page. History is never included here.
+    """
+    try:
+        after_key = decode_cursor(after) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    sessions, next_key = get_session_store().list_sessions(limit, after_key)
+    session_list = [
+        {
+            "id": data["id"],
+            "title": data.get("title") or "Untitled Session",
+            "last_updated": data.get("last_updated") or datetime.datetime.min.isoformat()
+        }
+        for data in sessions
+    ]
+    return {
+        "sessions": session_list,
+        "next_cursor": encode_cursor(next_key) if next_key else None
+    }
+
 
-        session_list.append({
-            "id": session_id,
-            "title": data.get("title", "Untitled Session"),
-            "last_updated": last_updated or datetime.datetime.min.isoformat()
-        })
+def _turn_range(
+        session_id: str,
+        since_turn: int,
+        limit: int | None,
+        include_context: bool,
+        workspace: str = DEFAULT_WORKSPACE
+) -> List[dict] | None:
+    """Turns numbered after `since_turn`, with `context_used` only if `include_context`.
+
+    Turns store citations of their chunks (ids, source, page) rather than the
+    chunk text; the text is looked up in the session's `workspace` and
+    formatted only when requested.
+    """
+    turns = get_session_store().get_turns(session_id, since_turn, limit)
+    if turns is None:
+        return None
+    if not include_context:
+        return [{key: value for key, value in turn.items() if key != "context_used"} for turn in turns]
 
-    session_list.sort(key=lambda x: x["last_updated"], reverse=True)
-    return {"sessions": session_list}
+    ids = [chunk["id"] for turn in turns for chunk in turn.get("chunks") or [] if chunk.get("id")]
+    docs = {doc.id: doc for doc in get_chunks(list(dict.fromkeys(ids)), workspace)} if ids else {}
+
+    def with_context(turn: Dict[str, Any]) -> Dict[str, Any]:
+        if "context_used" in turn:
+            return turn
+        chunks = [
+            {**chunk, "text": docs[chunk["id"]].page_content.strip()}
+            for chunk in turn.get("chunks") or [] if chunk.get("id") in docs
+        ]
+        return {**turn, "context_used": "\n\n".join(format_chunks(chunks))}
+
+    return [with_context(turn) for turn in turns]
 
 
 @app.get("/sessions/{session_id}", status_code=status.HTTP_200_OK)
-async def get_session(session_id: str) -> dict:
-    if session_id not in SESSIONS:
+async def get_session(
+        session_id: str,
+        include_history: bool = True,
+        since_turn: int = Query(default=0, ge=0),
+        limit: int | None = Query(default=None, ge=1),
+        include_context: bool = False
+) -> dict:
+    """Session details plus the turns numbered after `since_turn` (up to `limit`).
+
+    `include_history=false` returns only the metadata and `turn_count`, and
+    `include_context=true` adds each turn's chunk text as `context_used`.
+    `pending` lists post-response work ("title", "memory") whose result has
+    not landed yet.
+    """
+    session_data = get_session_store().get_meta(session_id)
+    if session_data is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    session_data = SESSIONS[session_id]
-    return {
+    response = {
         "id": session_id,
         "title": session_data.get("title"),
-        "history": session_data.get("history", []),
+        "workspace": session_data.get("workspace", DEFAULT_WORKSPACE),
         "conversation_summary": session_data.get("conversation_summary"),
-        "last_updated": session_data.get("last_updated")
+        "last_updated": session_data.get("last_updated"),
+        "turn_count": session_data.get("turn_count", 0),
+        "pending": get_post_response_scheduler().pending(session_id)
     }
+    if include_history:
+        response["history"] = await run_in_threadpool(
+            _turn_range, session_id, since_turn, limit, include_context,
+            session_data.get("workspace", DEFAULT_WORKSPACE)
+        ) or []
+    return response
 
 
 @app.delete("/sessions/{session_id}", status_code=status.HTTP_200_OK)
 async def delete_session(session_id: str) -> dict:
-    if session_id in SESSIONS:
-        del SESSIONS[session_id]
-        return {"message": "Session deleted successfully"}
+    store = get_session_store()
+    async with store.lock(session_id):
+        if store.delete(session_id):
+            return {"message": "Session deleted successfully"}
     raise HTTPException(status_code=404, detail="Session not found")
 
 
-@app.post("/qa/conversation", response_model=ConversationalQAResponse)
-async def conversational_qa(payload: ConversationalQARequest) -> ConversationalQAResponse:
-    question = payload.question.strip()
-    session_id = payload.session_id
-
-    history_list = []
-    if session_id and session_id in SESSIONS:
-        history_list = SESSIONS[session_id]["history"]
-
-    final_state = run_conversational_qa_flow(
-        question=question,
-        history=history_list,
-        session_id=session_id
-    )
-
+async def _record_turn(
+        question: str,
+        final_state: Dict[str, Any],
+        session: Dict[str, Any] | None,
+        include_history: bool = False,
+        include_timings: bool = False
+) -> ConversationalQAResponse:
+    """Commit a finished QA run to its session and build the API response.
+
+    The response carries only the new turn unless `include_history` is set,
+    and the run's timing breakdown only if `include_timings` is set.
+    On a session's first turn the title is generated after the response (the
+    session keeps its placeholder title until then), and memory folding is
+    scheduled after every turn. Must be called while holding the session's lock.
+    """
     new_answer = final_state.get("answer", "")
     current_session_id = final_state.get("session_id")
     used_history = final_state.get("used_history", False)
     timestamp = datetime.datetime.now().isoformat()
 
-    if current_session_id not in SESSIONS:
-        SESSIONS[current_session_id] = {
-            "title": "New Chat",
-            "history": [],
-            "conversation_summary": None,
-            "last_updated": timestamp
-        }
+    if session is None:
+        session = new_session(timestamp, final_state["workspace"])
 
-    if len(SESSIONS[current_session_id]["history"]) == 0:
-        try:
-            new_title = generate_chat_title(question, new_answer)
-            SESSIONS[current_session_id]["title"] = new_title
-        except Exception as e:
-            print(f"Title generation failed: {e}")
-            SESSIONS[current_session_id]["title"] = "New Conversation"
+    if len(session["history"]) == 0:
+        get_post_response_scheduler().schedule(
+            current_session_id, "title", lambda: _generate_session_title(current_session_id, question, new_answer)
+        )
 
     new_turn = {
-        "turn": len(SESSIONS[current_session_id]["history"]) + 1,
+        "turn": len(session["history"]) + 1,
         "question": question,
         "answer": new_answer,
-        "context_used": final_state.get("context", ""),
+        "chunks": citations(final_state.get("chunks") or []),
         "used_history": used_history,
+        "prompt_tokens": final_state.get("prompt_tokens", {}),
+        "verification_path": final_state.get("verification_path"),
         "timestamp": timestamp
     }
 
-    SESSIONS[current_session_id]["history"].append(new_turn)
-    SESSIONS[current_session_id]["last_updated"] = timestamp
-
-    if final_state.get("conversation_summary"):
-        SESSIONS[current_session_id]["conversation_summary"] = final_state.get("conversation_summary")
+    session["history"].append(new_turn)
+    session["last_updated"] = timestamp
+    get_session_store().save(current_session_id, session)
+    get_post_response_scheduler().schedule(
+        current_session_id, "memory", lambda: _fold_session_memory(current_session_id)
+    )
 
     return ConversationalQAResponse(
         answer=new_answer,
         session_id=current_session_id,
-        session_title=SESSIONS[current_session_id]["title"],
-        history=SESSIONS[current_session_id]["history"],
-        conversation_summary=final_state.get("conversation_summary")
+        workspace=final_state["workspace"],
+        session_title=session["title"],
+        history=session["history"] if include_history else [new_turn],
+        turn_count=len(session["history"]),
+        conversation_summary=session.get("conversation_summary"),
+        prompt_tokens=final_state.get("prompt_tokens", {}),
+        verification_path=final_state.get("verification_path"),
+        timings=final_state.get("timings") if include_timings else None
+    )
+
+
+def _check_workspace(session: Dict[str, Any] | None, workspace: str) -> None:
+    """Reject a turn asked in another workspace than the session's own."""
+    if session is not None and session.get("workspace", DEFAULT_WORKSPACE) != workspace:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Session belongs to workspace '{session.get('workspace', DEFAULT_WORKSPACE)}'.",
+        )
+
+
+def _flow_inputs(session: Dict[str, Any] | None) -> Dict[str, Any]:
+    """History, rolling summary and fold offset to seed a new run with."""
+    session = session or {}
+    return {
+        "history": session.get("history") or [],
+        "conversation_summary": session.get("conversation_summary"),
+        "summarized_turns": session.get("summarized_turns", 0),
+    }
+
+
+async def _generate_session_title(session_id: str, question: str, answer: str) -> None:
+    """Post-response task: title a new session from its first turn."""
+    try:
+        with request_trace():
+            title = await timed_node("title", agenerate_chat_title)(question, answer)
+    except Exception as e:
+        print(f"Title generation failed: {e}")
+        title = "New Conversation"
+
+    store = get_session_store()
+    async with store.lock(session_id):
+        session = store.get(session_id)
+        if session is None:
+            return
+        session["title"] = title
+        store.save(session_id, session)
+
+
+async def _fold_session_memory(session_id: str) -> None:
+    """Post-response task: fold older turns into the session summary.
+
+    The LLM call happens outside the session lock; if another fold for the
+    same session finished first, the result is discarded instead of
+    overwriting newer memory.
+    """
+    store = get_session_store()
+    session = store.get(session_id)
+    if session is None:
+        return
+
+    start = session.get("summarized_turns", 0)
+    update = await arun_memory_summarization(
+        history=session["history"],
+        conversation_summary=session.get("conversation_summary"),
+        summarized_turns=start
+    )
+
+    if not update:
+        return
+    async with store.lock(session_id):
+        current = store.get(session_id)
+        if current is None or current.get("summarized_turns", 0) != start:
+            return
+        current["conversation_summary"] = update["conversation_summary"]
+        current["summarized_turns"] = update["summarized_turns"]
+        store.save(session_id, current)
+
+
+@app.post("/qa/conversation", response_model=ConversationalQAResponse)
+async def conversational_qa(payload: ConversationalQARequest) -> ConversationalQAResponse:
+    question = payload.question.strip()
+    session_id = payload.session_id or generate_session_id()
+    store = get_session_store()
+
+    async with store.lock(session_id):
+        session = store.get(session_id)
+        _check_workspace(session, payload.workspace)
+        final_state = await arun_conversational_qa_flow(
+            question=question,
+            session_id=session_id,
+            workspace=payload.workspace,
+            **_flow_inputs(session)
+        )
+        return await _record_turn(
+            question, final_state, session, payload.include_history, payload.include_timings
+        )
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/qa/conversation/stream")
+async def conversational_qa_stream(payload: ConversationalQARequest) -> StreamingResponse:
+    """Stream a conversational answer as Server-Sent Events.
+
+    Events:
+    - `node`: a pipeline stage finished (`{"node": "retrieval"}`).
+    - `token`: a piece of the final answer (`{"content": "..."}`).
+    - `done`: the turn was saved; carries the same body as `/qa/conversation`.
+    - `error`: the run failed and nothing was saved.
+    """
+    question = payload.question.strip()
+    session_id = payload.session_id or generate_session_id()
+    store = get_session_store()
+    _check_workspace(store.get_meta(session_id), payload.workspace)
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async with store.lock(session_id):
+                session = store.get(session_id)
+                async for event in astream_conversational_qa_flow(
+                        question=question,
+                        session_id=session_id,
+                        workspace=payload.workspace,
+                        **_flow_inputs(session)
+                ):
+                    if event["event"] == "node":
+                        yield _sse("node", {"node": event["node"]})
+                    elif event["event"] == "token":
+                        yield _sse("token", {"content": event["content"]})
+                    elif event["event"] == "final":
+                        response = await _record_turn(
+                            question, event["state"], session, payload.include_history, payload.include_timings
+                        )
+                        yield _sse("done", response.model_dump())
+        except Exception as e:
+            print(f"Streaming QA failed: {e}")
+            yield _sse("error", {"detail": "Internal server error"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @app.get("/qa/session/{session_id}/history", response_model=ConversationHistory)
-async def get_conversation_history(session_id: str) -> ConversationHistory:
-    if session_id not in SESSIONS:
+async def get_conversation_history(
+        session_id: str,
+        since_turn: int = Query(default=0, ge=0),
+        limit: int | None = Query(default=None, ge=1),
+        include_context: bool = False
+) -> ConversationHistory:
+    """Turns numbered after `since_turn` (up to `limit`); see `get_session`."""
+    session_data = get_session_store().get_meta(session_id)
+    if session_data is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
     return ConversationHistory(
         session_id=session_id,
-        history=SESSIONS[session_id]["history"]
+        history=await run_in_threadpool(
+            _turn_range, session_id, since_turn, limit, include_context,
+            session_data.get("workspace", DEFAULT_WORKSPACE)
+        ) or [],
+        turn_count=session_data.get("turn_count", 0)
     )
 
 
-@app.post("/index-pdf", status_code=status.HTTP_200_OK)
-async def index_pdf(file: UploadFile = File(...)) -> dict:
-    """Upload a PDF and index it into the vector database.
+@app.get("/chunks", status_code=status.HTTP_200_OK)
+async def get_chunk_text(
+        ids: List[str] = Query(...),
+        workspace: str = Query(default=DEFAULT_WORKSPACE, pattern=WORKSPACE_PATTERN)
+) -> dict:
+    """Text of chunks indexed in `workspace` by id, for rendering the citations of a turn.
+
+    Chunks deleted since the turn was recorded are left out.
+    """
+    docs = await run_in_threadpool(get_chunks, ids, workspace)
+    return {
+        "chunks": [
+            {
+                "id": doc.id,
+                "source": doc.metadata.get("source"),
+                "page": doc.metadata.get("page"),
+                "text": doc.page_content
+            }
+            for doc in docs
+        ]
+    }
+
+
+def _save_upload(file: UploadFile, file_path: Path) -> None:
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+
+
+@app.post("/index-pdf", status_code=status.HTTP_202_ACCEPTED)
+async def index_pdf(
+        file: UploadFile = File(...),
+        workspace: str = Query(default=DEFAULT_WORKSPACE, pattern=WORKSPACE_PATTERN)
+) -> dict:
+    """Upload a PDF and queue it for indexing into the vector database.
 
     This endpoint:
-    - Accepts a PDF file upload
-    - Saves it to the local `data/uploads/` directory
-    - Uses PyPDFLoader to load the document into LangChain `Document` objects
-    - Indexes those documents into the configured Pinecone vector store
+    - Accepts a PDF file upload for `workspace`
+    - Saves it to the workspace's directory under `UPLOAD_DIR`
+    - Queues a background job that parses, splits, embeds and upserts it
+    - Returns the job id immediately; poll `/jobs/{job_id}` for progress
     """
     if file.content_type != "application/pdf":
         raise HTTPException(
@@ -201,35 +507,56 @@ async def index_pdf(file: UploadFile = File(...)) -> dict:
             detail="Only PDF files are supported.",
         )
 
-    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-    file_path = UPLOAD_DIR / file.filename
+    upload_dir = _upload_dir(workspace)
+    upload_dir.mkdir(parents=True, exist_ok=True)
 
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    file_path = upload_dir / file.filename
 
-    chunks_indexed = index_documents(file_path)
+    try:
+        # The upload is only saved once the job has a queue slot, so a
+        # rejected upload neither shows up under /documents nor replaces
+        # an indexed file of the same name.
+        job = await run_in_threadpool(
+            get_ingestion_jobs().submit, file_path, workspace, lambda: _save_upload(file, file_path)
+        )
+    except IngestionQueueFullError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
 
     return {
+        "job_id": job.id,
         "filename": file.filename,
-        "chunks_indexed": chunks_indexed,
-        "message": "PDF indexed successfully.",
+        "workspace": workspace,
+        "status": job.status,
+        "message": "PDF queued for indexing.",
     }
 
 
+@app.get("/jobs/{job_id}", status_code=status.HTTP_200_OK)
+async def get_job(job_id: str) -> dict:
+    """Report an ingestion job's status, phase, chunk counts and throughput."""
+    job = get_ingestion_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
 @app.get("/documents", status_code=status.HTTP_200_OK)
-async def list_documents() -> dict:
+async def list_documents(workspace: str = Query(default=DEFAULT_WORKSPACE, pattern=WORKSPACE_PATTERN)) -> dict:
+    upload_dir = _upload_dir(workspace)
     files = []
-    if UPLOAD_DIR.exists():
-        files = [f.name for f in UPLOAD_DIR.glob("*.pdf")]
-    return {"documents": files}
+    if upload_dir.exists():
+        files = [f.name for f in upload_dir.glob("*.pdf")]
+    return {"workspace": workspace, "documents": files}
 
 
 @app.delete("/documents/{filename}", status_code=status.HTTP_200_OK)
-async def delete_document(filename: str) -> dict:
-    file_path = UPLOAD_DIR / filename
+async def delete_document(
+        filename: str,
+        workspace: str = Query(default=DEFAULT_WORKSPACE, pattern=WORKSPACE_PATTERN)
+) -> dict:
+    file_path = _upload_dir(workspace) / filename
 
-    success = delete_document_vectors(file_path)
+    success = await run_in_threadpool(delete_document_vectors, file_path, workspace)
 
     if file_path.exists():
         try:
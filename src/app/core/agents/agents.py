@@ -1,22 +1,42 @@
 """Agent implementations for the multi-agent RAG flow."""
 
+import re
+import time
+from functools import lru_cache
 from typing import List
 
-from langchain.agents import create_agent
 from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate  # <--- NEW IMPORT
 from pydantic import BaseModel, Field  # <--- NEW IMPORTS
 
+from .budget import AGENT_BUDGETS, count_tokens, fit_chunks, fit_turns, format_turn, truncate_tokens
+from .grounding import GroundingReport, check_grounding, keywords, verification_stats
 from .prompts import (
     RETRIEVAL_SYSTEM_PROMPT,
     SUMMARIZATION_SYSTEM_PROMPT,
     VERIFICATION_SYSTEM_PROMPT,
     MEMORY_SUMMARIZATION_SYSTEM_PROMPT,
+    QUERY_REWRITE_PROMPT,
     TITLE_GENERATION_PROMPT,
 )
 from .state import QAState
 from .tools import retrieval_tool
-from ..llm.factory import create_chat_model
+from ..config import get_settings
+from ..llm.factory import get_chat_model
+from ..retrieval.serialization import chunk_refs, format_chunks
+from ..retrieval.vector_store import aretrieve, aretrieve_many, retrieve, retrieve_many
+
+# Words that usually point back at an earlier turn ("What are its advantages?").
+_REFERENCE_PATTERN = re.compile(
+    r"\b(it|its|they|them|their|this|that|these|those|he|she|his|her|"
+    r"above|previous|earlier|former|latter|mentioned|same|more|else)\b",
+    re.IGNORECASE,
+)
+
+# Technical terms worth a search of their own: acronyms and mixed-case or
+# numbered names such as "HNSW", "IVF-PQ", "DiskANN" or "BM25".
+_TERM_PATTERN = re.compile(r"\b[A-Za-z][a-z]*[A-Z0-9][A-Za-z0-9]*(?:-[A-Za-z0-9]+)*\b")
 
 
 def _extract_last_ai_content(messages: List[object]) -> str:
@@ -32,12 +52,74 @@ def _format_history(history: List[dict] | None) -> str:
     if not history:
         return "No previous conversation history."
 
-    formatted_turns = []
-    for entry in history:
-        turn_str = f"User: {entry.get('question', '')}\nAssistant: {entry.get('answer', '')}"
-        formatted_turns.append(turn_str)
+    return "\n\n".join(
+        format_turn(entry.get("question", ""), entry.get("answer", ""))[0] for entry in history
+    )
+
+
+def _conversation_context(state: QAState, agent: str) -> str:
+    """Rolling summary plus the recent, not-yet-summarized turns.
+
+    Both parts are cut to `agent`'s prompt budget: the summary is truncated
+    and the oldest turns are dropped first.
+    """
+    budget = AGENT_BUDGETS[agent]
+    history = state.get("history") or []
+    recent = history[state.get("summarized_turns") or 0:][-get_settings().memory_max_recent_turns:]
+    turns = fit_turns(recent, budget.history)
+    history_str = "\n\n".join(turns) if turns else "No previous conversation history."
+    summary = truncate_tokens(state.get("conversation_summary") or "", budget.summary)
+
+    if not summary:
+        return history_str
+    return f"Summary of earlier conversation:\n{summary}\n\nRecent turns:\n{history_str}"
+
+
+def _budgeted_context(state: QAState, agent: str) -> str:
+    """Retrieved chunks cut to `agent`'s context budget, lowest-ranked dropped first."""
+    budget = AGENT_BUDGETS[agent].context
+    return "\n\n".join(fit_chunks(format_chunks(state.get("chunks") or []), budget))
 
-    return "\n\n".join(formatted_turns)
+
+def _retrieved(docs: List[object]) -> QAState:
+    """State updates for freshly retrieved documents."""
+    return {
+        "chunks": chunk_refs(docs or []),
+        "sources": _sources(docs),
+    }
+
+
+def _prompt_tokens(node: str, payload: dict) -> QAState:
+    """Record how many tokens `node` assembled into its LLM input."""
+    parts = []
+    for key, value in payload.items():
+        if key == "messages":
+            parts.extend(str(message.content) for message in value)
+        elif isinstance(value, str):
+            parts.append(value)
+    return {"prompt_tokens": {node: sum(count_tokens(part) for part in dict.fromkeys(parts))}}
+
+
+def _sources(docs: List[object]) -> List[str]:
+    """Distinct `source` metadata values of retrieved documents, in rank order."""
+    sources = []
+    for doc in docs or []:
+        source = getattr(doc, "metadata", {}).get("source")
+        if source and source not in sources:
+            sources.append(source)
+    return sources
+
+
+def is_follow_up(question: str, history: List[dict] | None) -> bool:
+    """Heuristically decide whether a question depends on earlier turns.
+
+    Without history every question is self-contained. Otherwise a question
+    that uses referring words, or is too short to stand on its own
+    ("And the cons?"), is treated as a follow-up.
+    """
+    if not history:
+        return False
+    return bool(_REFERENCE_PATTERN.search(question)) or len(question.split()) <= 3
 
 
 class SummarizationOutput(BaseModel):
@@ -55,94 +137,245 @@ class SummarizationOutput(BaseModel):
     )
 
 
-# Define agents at module level for reuse
-retrieval_agent = create_agent(
-    model=create_chat_model(),
-    tools=[retrieval_tool],
-    system_prompt=RETRIEVAL_SYSTEM_PROMPT,
-)
+# Tag carried by LLM runs whose tokens form the user-facing answer, so
+# streaming consumers can pick them out of the graph's message stream.
+FINAL_ANSWER_TAG = "final_answer"
 
-verification_agent = create_agent(
-    model=create_chat_model(),
-    tools=[],
-    system_prompt=VERIFICATION_SYSTEM_PROMPT,
-)
+# Agents and chains are built on first use and reused afterwards, so importing
+# this module (and starting the server) does not construct any of them.
+def _create_agent(**kwargs):
+    # `langchain.agents` pulls in most of LangChain; import it on first use.
+    from langchain.agents import create_agent
 
-memory_summarization_agent = create_agent(
-    model=create_chat_model(),
-    tools=[],
-    system_prompt=MEMORY_SUMMARIZATION_SYSTEM_PROMPT,
-)
+    return create_agent(**kwargs)
 
-title_agent = create_agent(
-    model=create_chat_model(),
-    tools=[],
-    system_prompt=TITLE_GENERATION_PROMPT,
-)
 
-summarization_llm = create_chat_model()
-summarization_prompt = ChatPromptTemplate.from_messages([
-    ("system", SUMMARIZATION_SYSTEM_PROMPT),
-    ("human", "Question: {question}\n\nContext:\n{context}")
-])
-summarization_chain = summarization_prompt | summarization_llm.with_structured_output(SummarizationOutput)
+@lru_cache(maxsize=1)
+def get_retrieval_agent():
+    return _create_agent(
+        model=get_chat_model(),
+        tools=[retrieval_tool],
+        system_prompt=RETRIEVAL_SYSTEM_PROMPT,
+    )
 
 
-def retrieval_node(state: QAState) -> QAState:
-    """Retrieval Agent node: gathers context from vector store.
+@lru_cache(maxsize=1)
+def get_verification_agent():
+    return _create_agent(
+        model=get_chat_model(),
+        tools=[],
+        system_prompt=VERIFICATION_SYSTEM_PROMPT,
+    ).with_config(tags=[FINAL_ANSWER_TAG])
 
-    This node:
-    - Formats history for context-aware retrieval.
-    - Sends the user's question + history to the Retrieval Agent.
-    - The agent uses the attached retrieval tool to fetch document chunks.
-    - Stores the consolidated context string in `state["context"]`.
-    """
+
+@lru_cache(maxsize=1)
+def get_memory_summarization_agent():
+    return _create_agent(
+        model=get_chat_model(),
+        tools=[],
+        system_prompt=MEMORY_SUMMARIZATION_SYSTEM_PROMPT,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_title_agent():
+    return _create_agent(
+        model=get_chat_model(),
+        tools=[],
+        system_prompt=TITLE_GENERATION_PROMPT,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_summarization_chain():
+    summarization_prompt = ChatPromptTemplate.from_messages([
+        ("system", SUMMARIZATION_SYSTEM_PROMPT),
+        ("human", "Question: {question}\n\nContext:\n{context}")
+    ])
+    return summarization_prompt | get_chat_model().with_structured_output(SummarizationOutput)
+
+
+@lru_cache(maxsize=1)
+def get_query_rewrite_chain():
+    query_rewrite_prompt = ChatPromptTemplate.from_messages([
+        ("system", QUERY_REWRITE_PROMPT),
+        ("human", "Follow-up question: {question}")
+    ])
+    return query_rewrite_prompt | get_chat_model() | StrOutputParser()
+
+
+def build_agents() -> None:
+    """Build every agent and chain now instead of on the first request."""
+    get_retrieval_agent()
+    get_verification_agent()
+    get_memory_summarization_agent()
+    get_title_agent()
+    get_summarization_chain()
+    get_query_rewrite_chain()
+
+
+def _retrieval_input(state: QAState) -> dict:
+    """Build the Retrieval Agent payload from the current state."""
     question = state["question"]
-    history_str = _format_history(state.get("history"))
+    history_str = _conversation_context(state, "retrieval")
 
     # We must pass 'question' and 'history' to fill the prompt variables
-    result = retrieval_agent.invoke({
+    return {
         "messages": [HumanMessage(content=question)],
         "question": question,
         "history": history_str
-    })
+    }
 
+
+def _workspace_config(state: QAState) -> dict:
+    """Run config telling `retrieval_tool` which workspace to search."""
+    return {"configurable": {"workspace": state["workspace"]}}
+
+
+def _retrieval_output(result: dict) -> QAState:
+    """Pull the retrieved chunks out of the Retrieval Agent's messages."""
     messages = result.get("messages", [])
-    context = ""
 
-    # Prefer the last ToolMessage content (from retrieval_tool)
+    # Prefer the last ToolMessage artifact (from retrieval_tool)
     for msg in reversed(messages):
         if isinstance(msg, ToolMessage):
-            context = str(msg.content)
-            break
+            return _retrieved(msg.artifact)
+
+    return _retrieved([])
+
+
+def retrieval_node(state: QAState) -> QAState:
+    """Retrieval Agent node: gathers context from vector store.
+
+    This node:
+    - Formats history for context-aware retrieval.
+    - Sends the user's question + history to the Retrieval Agent.
+    - The agent uses the attached retrieval tool to fetch document chunks.
+    - Stores the retrieved chunks in `state["chunks"]`.
+    """
+    payload = _retrieval_input(state)
+    result = get_retrieval_agent().invoke(payload, config=_workspace_config(state))
+    return {**_retrieval_output(result), **_prompt_tokens("retrieval", payload)}
 
+
+async def aretrieval_node(state: QAState) -> QAState:
+    """Async variant of `retrieval_node`."""
+    payload = _retrieval_input(state)
+    result = await get_retrieval_agent().ainvoke(payload, config=_workspace_config(state))
+    return {**_retrieval_output(result), **_prompt_tokens("retrieval", payload)}
+
+
+def _rewrite_input(state: QAState) -> dict:
     return {
-        "context": context,
+        "history": _conversation_context(state, "query_rewrite"),
+        "question": state["question"]
     }
 
 
-def summarization_node(state: QAState) -> QAState:
-    """Summarization Agent node: generates draft answer from context.
+def direct_retrieval_node(state: QAState) -> QAState:
+    """Direct retrieval node: searches the vector store without an agent loop.
 
     This node:
-    - Sends question + context + history to the Summarization Agent.
-    - Agent responds with a draft answer grounded in context and previous turns.
-    - Stores the draft answer in `state["draft_answer"]`.
+    - Searches with the question as-is when it is self-contained (no LLM call).
+    - Otherwise rewrites the follow-up into a standalone query with a single
+      LLM call that sees the conversation history, then searches with it.
+    - Stores the retrieved chunks in `state["chunks"]`.
+    """
+    query = state["question"]
+    tokens = {}
+    if is_follow_up(query, state.get("history")):
+        payload = _rewrite_input(state)
+        query = get_query_rewrite_chain().invoke(payload).strip() or query
+        tokens = _prompt_tokens("retrieval", payload)
+
+    docs = retrieve(query, workspace=state["workspace"])
+    return {**_retrieved(docs), **tokens}
+
+
+async def adirect_retrieval_node(state: QAState) -> QAState:
+    """Async variant of `direct_retrieval_node`."""
+    query = state["question"]
+    tokens = {}
+    if is_follow_up(query, state.get("history")):
+        payload = _rewrite_input(state)
+        query = (await get_query_rewrite_chain().ainvoke(payload)).strip() or query
+        tokens = _prompt_tokens("retrieval", payload)
+
+    docs = await aretrieve(query, workspace=state["workspace"])
+    return {**_retrieved(docs), **tokens}
+
+
+def search_queries(question: str, rewrite: str | None = None) -> List[str]:
+    """Sub-queries searched for one question by the multi-query node.
+
+    The question itself, its standalone rewrite (for follow-ups), a
+    keyword-only variant, and the technical terms it names, without
+    case-insensitive duplicates and capped at `multi_query_max_queries`.
+    """
+    resolved = rewrite or question
+    candidates = [
+        question,
+        resolved,
+        " ".join(keywords(resolved)),
+        " ".join(dict.fromkeys(_TERM_PATTERN.findall(f"{question} {resolved}"))),
+    ]
+
+    queries = {}
+    for query in candidates:
+        query = query.strip()
+        if query:
+            queries.setdefault(query.lower(), query)
+    return list(queries.values())[:get_settings().multi_query_max_queries]
+
+
+def multi_query_retrieval_node(state: QAState) -> QAState:
+    """Multi-query retrieval node: searches several phrasings of the question at once.
+
+    This node:
+    - Rewrites follow-ups into a standalone query with a single LLM call.
+    - Builds sub-queries from the question, the rewrite and their keywords.
+    - Embeds them in one batch, searches them concurrently and merges the
+      chunks, so the cost stays close to a single search.
+    - Stores the retrieved chunks in `state["chunks"]`.
     """
     question = state["question"]
-    context = state.get("context")
-    history_list = state.get("history", []) or []
-    history_str = _format_history(history_list)
+    rewrite, tokens = None, {}
+    if is_follow_up(question, state.get("history")):
+        payload = _rewrite_input(state)
+        rewrite = get_query_rewrite_chain().invoke(payload).strip()
+        tokens = _prompt_tokens("retrieval", payload)
+
+    docs = retrieve_many(search_queries(question, rewrite), workspace=state["workspace"])
+    return {**_retrieved(docs), **tokens}
 
-    result: SummarizationOutput = summarization_chain.invoke({
-        "history": history_str,
-        "question": question,
-        "context": context
-    })
 
+async def amulti_query_retrieval_node(state: QAState) -> QAState:
+    """Async variant of `multi_query_retrieval_node`."""
+    question = state["question"]
+    rewrite, tokens = None, {}
+    if is_follow_up(question, state.get("history")):
+        payload = _rewrite_input(state)
+        rewrite = (await get_query_rewrite_chain().ainvoke(payload)).strip()
+        tokens = _prompt_tokens("retrieval", payload)
+
+    docs = await aretrieve_many(search_queries(question, rewrite), workspace=state["workspace"])
+    return {**_retrieved(docs), **tokens}
+
+
+def _summarization_input(state: QAState) -> dict:
+    """Build the Summarization chain variables from the current state."""
+    return {
+        "history": _conversation_context(state, "summarization"),
+        "question": state["question"],
+        "context": _budgeted_context(state, "summarization")
+    }
+
+
+def _summarization_output(state: QAState, result: SummarizationOutput) -> QAState:
+    """Map the structured summarization output onto state updates."""
     used_history = result.used_history
 
-    if not history_list:
+    if not state.get("history"):
         used_history = False
 
     return {
@@ -151,18 +384,76 @@ def summarization_node(state: QAState) -> QAState:
     }
 
 
-def verification_node(state: QAState) -> QAState:
-    """Verification Agent node: verifies and corrects the draft answer.
+def summarization_node(state: QAState) -> QAState:
+    """Summarization Agent node: generates draft answer from context.
 
     This node:
-    - Sends question + context + draft_answer to the Verification Agent.
-    - Agent checks for hallucinations and unsupported claims.
-    - Stores the final verified answer in `state["answer"]`.
+    - Sends question + context + history to the Summarization Agent.
+    - Agent responds with a draft answer grounded in context and previous turns.
+    - Stores the draft answer in `state["draft_answer"]`.
+    """
+    payload = _summarization_input(state)
+    result: SummarizationOutput = get_summarization_chain().invoke(payload)
+    return {**_summarization_output(state, result), **_prompt_tokens("summarization", payload)}
+
+
+async def asummarization_node(state: QAState) -> QAState:
+    """Async variant of `summarization_node`."""
+    payload = _summarization_input(state)
+    result: SummarizationOutput = await get_summarization_chain().ainvoke(payload)
+    return {**_summarization_output(state, result), **_prompt_tokens("summarization", payload)}
+
+
+def _grounding_chunks(state: QAState) -> List[str]:
+    """The chunks the draft answer was written from."""
+    return fit_chunks(format_chunks(state.get("chunks") or []), AGENT_BUDGETS["summarization"].context)
+
+
+def _verification_plan(state: QAState) -> tuple[str, GroundingReport | None]:
+    """Pick the verification path for the draft.
+
+    - "full": the Verification Agent checks the whole draft.
+    - "skipped": the local grounding check supports enough of the draft.
+    - "targeted": the Verification Agent only checks the unsupported sentences.
+    """
+    settings = get_settings()
+    if settings.verification_mode == "always" or not state.get("draft_answer"):
+        return "full", None
+
+    report = check_grounding(
+        state["draft_answer"], _grounding_chunks(state), settings.verification_sentence_support
+    )
+    if report.score >= settings.verification_grounding_threshold:
+        return "skipped", report
+    return "targeted", report
+
+
+def _verification_input(state: QAState, report: GroundingReport | None = None) -> dict:
+    """Build the Verification Agent payload from the current state.
+
+    With a grounding `report`, only the unsupported sentences are sent for
+    checking, alongside the chunks that came closest to supporting them.
     """
     question = state["question"]
-    context = state.get("context", "")
     draft_answer = state.get("draft_answer", "")
 
+    if report is None:
+        context = _budgeted_context(state, "verification")
+        instruction = "Please verify and correct the draft answer, removing any unsupported claims."
+    else:
+        chunks = _grounding_chunks(state)
+        nearest = sorted({index for index in report.nearest_chunks if index >= 0})
+        context = "\n\n".join(
+            fit_chunks([chunks[i] for i in nearest], AGENT_BUDGETS["verification"].context)
+        ) or "No related context was retrieved."
+        flagged = "\n".join(f"- {sentence}" for sentence in report.unsupported)
+        instruction = (
+            "Only these sentences could not be matched to the context:\n"
+            f"{flagged}\n\n"
+            "Verify just these sentences, correcting or removing any unsupported claims, "
+            "and keep the rest of the draft answer unchanged."
+        )
+
     user_content = f"""Question: {question}
 
 Context:
@@ -171,50 +462,159 @@ Context:
 Draft Answer:
 {draft_answer}
 
-Please verify and correct the draft answer, removing any unsupported claims."""
+{instruction}"""
 
-    result = verification_agent.invoke(
-        {"messages": [HumanMessage(content=user_content)]}
-    )
-    messages = result.get("messages", [])
-    answer = _extract_last_ai_content(messages)
+    return {"messages": [HumanMessage(content=user_content)]}
 
+
+def _verification_output(
+        path: str, report: GroundingReport | None, answer: str, started: float, tokens: QAState
+) -> QAState:
+    verification_stats.record(path, time.perf_counter() - started)
     return {
         "answer": answer,
+        "verification_path": path,
+        "grounding_score": report.score if report is not None else None,
+        **tokens,
+    }
+
+
+def verification_node(state: QAState) -> QAState:
+    """Verification Agent node: verifies and corrects the draft answer.
+
+    This node:
+    - Scores the draft against the retrieved chunks with a local lexical check.
+    - Accepts a sufficiently grounded draft as-is (adaptive mode).
+    - Otherwise sends question + context + draft_answer to the Verification
+      Agent, pointing it at the unsupported sentences when there is a report.
+    - Stores the final answer in `state["answer"]` and the path taken in
+      `state["verification_path"]`.
+    """
+    started = time.perf_counter()
+    path, report = _verification_plan(state)
+    if path == "skipped":
+        return _verification_output(path, report, state["draft_answer"], started, {})
+
+    payload = _verification_input(state, report)
+    result = get_verification_agent().invoke(payload)
+    answer = _extract_last_ai_content(result.get("messages", []))
+    return _verification_output(path, report, answer, started, _prompt_tokens("verification", payload))
+
+
+async def averification_node(state: QAState) -> QAState:
+    """Async variant of `verification_node`."""
+    started = time.perf_counter()
+    path, report = _verification_plan(state)
+    if path == "skipped":
+        return _verification_output(path, report, state["draft_answer"], started, {})
+
+    payload = _verification_input(state, report)
+    result = await get_verification_agent().ainvoke(payload)
+    answer = _extract_last_ai_content(result.get("messages", []))
+    return _verification_output(path, report, answer, started, _prompt_tokens("verification", payload))
+
+
+def _turn_tokens(entry: dict) -> int:
+    return format_turn(entry.get("question", ""), entry.get("answer", ""))[1]
+
+
+def _memory_fold_end(state: QAState) -> int | None:
+    """Index up to which history should be folded into the summary, if at all.
+
+    Folding triggers once the unsummarized turns exceed the token budget, or
+    outnumber the `memory_max_recent_turns` that agents are sent verbatim (so
+    no turn drops out of their context unsummarized). It covers everything
+    except the newest `memory_keep_recent_turns` turns, capped at the Memory
+    Agent's history budget (the rest is folded next time).
+    """
+    settings = get_settings()
+    history = state.get("history") or []
+    start = state.get("summarized_turns") or 0
+
+    over_count = len(history) - start > settings.memory_max_recent_turns
+    over_tokens = sum(_turn_tokens(entry) for entry in history[start:]) > settings.memory_summary_trigger_tokens
+    if not (over_count or over_tokens):
+        return None
+    end = len(history) - settings.memory_keep_recent_turns
+    if end <= start:
+        return None
+
+    budget = AGENT_BUDGETS["memory"].history
+    used = _turn_tokens(history[start])
+    limit = start + 1
+    while limit < end and used + _turn_tokens(history[limit]) <= budget:
+        used += _turn_tokens(history[limit])
+        limit += 1
+    return limit
+
+
+def _memory_input(summary: str | None, turns: List[dict]) -> dict:
+    """Build the Memory Agent payload folding `turns` into `summary`."""
+    budget = AGENT_BUDGETS["memory"]
+    user_content = (
+        f"Existing summary:\n{truncate_tokens(summary or '', budget.summary) or 'None yet.'}\n\n"
+        f"New conversation turns:\n\n{truncate_tokens(_format_history(turns), budget.history)}"
+    )
+    return {"messages": [HumanMessage(content=user_content)]}
+
+
+def _memory_output(result: dict, end: int, payload: dict) -> QAState:
+    return {
+        "conversation_summary": _extract_last_ai_content(result.get("messages", [])),
+        "summarized_turns": end,
+        **_prompt_tokens("memory_summarizer", payload),
     }
 
 
 def memory_summarizer_node(state: QAState) -> QAState:
-    history = state.get("history", []) or []
+    """Memory Agent: fold older turns into the rolling conversation summary.
 
-    if len(history) > 1:
-        history_str = _format_history(history)
-        user_content = f"Summarize this conversation history:\n\n{history_str}"
+    Only the turns added since the last summary are sent, and only once they
+    exceed `memory_summary_trigger_tokens` or `memory_max_recent_turns`, so
+    per-turn cost stays flat.
+    """
+    end = _memory_fold_end(state)
+    if end is None:
+        return {}
 
-        result = memory_summarization_agent.invoke(
-            {"messages": [HumanMessage(content=user_content)]}
-        )
-        messages = result.get("messages", [])
-        summary = _extract_last_ai_content(messages)
+    turns = (state.get("history") or [])[state.get("summarized_turns") or 0:end]
+    payload = _memory_input(state.get("conversation_summary"), turns)
+    result = get_memory_summarization_agent().invoke(payload)
+    return _memory_output(result, end, payload)
 
-        return {
-            "conversation_summary": summary
-        }
 
-    return {}
+async def amemory_summarizer_node(state: QAState) -> QAState:
+    """Async variant of `memory_summarizer_node`."""
+    end = _memory_fold_end(state)
+    if end is None:
+        return {}
 
+    turns = (state.get("history") or [])[state.get("summarized_turns") or 0:end]
+    payload = _memory_input(state.get("conversation_summary"), turns)
+    result = await get_memory_summarization_agent().ainvoke(payload)
+    return _memory_output(result, end, payload)
 
-def generate_chat_title(question: str, answer: str) -> str:
+
+def _title_input(question: str, answer: str) -> dict:
     prompt_content = f"Generate a title for this:\nQuestion: {question}\nAnswer: {answer}"
+    return {"messages": [HumanMessage(content=prompt_content)]}
 
-    result = title_agent.invoke({
-        "messages": [HumanMessage(content=prompt_content)]
-    })
 
-    messages = result.get("messages", [])
-    title = _extract_last_ai_content(messages).strip('"')
+def _title_output(result: dict) -> str:
+    title = _extract_last_ai_content(result.get("messages", [])).strip('"')
 
     if not title or len(title) > 50:
         return "New Chat"
 
     return title
+
+
+def generate_chat_title(question: str, answer: str) -> str:
+    result = get_title_agent().invoke(_title_input(question, answer))
+    return _title_output(result)
+
+
+async def agenerate_chat_title(question: str, answer: str) -> str:
+    """Async variant of `generate_chat_title`."""
+    result = await get_title_agent().ainvoke(_title_input(question, answer))
+    return _title_output(result)
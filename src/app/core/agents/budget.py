@@ -0,0 +1,126 @@
+"""Token budgets for the history, summary and context parts of agent prompts."""
+
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Tuple
+
+import tiktoken
+
+_ENCODING_NAME = "cl100k_base"
+# After a failed tokenizer load, token counts are estimated for this long
+# before loading is tried again.
+_ENCODING_RETRY_SECONDS = 60.0
+
+_encoding: tiktoken.Encoding | None = None
+_encoding_retry_at = 0.0
+_encoding_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class PromptBudget:
+    """Maximum tokens an agent prompt may spend on each variable part."""
+    history: int
+    summary: int
+    context: int
+
+
+AGENT_BUDGETS = {
+    "retrieval": PromptBudget(history=600, summary=200, context=0),
+    "query_rewrite": PromptBudget(history=400, summary=200, context=0),
+    "summarization": PromptBudget(history=1200, summary=400, context=3000),
+    "verification": PromptBudget(history=0, summary=0, context=3000),
+    "memory": PromptBudget(history=3000, summary=800, context=0),
+}
+
+
+def load_encoding() -> tiktoken.Encoding | None:
+    """Load the BPE tokenizer, or return None if its data is not available yet.
+
+    The first load may download the tokenizer data, so `warm_up` calls this
+    before traffic arrives. A failed load is not kept: it is retried after
+    `_ENCODING_RETRY_SECONDS`, and while another thread is loading, callers
+    get None (an estimate) instead of waiting for it.
+    """
+    global _encoding, _encoding_retry_at
+    if _encoding is not None or time.monotonic() < _encoding_retry_at:
+        return _encoding
+    if not _encoding_lock.acquire(blocking=False):
+        return None
+    try:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding(_ENCODING_NAME)
+    except Exception as e:
+        print(f"Tokenizer unavailable, estimating token counts: {e}")
+        _encoding_retry_at = time.monotonic() + _ENCODING_RETRY_SECONDS
+    finally:
+        _encoding_lock.release()
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in `text` (a ~4 chars/token estimate without tokenizer data)."""
+    if not text:
+        return 0
+    encoding = load_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode_ordinary(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut `text` down to at most `max_tokens` tokens, keeping its beginning."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = load_encoding()
+    if encoding is None:
+        return text[:max_tokens * 4].rstrip() + " ..."
+    return encoding.decode(encoding.encode_ordinary(text)[:max_tokens]).rstrip() + " ..."
+
+
+@lru_cache(maxsize=4096)
+def format_turn(question: str, answer: str) -> Tuple[str, int]:
+    """Formatted text and token count of one turn, computed once per turn."""
+    text = f"User: {question}\nAssistant: {answer}"
+    return text, count_tokens(text)
+
+
+def fit_turns(turns: List[dict], max_tokens: int) -> List[str]:
+    """Newest turns that fit in `max_tokens`, in chronological order.
+
+    Older turns are dropped first; if even the newest turn does not fit, it is
+    truncated rather than dropped.
+    """
+    kept: List[str] = []
+    used = 0
+    for entry in reversed(turns):
+        text, tokens = format_turn(entry.get("question", ""), entry.get("answer", ""))
+        if used + tokens > max_tokens:
+            if not kept:
+                kept.append(truncate_tokens(text, max_tokens))
+            break
+        kept.append(text)
+        used += tokens
+    return kept[::-1]
+
+
+def fit_chunks(chunks: List[str], max_tokens: int) -> List[str]:
+    """Highest-ranked chunks that fit in `max_tokens`.
+
+    Chunks arrive in rank order, so the lowest-ranked ones are dropped first;
+    the top chunk is truncated rather than dropped if it alone is too long.
+    """
+    kept: List[str] = []
+    used = 0
+    for chunk in chunks:
+        tokens = count_tokens(chunk)
+        if used + tokens > max_tokens:
+            if not kept:
+                kept.append(truncate_tokens(chunk, max_tokens))
+            break
+        kept.append(chunk)
+        used += tokens
+    return kept
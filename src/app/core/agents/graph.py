@@ -1,17 +1,47 @@
 """LangGraph orchestration for the linear multi-agent QA flow."""
 
+import time
 from functools import lru_cache
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict
 
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.constants import END, START
 from langgraph.graph import StateGraph
 
-from .agents import retrieval_node, summarization_node, verification_node, memory_summarizer_node
+from .agents import (
+    FINAL_ANSWER_TAG,
+    build_agents,
+    is_follow_up,
+    retrieval_node,
+    aretrieval_node,
+    direct_retrieval_node,
+    adirect_retrieval_node,
+    multi_query_retrieval_node,
+    amulti_query_retrieval_node,
+    summarization_node,
+    asummarization_node,
+    verification_node,
+    averification_node,
+    memory_summarizer_node,
+    amemory_summarizer_node,
+)
+from .budget import load_encoding
 from .state import QAState
+from ..cache.answer_cache import get_answer_cache
+from ..config import get_settings
+from ..retrieval.vector_store import get_bm25_index, get_embeddings
+from ..telemetry import QA_REQUEST_SECONDS, RequestTrace, request_trace, timed_node, vector_timer
 from ..utils import generate_session_id
+from ..workspaces import DEFAULT_WORKSPACE
 
 
-def create_qa_graph() -> Any:
+def _timed(node: str, func, afunc) -> RunnableLambda:
+    """A graph node whose wall time and LLM calls are recorded under `node`."""
+    return RunnableLambda(timed_node(node, func), afunc=timed_node(node, afunc))
+
+
+def create_qa_graph(retrieval_mode: str | None = None) -> Any:
     """Create and compile the linear multi-agent QA graph.
 
     The graph executes in order:
@@ -19,22 +49,37 @@ def create_qa_graph() -> Any:
     2. Summarization Agent: generates draft answer from context
     3. Verification Agent: verifies and corrects the answer
 
+    Memory summarization is not part of the graph: it runs after the answer
+    is returned (see `arun_memory_summarization`).
+
+    Every node carries both a sync and an async implementation, so the same
+    compiled graph serves `invoke` and `ainvoke` without blocking the event loop.
+
+    Args:
+        retrieval_mode: "agent", "direct" or "multi_query" (defaults to `Settings.retrieval_mode`).
+
     Returns:
         Compiled graph ready for execution.
     """
+    if retrieval_mode is None:
+        retrieval_mode = get_settings().retrieval_mode
+
     builder = StateGraph(QAState)
 
     # Add nodes for each agent
-    builder.add_node("retrieval", retrieval_node)
-    builder.add_node("summarization", summarization_node)
-    builder.add_node("verification", verification_node)
-    builder.add_node("memory_summarizer", memory_summarizer_node)
+    if retrieval_mode == "direct":
+        builder.add_node("retrieval", _timed("retrieval", direct_retrieval_node, adirect_retrieval_node))
+    elif retrieval_mode == "multi_query":
+        builder.add_node("retrieval", _timed("retrieval", multi_query_retrieval_node, amulti_query_retrieval_node))
+    else:
+        builder.add_node("retrieval", _timed("retrieval", retrieval_node, aretrieval_node))
+    builder.add_node("summarization", _timed("summarization", summarization_node, asummarization_node))
+    builder.add_node("verification", _timed("verification", verification_node, averification_node))
 
     builder.add_edge(START, "retrieval")
     builder.add_edge("retrieval", "summarization")
     builder.add_edge("summarization", "verification")
-    builder.add_edge("verification", "memory_summarizer")
-    builder.add_edge("memory_summarizer", END)
+    builder.add_edge("verification", END)
 
     return builder.compile()
 
@@ -45,23 +90,223 @@ def get_qa_graph() -> Any:
     return create_qa_graph()
 
 
-def run_conversational_qa_flow(
+def warm_up() -> Dict[str, float]:
+    """Build everything a first question would otherwise build lazily.
+
+    Returns the seconds each step took; steps already done cost ~0.
+    """
+    steps = {
+        "agents": build_agents,
+        "graph": get_qa_graph,
+        "vector_store": get_embeddings,
+        "bm25_index": get_bm25_index,
+        "tokenizer": load_encoding,
+    }
+    seconds = {}
+    for name, step in steps.items():
+        started = time.perf_counter()
+        step()
+        seconds[name] = round(time.perf_counter() - started, 4)
+    return seconds
+
+
+def _initial_state(
     question: str,
     history: list[dict] | None = None,
-    session_id: str | None = None
+    session_id: str | None = None,
+    conversation_summary: str | None = None,
+    summarized_turns: int = 0,
+    workspace: str = DEFAULT_WORKSPACE
 ) -> QAState:
-    graph = get_qa_graph()
-
-    initial_state: QAState = {
+    return {
         "session_id": session_id or generate_session_id(),
+        "workspace": workspace,
         "question": question,
-        "context": None,
+        "chunks": None,
         "draft_answer": None,
         "answer": None,
         "history": history or [],
-        "conversation_summary": None
+        "conversation_summary": conversation_summary,
+        "summarized_turns": summarized_turns,
+        "sources": None,
+        "cache_hit": False,
+        "verification_path": None,
+        "grounding_score": None,
+        "prompt_tokens": {},
+        "timings": None
     }
 
-    final_state = graph.invoke(initial_state)
 
-    return final_state
+# State fields replayed from the semantic answer cache on a hit.
+_CACHED_FIELDS = ("chunks", "draft_answer", "answer", "sources")
+
+
+def _use_answer_cache(question: str, history: list[dict] | None) -> bool:
+    """Only self-contained questions are safe to answer from the cache."""
+    return get_settings().answer_cache_enabled and not is_follow_up(question, history)
+
+
+def _from_cache(state: QAState, payload: Dict[str, Any]) -> QAState:
+    return {**state, **payload, "used_history": False, "cache_hit": True}
+
+
+def _finish(trace: RequestTrace, state: QAState) -> QAState:
+    """Record the request's wall time and attach its timing breakdown."""
+    QA_REQUEST_SECONDS.observe(trace.elapsed(), cache_hit=str(bool(state.get("cache_hit"))).lower())
+    return {**state, "timings": trace.breakdown()}
+
+
+def _store_in_cache(question: str, vector: list[float], final_state: QAState) -> None:
+    if final_state.get("answer"):
+        get_answer_cache().store(
+            question,
+            vector,
+            {key: final_state.get(key) for key in _CACHED_FIELDS},
+            final_state.get("sources") or [],
+            final_state["workspace"],
+        )
+
+
+def run_conversational_qa_flow(
+    question: str,
+    history: list[dict] | None = None,
+    session_id: str | None = None,
+    conversation_summary: str | None = None,
+    summarized_turns: int = 0,
+    workspace: str = DEFAULT_WORKSPACE
+) -> QAState:
+    """Answer `question` from the documents of `workspace`."""
+    graph = get_qa_graph()
+    state = _initial_state(question, history, session_id, conversation_summary, summarized_turns, workspace)
+
+    with request_trace() as trace:
+        vector = None
+        if _use_answer_cache(question, history):
+            with vector_timer("embed"):
+                vector = get_embeddings().embed_query(question)
+            cached = get_answer_cache().lookup(vector, workspace)
+            if cached is not None:
+                return _finish(trace, _from_cache(state, cached))
+
+        final_state = graph.invoke(state)
+
+        if vector is not None:
+            _store_in_cache(question, vector, final_state)
+        return _finish(trace, final_state)
+
+
+async def arun_conversational_qa_flow(
+    question: str,
+    history: list[dict] | None = None,
+    session_id: str | None = None,
+    conversation_summary: str | None = None,
+    summarized_turns: int = 0,
+    workspace: str = DEFAULT_WORKSPACE
+) -> QAState:
+    """Async variant of `run_conversational_qa_flow` built on `graph.ainvoke`."""
+    graph = get_qa_graph()
+    state = _initial_state(question, history, session_id, conversation_summary, summarized_turns, workspace)
+
+    with request_trace() as trace:
+        vector = None
+        if _use_answer_cache(question, history):
+            with vector_timer("embed"):
+                vector = await get_embeddings().aembed_query(question)
+            cached = get_answer_cache().lookup(vector, workspace)
+            if cached is not None:
+                return _finish(trace, _from_cache(state, cached))
+
+        final_state = await graph.ainvoke(state)
+
+        if vector is not None:
+            _store_in_cache(question, vector, final_state)
+        return _finish(trace, final_state)
+
+
+async def astream_conversational_qa_flow(
+    question: str,
+    history: list[dict] | None = None,
+    session_id: str | None = None,
+    conversation_summary: str | None = None,
+    summarized_turns: int = 0,
+    workspace: str = DEFAULT_WORKSPACE
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run the QA graph and yield progress events as they happen.
+
+    Yields dictionaries with an `event` key:
+    - `node`: a top-level graph node finished (`node` holds its name).
+    - `token`: a piece of the final answer (`content` holds the text).
+    - `final`: the run is complete (`state` holds the final `QAState`).
+    """
+    graph = get_qa_graph()
+    state = _initial_state(question, history, session_id, conversation_summary, summarized_turns, workspace)
+
+    with request_trace() as trace:
+        vector = None
+        if _use_answer_cache(question, history):
+            with vector_timer("embed"):
+                vector = await get_embeddings().aembed_query(question)
+            cached = get_answer_cache().lookup(vector, workspace)
+            if cached is not None:
+                state = _finish(trace, _from_cache(state, cached))
+                yield {"event": "token", "content": state.get("answer") or ""}
+                yield {"event": "final", "state": state}
+                return
+
+        # Agents run as subgraphs inside the nodes, so their LLM tokens are only
+        # surfaced when subgraph streaming is enabled.
+        streamed = False
+        async for namespace, mode, chunk in graph.astream(
+                state, stream_mode=["updates", "messages"], subgraphs=True
+        ):
+            if mode == "updates":
+                if namespace:
+                    continue
+                for node, update in chunk.items():
+                    if update:
+                        prompt_tokens = {**state["prompt_tokens"], **update.get("prompt_tokens", {})}
+                        state.update(update, prompt_tokens=prompt_tokens)
+                    yield {"event": "node", "node": node}
+            elif mode == "messages":
+                message, metadata = chunk
+                if (
+                        FINAL_ANSWER_TAG in metadata.get("tags", [])
+                        and isinstance(message, AIMessage)
+                        and message.content
+                ):
+                    streamed = True
+                    yield {"event": "token", "content": str(message.content)}
+
+        # A draft accepted without the Verification Agent produced no final tokens.
+        if not streamed and state.get("answer"):
+            yield {"event": "token", "content": state["answer"]}
+
+        if vector is not None:
+            _store_in_cache(question, vector, state)
+        yield {"event": "final", "state": _finish(trace, state)}
+
+
+def run_memory_summarization(
+    history: list[dict],
+    conversation_summary: str | None = None,
+    summarized_turns: int = 0
+) -> Dict[str, Any]:
+    """Fold older turns into the rolling summary if the token budget is exceeded.
+
+    Returns the state updates (`conversation_summary`, `summarized_turns`),
+    or an empty dict when no folding was needed.
+    """
+    state = _initial_state("", history, None, conversation_summary, summarized_turns)
+    with request_trace():
+        return timed_node("memory_summarizer", memory_summarizer_node)(state)
+
+
+async def arun_memory_summarization(
+    history: list[dict],
+    conversation_summary: str | None = None,
+    summarized_turns: int = 0
+) -> Dict[str, Any]:
+    """Async variant of `run_memory_summarization`."""
+    state = _initial_state("", history, None, conversation_summary, summarized_turns)
+    with request_trace():
+        return await timed_node("memory_summarizer", amemory_summarizer_node)(state)
@@ -0,0 +1,138 @@
+"""Local lexical grounding check for draft answers.
+
+Scores each draft sentence by the share of its content words found in the
+best-matching retrieved chunk. It needs no model or network call, so it runs
+before the Verification Agent to decide whether the LLM pass is needed.
+`verification_stats` records which path each answer took and how long it took.
+`keywords` reuses the same stopword list to build keyword search queries.
+"""
+
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"[a-z0-9]+")
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+
+_STOPWORDS = frozenset(
+    "a an the and or but if then else of to in on at by for with from into over under about as "
+    "is are was were be been being am do does did done has have had having can could may might "
+    "must shall should will would this that these those it its they them their there here which "
+    "who whom whose what when where why how than so such not no nor only also very more most "
+    "other some any each all both few many much own same too just i we you he she our your his "
+    "her us me my mine yours".split()
+)
+
+# Sentences with fewer content words than this ("Yes.", "In short:") are not scored.
+_MIN_CONTENT_WORDS = 3
+
+
+def _content_words(text: str) -> FrozenSet[str]:
+    words = set()
+    for word in _WORD.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        # Crude plural folding so "indexes"/"index" and "vectors"/"vector" match.
+        if len(word) > 4 and word.endswith("es"):
+            word = word[:-2]
+        elif len(word) > 3 and word.endswith("s"):
+            word = word[:-1]
+        words.add(word)
+    return frozenset(words)
+
+
+def keywords(text: str) -> List[str]:
+    """Distinct content words of `text`, in order of first appearance."""
+    return list(dict.fromkeys(word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS))
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split an answer into sentences and list items."""
+    sentences = []
+    for part in _SENTENCE_SPLIT.split(text or ""):
+        part = _LIST_MARKER.sub("", part).strip()
+        if part:
+            sentences.append(part)
+    return sentences
+
+
+@dataclass
+class GroundingReport:
+    """Per-sentence support of a draft answer by the retrieved chunks."""
+    score: float
+    unsupported: List[str] = field(default_factory=list)
+    # For each unsupported sentence, the index of its best-matching chunk.
+    nearest_chunks: List[int] = field(default_factory=list)
+
+
+def check_grounding(draft: str, chunks: List[str], sentence_support: float) -> GroundingReport:
+    """Score how much of `draft` is lexically supported by `chunks`.
+
+    A sentence is supported when at least `sentence_support` of its content
+    words appear in a single chunk. `score` is the share of scored sentences
+    that are supported (1.0 when nothing needed scoring).
+    """
+    chunk_words = [_content_words(chunk) for chunk in chunks]
+    scored = 0
+    report = GroundingReport(score=1.0)
+
+    for sentence in split_sentences(draft):
+        words = _content_words(sentence)
+        if len(words) < _MIN_CONTENT_WORDS:
+            continue
+        scored += 1
+
+        best, best_index = 0.0, -1
+        for index, candidate in enumerate(chunk_words):
+            overlap = len(words & candidate) / len(words)
+            if overlap > best:
+                best, best_index = overlap, index
+
+        if best < sentence_support:
+            report.unsupported.append(sentence)
+            report.nearest_chunks.append(best_index)
+
+    if scored:
+        report.score = 1.0 - len(report.unsupported) / scored
+    return report
+
+
+class VerificationStats:
+    """Counts and latency of each verification path, to measure what skipping saves."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+        self._seconds: Dict[str, float] = {}
+
+    def record(self, path: str, seconds: float) -> None:
+        with self._lock:
+            self._counts[path] = self._counts.get(path, 0) + 1
+            self._seconds[path] = self._seconds.get(path, 0.0) + seconds
+
+    def snapshot(self) -> dict:
+        """Per-path counts and mean latency, plus the estimated seconds saved.
+
+        Savings compare each skipped or targeted run with the mean latency of
+        full verification, so they are only reported once a full run exists.
+        """
+        with self._lock:
+            counts = dict(self._counts)
+            seconds = dict(self._seconds)
+
+        paths = {
+            path: {"count": count, "mean_seconds": round(seconds[path] / count, 4)}
+            for path, count in counts.items()
+        }
+        saved = None
+        if counts.get("full"):
+            full_mean = seconds["full"] / counts["full"]
+            saved = round(sum(
+                counts[path] * full_mean - seconds[path] for path in counts if path != "full"
+            ), 3)
+        return {"paths": paths, "estimated_seconds_saved": saved}
+
+
+verification_stats = VerificationStats()
@@ -44,11 +44,23 @@ Instructions:
 - Return ONLY the final, corrected answer text (no explanations or meta-commentary).
 """
 
+QUERY_REWRITE_PROMPT = """You rewrite follow-up questions into standalone search queries.
+
+Conversation History:
+{history}
+
+Instructions:
+- Resolve pronouns and references ("it", "that method") using the conversation history.
+- Keep the technical terms needed to search the documents.
+- Return ONLY the rewritten query on a single line, with no explanations.
+"""
+
 MEMORY_SUMMARIZATION_SYSTEM_PROMPT = """You are a Memory Agent. Your job is to
-compress a long conversation history into a concise summary.
+keep a concise rolling summary of a long conversation.
 
 Instructions:
-- Read the provided conversation history.
+- You receive the existing summary (possibly empty) and the turns that happened since it was written.
+- Fold the new turns into the existing summary; do not drop earlier details that may still matter.
 - Create a summary that captures the key topics, user intent, and specific details discussed.
 - Focus on retaining technical details (like method names, comparisons, advantages) that might be referenced later.
 - The summary will be used to provide context for future turns.
@@ -1,21 +1,49 @@
 """LangGraph state schema for the multi-agent QA flow."""
 
-from typing import TypedDict
+import operator
+from typing import Annotated, TypedDict
+
+from ..retrieval.serialization import ChunkRef
 
 
 class QAState(TypedDict):
     """State schema for the linear multi-agent QA flow.
 
     The state flows through three agents:
-    1. Retrieval Agent: populates `context` from `question`
-    2. Summarization Agent: generates `draft_answer` from `question` + `context`
-    3. Verification Agent: produces final `answer` from `question` + `context` + `draft_answer`
+    1. Retrieval Agent: populates `chunks` from `question`
+    2. Summarization Agent: generates `draft_answer` from `question` + `chunks`
+    3. Verification Agent: produces final `answer` from `question` + `chunks` + `draft_answer`
+
+    `conversation_summary` covers the first `summarized_turns` entries of
+    `history`; agents see the summary plus the turns after it.
+
+    `chunks` holds every retrieved chunk in rank order as a structured
+    reference (id, source, page, offsets, score, text); each agent formats as
+    many as fit its context budget. `prompt_tokens` maps node name
+    to the input tokens that node assembled, merged across nodes.
+
+    `timings` is the request's telemetry breakdown (per node, LLM call and
+    vector phase), filled in once the run finishes.
+
+    `workspace` names the corpus the question is answered from; retrieval
+    only searches that workspace's index.
+
+    `verification_path` records how the draft was verified: "full",
+    "targeted" (only unsupported sentences) or "skipped" (grounded locally).
     """
     session_id: str | None
+    workspace: str
     question: str
-    context: str | None
+    chunks: list[ChunkRef] | None
     draft_answer: str | None
     answer: str | None
     history: list[dict] | None
     conversation_summary: str | None
+    summarized_turns: int
     used_history: bool
+    sources: list[str] | None
+    cache_hit: bool
+    verification_path: str | None
+    grounding_score: float | None
+    prompt_tokens: Annotated[dict[str, int], operator.or_]
+    timings: dict | None
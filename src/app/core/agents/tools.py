@@ -1,30 +1,39 @@
 """Tools available to agents in the multi-agent RAG system."""
 
-from langchain_core.tools import tool
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import StructuredTool
 
-from ..retrieval.vector_store import retrieve
+from ..retrieval.vector_store import aretrieve, retrieve
 from ..retrieval.serialization import serialize_chunks
+from ..workspaces import DEFAULT_WORKSPACE
 
 
-@tool(response_format="content_and_artifact")
-def retrieval_tool(query: str):
+def _workspace(config: RunnableConfig | None) -> str:
+    """Workspace the agent was invoked for, passed as `configurable["workspace"]`."""
+    return ((config or {}).get("configurable") or {}).get("workspace", DEFAULT_WORKSPACE)
+
+
+def _retrieve_chunks(query: str, config: RunnableConfig = None):
     """Search the vector database for relevant document chunks.
 
-    This tool retrieves the top 4 most relevant chunks from the Pinecone
-    vector store based on the query. The chunks are formatted with page
-    numbers and indices for easy reference.
+    This tool retrieves the top `retrieval_k` most relevant chunks from the
+    vector store (fused with keyword matches when hybrid retrieval is on)
+    based on the query. The chunks are formatted with page numbers and
+    indices for easy reference.
 
     Args:
         query: The search query string to find relevant document chunks.
+        config: Run config injected by LangChain; only the workspace's
+            documents are searched.
 
     Returns:
         Tuple of (serialized_content, artifact) where:
         - serialized_content: A formatted string containing the retrieved chunks
-          with metadata. Format: "Chunk 1 (page=X): ...\n\nChunk 2 (page=Y): ..."
+          with metadata. Format: "Chunk 1 (page=X): ...\\n\\nChunk 2 (page=Y): ..."
         - artifact: List of Document objects with full metadata for reference
     """
     # Retrieve documents from vector store
-    docs = retrieve(query, k=4)
+    docs = retrieve(query, workspace=_workspace(config))
 
     # Serialize chunks into formatted string (content)
     context = serialize_chunks(docs)
@@ -32,3 +41,18 @@ def retrieval_tool(query: str):
     # Return tuple: (serialized content, artifact documents)
     # This follows LangChain's content_and_artifact response format
     return context, docs
+
+
+async def _aretrieve_chunks(query: str, config: RunnableConfig = None):
+    """Async counterpart of `_retrieve_chunks` used when agents run via `ainvoke`."""
+    docs = await aretrieve(query, workspace=_workspace(config))
+    return serialize_chunks(docs), docs
+
+
+retrieval_tool = StructuredTool.from_function(
+    func=_retrieve_chunks,
+    coroutine=_aretrieve_chunks,
+    name="retrieval_tool",
+    response_format="content_and_artifact",
+    parse_docstring=False,
+)
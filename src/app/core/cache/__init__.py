@@ -0,0 +1,5 @@
+"""Caches that sit in front of the multi-agent QA pipeline."""
+
+from .answer_cache import SemanticAnswerCache, get_answer_cache
+
+__all__ = ["SemanticAnswerCache", "get_answer_cache"]
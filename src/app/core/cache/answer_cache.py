@@ -0,0 +1,206 @@
+"""Semantic answer cache keyed on question embeddings.
+
+Repeated questions about the same documents are answered from memory when
+a cached question's embedding is close enough (cosine similarity at or above
+a threshold). Entries are bounded by LRU + TTL eviction and remember which
+document sources produced them, so deleting one of those sources drops the
+affected answers; indexing a document drops every answer of its
+workspace, since the new document may answer any of them. Each entry
+belongs to the workspace whose documents answered it and is only ever
+served to that workspace.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List
+
+import numpy as np
+
+from ..config import get_settings
+from ..workspaces import DEFAULT_WORKSPACE
+
+
+@dataclass
+class _CacheEntry:
+    question: str
+    workspace: str
+    vector: np.ndarray
+    payload: Dict[str, Any]
+    sources: frozenset
+    created_at: float
+
+
+@dataclass
+class _CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    similarities: List[float] = field(default_factory=list)
+
+
+class SemanticAnswerCache:
+    """Thread-safe LRU + TTL cache of answers, looked up by embedding similarity."""
+
+    def __init__(
+            self,
+            similarity_threshold: float = 0.95,
+            max_entries: int = 1024,
+            ttl_seconds: float = 3600.0,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._stats = _CacheStats()
+        # Stacked unit vectors for a single matrix-vector similarity pass;
+        # rebuilt lazily after the entry set changes.
+        self._matrix: np.ndarray | None = None
+        self._matrix_ids: List[int] = []
+        self._matrix_workspaces: np.ndarray = np.empty(0, dtype=object)
+
+    @staticmethod
+    def _normalize(vector: Iterable[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def _expire(self) -> None:
+        cutoff = self._clock() - self.ttl_seconds
+        expired = [key for key, entry in self._entries.items() if entry.created_at < cutoff]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._stats.expirations += len(expired)
+            self._matrix = None
+
+    def _similarity_matrix(self) -> np.ndarray:
+        if self._matrix is None:
+            self._matrix_ids = list(self._entries.keys())
+            self._matrix = np.stack([self._entries[key].vector for key in self._matrix_ids])
+            self._matrix_workspaces = np.array(
+                [self._entries[key].workspace for key in self._matrix_ids], dtype=object
+            )
+        return self._matrix
+
+    def lookup(self, vector: Iterable[float], workspace: str = DEFAULT_WORKSPACE) -> Dict[str, Any] | None:
+        """Return the cached payload for the most similar question asked in `workspace`, if any."""
+        query = self._normalize(vector)
+        with self._lock:
+            self._expire()
+            if not self._entries:
+                self._stats.misses += 1
+                return None
+
+            similarities = self._similarity_matrix() @ query
+            in_workspace = self._matrix_workspaces == workspace
+            if not in_workspace.any():
+                self._stats.misses += 1
+                return None
+
+            similarities[~in_workspace] = -np.inf
+            best = int(np.argmax(similarities))
+            score = float(similarities[best])
+            self._stats.similarities = (self._stats.similarities + [score])[-1000:]
+
+            if score < self.similarity_threshold:
+                self._stats.misses += 1
+                return None
+
+            key = self._matrix_ids[best]
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return dict(self._entries[key].payload)
+
+    def store(
+            self,
+            question: str,
+            vector: Iterable[float],
+            payload: Dict[str, Any],
+            sources: Iterable[str],
+            workspace: str = DEFAULT_WORKSPACE,
+    ) -> None:
+        """Cache an answer along with the workspace and document sources it was built from."""
+        entry = _CacheEntry(
+            question=question,
+            workspace=workspace,
+            vector=self._normalize(vector),
+            payload=dict(payload),
+            sources=frozenset(sources),
+            created_at=self._clock(),
+        )
+        with self._lock:
+            self._entries[self._next_id] = entry
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+            self._matrix = None
+
+    def invalidate_source(self, source: str, workspace: str = DEFAULT_WORKSPACE) -> int:
+        """Drop every entry of `workspace` whose answer used `source`. Returns the number dropped."""
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if entry.workspace == workspace and source in entry.sources
+            ]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._stats.invalidations += len(stale)
+                self._matrix = None
+            return len(stale)
+
+    def clear(self, workspace: str | None = None) -> None:
+        """Drop every cached answer of `workspace`, or all of them (e.g. after an index is wiped)."""
+        with self._lock:
+            if workspace is None:
+                self._stats.invalidations += len(self._entries)
+                self._entries.clear()
+            else:
+                stale = [key for key, entry in self._entries.items() if entry.workspace == workspace]
+                for key in stale:
+                    del self._entries[key]
+                self._stats.invalidations += len(stale)
+            self._matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus the recent similarity distribution for tuning."""
+        with self._lock:
+            lookups = self._stats.hits + self._stats.misses
+            similarities = self._stats.similarities
+            return {
+                "hits": self._stats.hits,
+                "misses": self._stats.misses,
+                "hit_rate": self._stats.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "evictions": self._stats.evictions,
+                "expirations": self._stats.expirations,
+                "invalidations": self._stats.invalidations,
+                "similarity_threshold": self.similarity_threshold,
+                "similarity_p50": float(np.percentile(similarities, 50)) if similarities else None,
+                "similarity_p90": float(np.percentile(similarities, 90)) if similarities else None,
+            }
+
+
+_answer_cache: SemanticAnswerCache | None = None
+
+
+def get_answer_cache() -> SemanticAnswerCache:
+    """Get the process-wide answer cache (singleton pattern)."""
+    global _answer_cache
+    if _answer_cache is None:
+        settings = get_settings()
+        _answer_cache = SemanticAnswerCache(
+            similarity_threshold=settings.answer_cache_similarity_threshold,
+            max_entries=settings.answer_cache_max_entries,
+            ttl_seconds=settings.answer_cache_ttl_seconds,
+        )
+    return _answer_cache
@@ -0,0 +1,66 @@
+"""Process-wide HTTP clients shared by every agent and vector operation.
+
+Each `ChatOpenAI` / `OpenAIEmbeddings` instance would otherwise hold its own
+connection pool, and every new pool pays the TCP and TLS handshakes again.
+Instead, all OpenAI calls go through one sync and one async `httpx` client
+with explicit limits and keep-alive, and Pinecone is reached through a single
+client and index handle whose urllib3 pool is sized the same way.
+"""
+
+from functools import lru_cache
+
+import httpx
+
+from .config import get_settings
+
+
+def _timeout() -> httpx.Timeout:
+    settings = get_settings()
+    return httpx.Timeout(settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds)
+
+
+def _limits(max_connections: int) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=get_settings().http_keepalive_expiry_seconds,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    """Shared sync client, with room for every ingestion worker's in-flight batches."""
+    settings = get_settings()
+    ingestion_calls = settings.ingestion_max_workers * settings.ingestion_max_in_flight
+    max_connections = max(settings.http_sync_max_connections, ingestion_calls)
+    return httpx.Client(limits=_limits(max_connections), timeout=_timeout())
+
+
+@lru_cache(maxsize=1)
+def get_async_http_client() -> httpx.AsyncClient:
+    """Shared async client for requests served on the event loop."""
+    return httpx.AsyncClient(limits=_limits(get_settings().http_async_max_connections), timeout=_timeout())
+
+
+@lru_cache(maxsize=1)
+def get_pinecone_index():
+    """The configured Pinecone index, created once with a sized connection pool."""
+    from pinecone import Pinecone
+
+    settings = get_settings()
+    pc = Pinecone(api_key=settings.pinecone_api_key, pool_threads=settings.pinecone_pool_threads)
+    return pc.Index(
+        settings.pinecone_index_name,
+        pool_threads=settings.pinecone_pool_threads,
+        connection_pool_maxsize=settings.pinecone_connection_pool_size,
+    )
+
+
+async def close_http_clients() -> None:
+    """Close the shared OpenAI clients (on shutdown)."""
+    if get_http_client.cache_info().currsize:
+        get_http_client().close()
+        get_http_client.cache_clear()
+    if get_async_http_client.cache_info().currsize:
+        await get_async_http_client().aclose()
+        get_async_http_client.cache_clear()
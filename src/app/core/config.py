@@ -4,6 +4,8 @@ This module uses Pydantic Settings to load and validate environment variables
 for OpenAI models, Pinecone settings, and other system parameters.
 """
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,13 +16,120 @@ class Settings(BaseSettings):
     openai_api_key: str
     openai_model_name: str = "gpt-4o-mini"
     openai_embedding_model_name: str = "text-embedding-3-large"
+    # USD per million tokens, for the cost estimates in telemetry (0 disables).
+    llm_input_price_per_million: float = 0.0
+    llm_output_price_per_million: float = 0.0
+
+    # Vector Store Configuration
+    # "pinecone": managed Pinecone index. "local": in-process NumPy index
+    # persisted under `local_index_dir` (no Pinecone credentials needed).
+    vector_store_backend: Literal["pinecone", "local"] = "pinecone"
+    local_index_dir: str = ".cache/vector_index"
+    # Workspaces whose vector store and BM25 index stay loaded at once; the
+    # least recently used are released first and reloaded on their next use.
+    workspace_index_cache_size: int = 32
+    # How long the list of existing workspaces (a Pinecone call) is reused.
+    workspace_list_ttl_seconds: float = 30.0
 
     # Pinecone Configuration
-    pinecone_api_key: str
-    pinecone_index_name: str
+    pinecone_api_key: str = ""
+    pinecone_index_name: str = ""
+    # Wipe the whole index and the upload directory when the server starts
+    # ("clean slate"). Only safe with a single replica on an ephemeral disk.
+    wipe_on_startup: bool = False
+    # Connections kept open to the index, and threads for its async requests.
+    pinecone_connection_pool_size: int = 32
+    pinecone_pool_threads: int = 4
+
+    # Shared HTTP connection pools for every OpenAI chat and embedding call.
+    # The sync pool serves thread-pool callers (ingestion workers, multi-query
+    # searches, sync graph runs) and is never smaller than
+    # ingestion_max_workers x ingestion_max_in_flight; the async pool serves
+    # concurrent QA requests. Idle connections are kept alive for reuse.
+    http_sync_max_connections: int = 32
+    http_async_max_connections: int = 100
+    http_keepalive_expiry_seconds: float = 30.0
+    http_timeout_seconds: float = 60.0
+    http_connect_timeout_seconds: float = 5.0
+
+    # Persistent embedding cache directory (empty to disable)
+    embedding_cache_dir: str = ".cache/embeddings"
 
     # Retrieval Configuration
     retrieval_k: int = 4
+    # "agent": tool-calling Retrieval Agent decides what to search for.
+    # "direct": search the question as-is, rewriting follow-ups with one LLM call.
+    # "multi_query" (opt-in): like "direct", but also searches keyword variants
+    # of the question, embedding them in one batch and searching them
+    # concurrently; costs up to `multi_query_max_queries` searches per question.
+    retrieval_mode: Literal["agent", "direct", "multi_query"] = "direct"
+    multi_query_max_queries: int = 4
+    # Hybrid retrieval: fuse dense results with a local BM25 keyword index
+    # (reciprocal rank fusion), taking `retrieval_candidate_pool` from each.
+    hybrid_retrieval_enabled: bool = True
+    bm25_index_dir: str = ".cache/bm25"
+    retrieval_candidate_pool: int = 20
+    rrf_k: int = 60
+    # Merged rankings drop chunks whose 64-bit SimHash is within this many
+    # bits of a higher-ranked chunk (-1 disables near-duplicate removal).
+    near_duplicate_max_distance: int = 3
+    # Optional CPU cross-encoder applied to the fused candidates, e.g.
+    # "cross-encoder/ms-marco-MiniLM-L-6-v2" (needs sentence-transformers).
+    reranker_model: str = ""
+
+    # Verification Configuration
+    # "always": every draft goes through the Verification Agent.
+    # "adaptive": drafts lexically grounded in the retrieved chunks skip it;
+    # otherwise it only checks the sentences the local check could not match.
+    verification_mode: Literal["always", "adaptive"] = "adaptive"
+    # Share of draft sentences that must be supported to skip verification,
+    # and share of a sentence's content words a chunk must contain to support it.
+    verification_grounding_threshold: float = 0.9
+    verification_sentence_support: float = 0.6
+
+    # Conversation Memory Configuration
+    # Fold older turns into the rolling summary once the unsummarized turns
+    # exceed this many (estimated) tokens, keeping the newest turns verbatim.
+    memory_summary_trigger_tokens: int = 1500
+    memory_keep_recent_turns: int = 2
+    # Hard cap on verbatim turns sent to agents alongside the summary; more
+    # unsummarized turns than this also trigger a fold.
+    memory_max_recent_turns: int = 6
+
+    # Session Store Configuration
+    # "memory": per-process LRU with idle expiry (single worker only).
+    # "sqlite": durable WAL-mode database shared by every worker on the host.
+    session_store_backend: Literal["memory", "sqlite"] = "memory"
+    session_db_path: str = ".cache/sessions.db"
+    session_max_entries: int = 1000
+    session_ttl_seconds: float = 7 * 24 * 3600.0
+
+    # Post-response tasks (title generation, memory summarization) run at once.
+    post_response_max_concurrency: int = 4
+
+    # Ingestion Configuration
+    # Chunks per embedding request, and per vector store upsert request.
+    ingestion_batch_size: int = 64
+    ingestion_upsert_batch_size: int = 32
+    # Embedding batches in flight at once for a single document.
+    ingestion_max_in_flight: int = 4
+    ingestion_max_retries: int = 5
+    # Committed-batch checkpoints used to resume failed uploads (empty to disable).
+    ingestion_checkpoint_dir: str = ".cache/ingestion"
+    embedding_requests_per_minute: int = 3000
+    embedding_tokens_per_minute: int = 1_000_000
+    # PDF parsing processes, and pages handed to each parsing task.
+    ingestion_parse_workers: int = 2
+    ingestion_pages_per_task: int = 16
+    # Uploads indexed at once, and uploads allowed to wait for a free worker.
+    ingestion_max_workers: int = 2
+    ingestion_max_pending: int = 8
+
+    # Semantic Answer Cache Configuration
+    answer_cache_enabled: bool = True
+    answer_cache_similarity_threshold: float = 0.95
+    answer_cache_max_entries: int = 1024
+    answer_cache_ttl_seconds: float = 3600.0
 
     model_config = SettingsConfigDict(
         env_file=".env",
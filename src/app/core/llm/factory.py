@@ -1,22 +1,43 @@
-"""Factory functions for creating LangChain v1 LLM instances."""
+"""Factory functions for creating LangChain v1 LLM instances.
 
-from langchain_openai import ChatOpenAI
+`langchain_openai` (and the OpenAI SDK behind it) is imported on the first
+model construction rather than at import time, to keep server startup fast.
+"""
 
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from ..clients import get_async_http_client, get_http_client
 from ..config import get_settings
 
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
 
-def create_chat_model(temperature: float = 0.0) -> ChatOpenAI:
+def create_chat_model(temperature: float = 0.0) -> "ChatOpenAI":
     """Create a LangChain v1 ChatOpenAI instance.
 
+    The model sends its requests through the shared, pooled HTTP clients.
+
     Args:
         temperature: Model temperature (default: 0.0 for deterministic outputs).
 
     Returns:
         Configured ChatOpenAI instance.
     """
+    from langchain_openai import ChatOpenAI
+
     settings = get_settings()
     return ChatOpenAI(
         model=settings.openai_model_name,
         api_key=settings.openai_api_key,
         temperature=temperature,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
     )
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(temperature: float = 0.0) -> "ChatOpenAI":
+    """Chat model shared by every agent using `temperature`."""
+    return create_chat_model(temperature)
@@ -1,5 +1,5 @@
 """Retrieval module for vector store operations."""
 
-from .vector_store import get_retriever, retrieve
+from .vector_store import aretrieve, get_retriever, retrieve
 
-__all__ = ["get_retriever", "retrieve"]
+__all__ = ["aretrieve", "get_retriever", "retrieve"]
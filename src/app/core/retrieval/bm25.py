@@ -0,0 +1,238 @@
+"""Local BM25 keyword index over the chunks written to the vector store.
+
+Dense embeddings blur exact terms such as method names and acronyms
+("HNSW", "IVF-PQ"); a lexical index matches them directly. The index keeps an
+inverted posting list per term, so a query only touches the chunks sharing at
+least one of its terms.
+
+It persists to `<persist_dir>/records.jsonl`, an append-only log of added
+chunks and deletions that is replayed on load (ignoring a record torn by a
+crash) and compacted when deletions outnumber live chunks.
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Standard BM25 parameters: term-frequency saturation and length normalisation.
+_K1 = 1.5
+_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class BM25Index:
+    """In-process BM25 index keyed by chunk id."""
+
+    def __init__(self, persist_dir: Path | None = None):
+        self.persist_dir = Path(persist_dir) if persist_dir else None
+        self._lock = threading.RLock()
+
+        # Slot-addressed chunk storage; deleted slots are set to None.
+        self._docs: List[Optional[Document]] = []
+        self._lengths: List[int] = []
+        self._slots: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._total_length = 0
+        self._deleted = 0
+        # Length of the log up to its last complete record, if a torn one follows.
+        self._valid_length: int | None = None
+
+        if self.persist_dir:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    # Persistence
+
+    @property
+    def _log_path(self) -> Path:
+        return self.persist_dir / "records.jsonl"
+
+    def _load(self) -> None:
+        if not self._log_path.exists():
+            return
+
+        log_length = 0
+        with self._log_path.open(encoding="utf-8") as log:
+            for line in log:
+                if not line.endswith("\n"):
+                    # Torn append; cut off before this instance first appends.
+                    self._valid_length = log_length
+                    break
+                log_length += len(line.encode("utf-8"))
+                record = json.loads(line)
+                if "delete" in record:
+                    self._remove(record["delete"])
+                else:
+                    self._insert(Document(id=record["id"], page_content=record["text"], metadata=record["metadata"]))
+
+        if self._deleted > len(self._slots):
+            self._compact()
+
+    def _append(self, records: List[dict]) -> None:
+        if not self.persist_dir or not records:
+            return
+        self.persist_dir.mkdir(parents=True, exist_ok=True)
+        if self._valid_length is not None:
+            os.truncate(self._log_path, self._valid_length)
+            self._valid_length = None
+        with self._log_path.open("a", encoding="utf-8") as log:
+            log.writelines(json.dumps(record) + "\n" for record in records)
+
+    def _compact(self) -> None:
+        """Rewrite the log with only live chunks and renumber slots."""
+        live = [doc for doc in self._docs if doc is not None]
+        self._reset()
+        for doc in live:
+            self._insert(doc)
+
+        if self.persist_dir:
+            self.persist_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.persist_dir / "records.tmp.jsonl"
+            with tmp.open("w", encoding="utf-8") as log:
+                log.writelines(
+                    json.dumps({"id": doc.id, "text": doc.page_content, "metadata": doc.metadata}) + "\n"
+                    for doc in live
+                )
+            tmp.replace(self._log_path)
+            self._valid_length = None
+
+    def _reset(self) -> None:
+        self._docs, self._lengths, self._slots, self._postings = [], [], {}, {}
+        self._total_length = 0
+        self._deleted = 0
+
+    # Writes
+
+    def _insert(self, doc: Document) -> None:
+        if doc.id in self._slots:
+            self._remove([doc.id])
+
+        slot = len(self._docs)
+        terms = Counter(tokenize(doc.page_content))
+        self._docs.append(doc)
+        self._lengths.append(sum(terms.values()))
+        self._slots[doc.id] = slot
+        self._total_length += self._lengths[slot]
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[slot] = frequency
+
+    def _remove(self, ids: Sequence[str]) -> int:
+        removed = 0
+        for doc_id in ids:
+            slot = self._slots.pop(doc_id, None)
+            if slot is None:
+                continue
+            for term in set(tokenize(self._docs[slot].page_content)):
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(slot, None)
+                    if not postings:
+                        del self._postings[term]
+            self._total_length -= self._lengths[slot]
+            self._docs[slot] = None
+            self._deleted += 1
+            removed += 1
+        return removed
+
+    def add_documents(self, docs: Sequence[Document]) -> None:
+        """Index `docs`, replacing any chunk with the same id. Every doc needs an id."""
+        with self._lock:
+            for doc in docs:
+                self._insert(Document(id=doc.id, page_content=doc.page_content, metadata=dict(doc.metadata)))
+            self._append([
+                {"id": doc.id, "text": doc.page_content, "metadata": dict(doc.metadata)} for doc in docs
+            ])
+
+    def delete(
+            self,
+            ids: Optional[Sequence[str]] = None,
+            delete_all: bool = False,
+            filter: Optional[dict] = None,
+    ) -> int:
+        """Delete by ids, by metadata equality filter, or everything. Returns the count removed."""
+        with self._lock:
+            if delete_all:
+                removed = len(self._slots)
+                self._reset()
+                if self.persist_dir and self._log_path.exists():
+                    self._log_path.unlink()
+                self._valid_length = None
+                return removed
+
+            if ids is None:
+                if filter is None:
+                    raise ValueError("Either ids, delete_all, or filter must be provided.")
+                ids = [doc.id for doc in self._docs if doc is not None and _matches(doc.metadata, filter)]
+
+            removed = self._remove(list(ids))
+            if removed:
+                self._append([{"delete": list(ids)}])
+                if self._deleted > len(self._slots):
+                    self._compact()
+            return removed
+
+    def ids(self, filter: Optional[dict] = None) -> List[str]:
+        """Ids of the indexed chunks, optionally restricted by a metadata filter."""
+        with self._lock:
+            return [doc.id for doc in self._docs if doc is not None and (not filter or _matches(doc.metadata, filter))]
+
+    def get(self, ids: Sequence[str]) -> List[Document]:
+        """Indexed chunks with the given ids, in that order (unknown ids are skipped)."""
+        with self._lock:
+            return [self._docs[self._slots[doc_id]] for doc_id in ids if doc_id in self._slots]
+
+    # Search
+
+    def search(self, query: str, k: int, filter: Optional[dict] = None) -> List[Tuple[Document, float]]:
+        """Top `k` chunks by BM25 score for `query`, optionally restricted by a metadata filter."""
+        with self._lock:
+            live = len(self._slots)
+            if not live:
+                return []
+            average_length = self._total_length / live
+            scores: Dict[int, float] = {}
+
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (live - len(postings) + 0.5) / (len(postings) + 0.5))
+                for slot, frequency in postings.items():
+                    norm = _K1 * (1 - _B + _B * self._lengths[slot] / average_length)
+                    scores[slot] = scores.get(slot, 0.0) + idf * frequency * (_K1 + 1) / (frequency + norm)
+
+            if filter:
+                scores = {slot: s for slot, s in scores.items() if _matches(self._docs[slot].metadata, filter)}
+            best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [(self._docs[slot], score) for slot, score in best]
+
+
+def _matches(metadata: dict, filter: dict) -> bool:
+    """Evaluate a Pinecone-style filter limited to `$eq`/`$in`/`$ne` and implicit equality."""
+    for field, condition in filter.items():
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        value = metadata.get(field)
+        for operator, operand in condition.items():
+            if operator == "$eq" and value != operand:
+                return False
+            if operator == "$in" and value not in operand:
+                return False
+            if operator == "$ne" and value == operand:
+                return False
+    return True
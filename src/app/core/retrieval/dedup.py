@@ -0,0 +1,51 @@
+"""Near-duplicate detection for retrieved chunks.
+
+Content-addressed ids stop the same chunk of the same file from being stored
+twice, but the same text still arrives under different sources (a PDF
+uploaded under two names, two versions sharing most pages) and with small
+extraction differences. Such chunks would crowd the top-k with one passage,
+so merged rankings keep only the best-ranked chunk of each group whose
+64-bit SimHashes differ in at most `max_distance` bits.
+"""
+
+import hashlib
+from collections import Counter
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+from langchain_core.documents import Document
+
+from .bm25 import tokenize
+
+
+@lru_cache(maxsize=4096)
+def simhash(text: str) -> int:
+    """64-bit SimHash over word bigrams (unigrams for one-word texts), weighted by frequency."""
+    tokens = tokenize(text)
+    features = Counter(zip(tokens, tokens[1:])) if len(tokens) > 1 else Counter((t,) for t in tokens)
+    if not features:
+        return 0
+
+    digests = b"".join(hashlib.blake2b(" ".join(f).encode("utf-8"), digest_size=8).digest() for f in features)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(len(features), 64)
+    votes = np.fromiter(features.values(), dtype=np.float64, count=len(features)) @ (bits * 2.0 - 1.0)
+    return int.from_bytes(np.packbits(votes > 0).tobytes(), "big")
+
+
+def drop_near_duplicates(docs: List[Document], max_distance: int, limit: int | None = None) -> List[Document]:
+    """Keep `docs` in order, skipping any within `max_distance` bits of an earlier kept one.
+
+    Stops once `limit` documents are kept, so only the candidates that can
+    still make the cut are hashed.
+    """
+    kept, hashes = [], []
+    for doc in docs:
+        if limit is not None and len(kept) >= limit:
+            break
+        fingerprint = simhash(doc.page_content)
+        if any((fingerprint ^ other).bit_count() <= max_distance for other in hashes):
+            continue
+        kept.append(doc)
+        hashes.append(fingerprint)
+    return kept
@@ -0,0 +1,188 @@
+"""Persistent, content-addressed cache for embedding vectors.
+
+Vectors are keyed by (embedding model, sha256 of the text) and stored per
+model as a flat float32 file that is read through a memory map, plus an
+append-only index file mapping each key to its row. Re-indexing the same
+PDF or repeating a query therefore costs no embedding API calls, even
+across server restarts.
+
+Layout of `<cache_dir>/<model>/`:
+- `meta.json`: `{"dim": <vector dimension>}`
+- `vectors.f32`: row-major float32 matrix, one row per cached text
+- `index.tsv`: `<sha256>\\t<row>` lines, appended after the row is written
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+def _text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """On-disk float32 vector store for a single embedding model.
+
+    Safe to share between threads, and between processes on the same host:
+    appends happen under an exclusive `flock`, and other writers' rows are
+    picked up by re-reading the tail of the index file on a miss.
+    """
+
+    def __init__(self, directory: Path, model: str):
+        self.directory = Path(directory) / re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._meta_path = self.directory / "meta.json"
+        self._vectors_path = self.directory / "vectors.f32"
+        self._index_path = self.directory / "index.tsv"
+        self._index_path.touch(exist_ok=True)
+        self._vectors_path.touch(exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._index_offset = 0
+        self._dim: int | None = None
+        self._matrix: np.ndarray | None = None
+        self._refresh()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _load_dim(self) -> None:
+        if self._dim is None and self._meta_path.exists():
+            self._dim = int(json.loads(self._meta_path.read_text())["dim"])
+
+    def _refresh(self) -> None:
+        """Read index lines appended since the last refresh (possibly by other processes)."""
+        self._load_dim()
+        with open(self._index_path, "r", encoding="utf-8") as index_file:
+            index_file.seek(self._index_offset)
+            for line in index_file:
+                if not line.endswith("\n"):
+                    break  # partially written line; pick it up next time
+                key, row = line.rstrip("\n").split("\t")
+                self._rows[key] = int(row)
+                self._index_offset += len(line.encode("utf-8"))
+        self._matrix = None
+
+    def _vectors(self) -> np.ndarray:
+        if self._matrix is None:
+            rows = os.path.getsize(self._vectors_path) // (4 * self._dim) if self._dim else 0
+            if rows == 0:
+                return np.empty((0, self._dim or 0), dtype=np.float32)
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self._dim))
+        return self._matrix
+
+    def get_many(self, keys: Sequence[str]) -> List[List[float] | None]:
+        """Return cached vectors for `keys`, with `None` for misses."""
+        with self._lock:
+            if any(key not in self._rows for key in keys):
+                self._refresh()
+            matrix = self._vectors()
+            results: List[List[float] | None] = []
+            for key in keys:
+                row = self._rows.get(key)
+                results.append(matrix[row].tolist() if row is not None and row < len(matrix) else None)
+            return results
+
+    def put_many(self, keys: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Append vectors for keys that are not cached yet."""
+        if not keys:
+            return
+        array = np.asarray(vectors, dtype=np.float32)
+        with self._lock, open(self._index_path, "a", encoding="utf-8") as index_file:
+            fcntl.flock(index_file, fcntl.LOCK_EX)
+            try:
+                self._refresh()
+                if self._dim is None:
+                    self._dim = int(array.shape[1])
+                    self._meta_path.write_text(json.dumps({"dim": self._dim}))
+
+                fresh = [i for i, key in enumerate(keys) if key not in self._rows]
+                fresh = list({keys[i]: i for i in fresh}.values())
+                if not fresh:
+                    return
+
+                # Rows are numbered from the index, not the file size: a crash
+                # can leave a torn append (a partial row, or rows with no index
+                # line), which is cut off here so later rows keep their offsets.
+                index_file.truncate(self._index_offset)
+                first_row = max(self._rows.values(), default=-1) + 1
+                with open(self._vectors_path, "ab") as vectors_file:
+                    vectors_file.truncate(first_row * 4 * self._dim)
+                    vectors_file.write(array[fresh].tobytes())
+                    vectors_file.flush()
+                    os.fsync(vectors_file.fileno())
+
+                lines = "".join(f"{keys[i]}\t{first_row + n}\n" for n, i in enumerate(fresh))
+                index_file.write(lines)
+                index_file.flush()
+            finally:
+                fcntl.flock(index_file, fcntl.LOCK_UN)
+            self._refresh()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that serves repeated texts from an `EmbeddingStore`."""
+
+    def __init__(self, underlying: Embeddings, store: EmbeddingStore):
+        self.underlying = underlying
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, texts: List[str]) -> tuple[List[List[float] | None], List[str]]:
+        vectors = self.store.get_many([_text_key(text) for text in texts])
+        # Embed each distinct uncached text once, even if repeated in the batch.
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        self.hits += sum(vector is not None for vector in vectors)
+        self.misses += len(missing)
+        return vectors, missing
+
+    def _merge(
+            self,
+            texts: List[str],
+            vectors: List[List[float] | None],
+            missing: List[str],
+            embedded: List[List[float]],
+    ) -> List[List[float]]:
+        if missing:
+            self.store.put_many([_text_key(text) for text in missing], embedded)
+        fresh = dict(zip(missing, embedded))
+        return [vector if vector is not None else list(fresh[text]) for text, vector in zip(texts, vectors)]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, missing = self._lookup(texts)
+        embedded = self.underlying.embed_documents(missing) if missing else []
+        return self._merge(texts, vectors, missing, embedded)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        # Lookups can re-read the index and writes take a file lock and fsync,
+        # so both run in a worker thread rather than on the event loop.
+        vectors, missing = await asyncio.to_thread(self._lookup, texts)
+        embedded = await self.underlying.aembed_documents(missing) if missing else []
+        return await asyncio.to_thread(self._merge, texts, vectors, missing, embedded)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.store),
+        }
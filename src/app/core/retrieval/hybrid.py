@@ -0,0 +1,65 @@
+"""Fusion and reranking for hybrid dense + BM25 retrieval."""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence
+
+from langchain_core.documents import Document
+
+from ..config import get_settings
+
+
+def _doc_key(doc: Document) -> tuple:
+    # Content rather than id, since not every vector store returns ids.
+    return doc.metadata.get("source"), doc.page_content
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Document]], k: int = 60) -> List[Document]:
+    """Merge ranked lists by summing `1 / (k + rank)` per document.
+
+    Rank fusion needs no score calibration between the dense and BM25
+    retrievers, and a chunk found by both rises above chunks found by one.
+    Returned documents are copies carrying the fused score as metadata `score`.
+    """
+    scores: Dict[tuple, float] = {}
+    docs: Dict[tuple, Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = _doc_key(doc)
+            docs.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+
+    return [
+        Document(
+            id=docs[key].id,
+            page_content=docs[key].page_content,
+            metadata={**docs[key].metadata, "score": round(scores[key], 6)},
+        )
+        for key in sorted(scores, key=scores.get, reverse=True)
+    ]
+
+
+@lru_cache(maxsize=1)
+def get_reranker() -> Any | None:
+    """Load the configured CPU cross-encoder, or None if disabled or unavailable."""
+    model_name = get_settings().reranker_model
+    if not model_name:
+        return None
+
+    try:
+        from sentence_transformers import CrossEncoder
+    except ImportError:
+        print("Reranking disabled: install `sentence-transformers` to use RERANKER_MODEL.")
+        return None
+
+    return CrossEncoder(model_name, device="cpu")
+
+
+def rerank(query: str, docs: List[Document]) -> List[Document]:
+    """Reorder `docs` by cross-encoder relevance to `query` (unchanged without a reranker)."""
+    reranker = get_reranker()
+    if reranker is None or len(docs) < 2:
+        return docs
+
+    scores = reranker.predict([(query, doc.page_content) for doc in docs])
+    order = sorted(range(len(docs)), key=lambda i: scores[i], reverse=True)
+    return [docs[i] for i in order]
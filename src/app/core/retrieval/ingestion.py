@@ -0,0 +1,299 @@
+"""Batched, concurrent embedding and upsert with rate-limit backpressure.
+
+`IngestionWriter` takes a stream of chunks and:
+- groups them into embedding batches of `embedding_batch_size`,
+- embeds up to `max_in_flight` batches concurrently,
+- paces requests and tokens through shared token buckets,
+- retries rate-limit/transient failures with exponential backoff (honouring
+  `Retry-After`, and pausing every worker, not just the one that got the 429),
+- upserts each embedded batch in slices of `upsert_batch_size`, and
+- checkpoints committed batches so a failed upload resumes where it stopped.
+
+Chunk ids are content-addressed: a hash of the source plus a hash of the
+normalized chunk text (see `chunk_id`). Re-upserting a batch overwrites
+rather than duplicates vectors, repeated chunks within a document are
+written once, and with an `existing` lookup chunks already in the store are
+neither re-embedded nor re-upserted, so re-indexing an unchanged document is
+close to free.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence, Set
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from .pdf_loader import batched
+
+# Writes one slice of embedded chunks to the vector store.
+UpsertFn = Callable[[Sequence[Document], Sequence[Sequence[float]]], None]
+# Returns which of the given chunk ids are already stored.
+ExistingFn = Callable[[Sequence[str]], Set[str]]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def source_hash(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+def chunk_id(source: str, text: str) -> str:
+    """Content-addressed chunk id: `<source hash>-<hash of the normalized text>`.
+
+    Normalization (NFKC, collapsed whitespace) keeps re-extracted text that
+    differs only in layout whitespace on the same id.
+    """
+    normalized = _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+    return f"{source_hash(source)}-{hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:32]}"
+
+
+def file_fingerprint(file_path: Path) -> str:
+    """sha256 of the file contents, used to tell whether a checkpoint still applies."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _status_code(exc: BaseException) -> int | None:
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    return _status_code(exc) == 429 or "RateLimit" in type(exc).__name__
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """Rate limits, server errors, timeouts and dropped connections are worth retrying."""
+    code = _status_code(exc)
+    if is_rate_limit_error(exc) or (code is not None and code >= 500):
+        return True
+    name = type(exc).__name__
+    return any(marker in name for marker in ("Timeout", "Connection", "ServiceUnavailable"))
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate` tokens per second."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> None:
+        """Block until `amount` tokens are available, then take them."""
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._tokens >= amount:
+                        self._tokens -= amount
+                        return
+                    wait = (amount - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for `seconds` (e.g. after a 429)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class IngestionCheckpoint:
+    """Per-source record of which embedding batches are already committed."""
+
+    def __init__(self, directory: Path | None, source: str, fingerprint: str):
+        self.path = Path(directory) / f"{source_hash(source)}.json" if directory else None
+        self.fingerprint = fingerprint
+        self.committed: set[int] = set()
+        self._lock = threading.Lock()
+
+        if self.path and self.path.exists():
+            data = json.loads(self.path.read_text())
+            if data.get("fingerprint") == fingerprint:
+                self.committed = set(data.get("committed", []))
+
+    def mark(self, batch_index: int) -> None:
+        with self._lock:
+            self.committed.add(batch_index)
+            if self.path:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps({"fingerprint": self.fingerprint, "committed": sorted(self.committed)}))
+                tmp.replace(self.path)
+
+    def clear(self) -> None:
+        if self.path:
+            self.path.unlink(missing_ok=True)
+
+
+class IngestionWriter:
+    """Embeds and upserts a chunk stream with bounded concurrency and retries."""
+
+    def __init__(
+            self,
+            embeddings: Embeddings,
+            upsert: UpsertFn,
+            embedding_batch_size: int = 64,
+            upsert_batch_size: int = 32,
+            max_in_flight: int = 4,
+            requests_per_minute: float = 3000,
+            tokens_per_minute: float = 1_000_000,
+            max_retries: int = 5,
+            backoff_base: float = 0.5,
+            backoff_max: float = 30.0,
+            checkpoint_dir: Path | None = None,
+            existing: Optional[ExistingFn] = None,
+    ):
+        self.embeddings = embeddings
+        self.upsert = upsert
+        self.existing = existing
+        self.embedding_batch_size = embedding_batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.checkpoint_dir = checkpoint_dir
+        self.requests = TokenBucket(requests_per_minute / 60.0, capacity=max(1.0, requests_per_minute / 60.0))
+        self.tokens = TokenBucket(tokens_per_minute / 60.0)
+
+    def _with_retries(self, operation: Callable[[], object]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return operation()
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable_error(e):
+                    raise
+                delay = _retry_after(e) or min(self.backoff_max, self.backoff_base * 2 ** attempt)
+                delay *= 1 + random.random() * 0.25
+                if is_rate_limit_error(e):
+                    # Back off every worker, not just this one.
+                    self.requests.pause(delay)
+                    self.tokens.pause(delay)
+                time.sleep(delay)
+
+    def _embed(self, batch: List[Document]) -> List[List[float]]:
+        texts = [doc.page_content for doc in batch]
+        self.requests.acquire()
+        self.tokens.acquire(sum(_estimate_tokens(text) for text in texts))
+        return self._with_retries(lambda: self.embeddings.embed_documents(texts))
+
+    def write(
+            self,
+            source: str,
+            chunks: Iterable[Document],
+            fingerprint: str,
+            progress: Callable[..., None] | None = None,
+    ) -> int:
+        """Embed and upsert every chunk; returns the number of chunks written.
+
+        Batches recorded in the checkpoint for this `(source, fingerprint)`
+        are skipped, as are repeated chunks and chunks the `existing` lookup
+        reports as stored (counted as `chunks_unchanged`). The checkpoint is
+        removed once every batch succeeds.
+        """
+        report = progress or (lambda phase, **counts: None)
+        checkpoint = IngestionCheckpoint(self.checkpoint_dir, source, fingerprint)
+        counts = {
+            "chunks_total": 0,
+            "chunks_embedded": 0,
+            "chunks_upserted": 0,
+            "chunks_skipped": 0,
+            "chunks_unchanged": 0,
+        }
+        counts_lock = threading.Lock()
+        slots = threading.BoundedSemaphore(self.max_in_flight)
+
+        def bump(phase: str, **deltas: int) -> None:
+            with counts_lock:
+                for name, delta in deltas.items():
+                    counts[name] += delta
+                snapshot = dict(counts)
+            report(phase, **snapshot)
+
+        def process(batch_index: int, batch: List[Document]) -> None:
+            try:
+                if self.existing is not None:
+                    stored = self._with_retries(lambda: self.existing([doc.id for doc in batch]))
+                    if stored:
+                        batch = [doc for doc in batch if doc.id not in stored]
+                        bump("upserting", chunks_unchanged=len(stored))
+                if not batch:
+                    checkpoint.mark(batch_index)
+                    return
+
+                vectors = self._embed(batch)
+                bump("embedding", chunks_embedded=len(batch))
+                for start in range(0, len(batch), self.upsert_batch_size):
+                    docs = batch[start:start + self.upsert_batch_size]
+                    rows = vectors[start:start + self.upsert_batch_size]
+                    self._with_retries(lambda: self.upsert(docs, rows))
+                    bump("upserting", chunks_upserted=len(docs))
+                checkpoint.mark(batch_index)
+            finally:
+                slots.release()
+
+        futures: List[Future] = []
+        seen: Set[str] = set()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="embed") as pool:
+            for batch_index, batch in enumerate(batched(chunks, self.embedding_batch_size)):
+                bump("splitting", chunks_total=len(batch))
+                unique = []
+                for doc in batch:
+                    doc.id = doc.id or chunk_id(source, doc.page_content)
+                    if doc.id not in seen:
+                        seen.add(doc.id)
+                        unique.append(doc)
+                if len(unique) < len(batch):
+                    bump("upserting", chunks_unchanged=len(batch) - len(unique))
+                batch = unique
+
+                if batch_index in checkpoint.committed:
+                    bump("upserting", chunks_skipped=len(batch))
+                    continue
+
+                # Backpressure: do not pull more chunks than we can have in flight.
+                slots.acquire()
+                futures.append(pool.submit(process, batch_index, batch))
+                futures = [f for f in futures if not f.done() or f.exception()]
+                for future in futures:
+                    if future.done():
+                        future.result()
+
+            for future in futures:
+                future.result()
+
+        checkpoint.clear()
+        return counts["chunks_total"]
@@ -0,0 +1,505 @@
+"""In-process vector index used as a drop-in alternative to Pinecone.
+
+Vectors are kept as a unit-normalised float32 NumPy matrix and searched with
+one matrix-vector product plus `argpartition` for the top k, which is exact
+and sub-millisecond for corpora of tens of thousands of chunks. Filters on
+`source` use a per-row integer code column, so they are vectorised too.
+
+Rows are append-only: the matrix grows geometrically, and deleted or
+overwritten rows are tombstoned and dropped when the index is compacted
+(once they outnumber live rows), so a write costs time proportional to its
+own rows rather than to the whole index.
+
+Layout of `<persist_dir>/`:
+- `meta.json`: `{"dim": <vector dimension>}`
+- `vectors.f32`: row-major float32 matrix, appended to (memory-mapped on load)
+- `records.jsonl`: one `{"id", "text", "metadata"}` line per appended row,
+  and `{"delete": [ids]}` lines; replayed on load like the BM25 log
+- `lock`: `flock`ed by loads and writes, so instances sharing the directory
+  do not interleave; a writer first reloads if another instance wrote
+"""
+
+import contextlib
+import fcntl
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+
+class LocalVectorStore(VectorStore):
+    """NumPy-backed `VectorStore` with Pinecone-compatible delete semantics."""
+
+    def __init__(self, embedding: Embeddings, persist_dir: Path | None = None):
+        self._embedding = embedding
+        self.persist_dir = Path(persist_dir) if persist_dir else None
+        self._lock = threading.RLock()
+        self._reset()
+        self._source_lookup: Dict[str, int] = {}
+
+        if self.persist_dir:
+            self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _reset(self) -> None:
+        # Row-addressed storage: rows [0, _size) are in use, and rows whose
+        # `_live` flag is cleared are tombstones awaiting compaction.
+        self._dim: int | None = None
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._live = np.empty(0, dtype=bool)
+        self._source_codes = np.empty(0, dtype=np.int32)
+        self._size = 0
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[dict] = []
+        self._positions: Dict[str, int] = {}
+        self._deleted = 0
+        self._valid_lengths: Tuple[int, int] | None = None
+        self._seen: Tuple = (None, None)
+
+    # Persistence
+
+    def _path(self, name: str) -> Path:
+        return self.persist_dir / name
+
+    def _recover(self) -> None:
+        """Finish or roll back a compaction interrupted by a crash.
+
+        `_compact` writes both `.next` files and then replaces the vectors
+        first, so a leftover `vectors.next.f32` means nothing was replaced yet.
+        """
+        vectors_next, records_next = self._path("vectors.next.f32"), self._path("records.next.jsonl")
+        if vectors_next.exists():
+            vectors_next.unlink()
+            records_next.unlink(missing_ok=True)
+        elif records_next.exists():
+            os.replace(records_next, self._path("records.jsonl"))
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Exclusive `flock` on the index directory, serialising instances that share it.
+
+        Reloading an evicted workspace can leave an older instance of the same
+        index alive, so loads, appends and compactions all take this lock.
+        """
+        if not self.persist_dir:
+            yield
+            return
+        self.persist_dir.mkdir(parents=True, exist_ok=True)
+        with open(self._path("lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _file_state(self) -> Tuple:
+        """Identity and size of the data files, to notice writes by another instance."""
+        if not self.persist_dir:
+            return None, None
+        state = []
+        for name in ("records.jsonl", "vectors.f32"):
+            try:
+                stat = os.stat(self._path(name))
+                state.append((stat.st_ino, stat.st_size))
+            except FileNotFoundError:
+                state.append(None)
+        return tuple(state)
+
+    def _load(self) -> None:
+        # An index that was never written has no directory; do not create one.
+        if not self.persist_dir.is_dir():
+            return
+        with self._file_lock():
+            self._recover()
+            if self._path("vectors.npy").exists() and not self._path("records.jsonl").exists():
+                self._migrate()
+            else:
+                self._replay()
+            self._seen = self._file_state()
+
+    def _sync(self) -> None:
+        """Reload from disk if another instance wrote since this one last did. Caller holds the file lock."""
+        if self.persist_dir and self._file_state() != self._seen:
+            self._reset()
+            self._replay()
+
+    def _replay(self) -> None:
+        if not (self._path("meta.json").exists() and self._path("records.jsonl").exists()):
+            return
+
+        self._dim = int(json.loads(self._path("meta.json").read_text())["dim"])
+        live: List[bool] = []
+        codes: List[int] = []
+        log_size = 0
+        with open(self._path("records.jsonl"), "r", encoding="utf-8") as log:
+            for line in log:
+                if not line.endswith("\n"):
+                    break  # torn append; truncated below
+                log_size += len(line.encode("utf-8"))
+                record = json.loads(line)
+                if "delete" in record:
+                    for doc_id in record["delete"]:
+                        row = self._positions.pop(doc_id, None)
+                        if row is not None:
+                            live[row] = False
+                            self._deleted += 1
+                    continue
+                row = len(self._ids)
+                replaced = self._positions.get(record["id"])
+                if replaced is not None:
+                    live[replaced] = False
+                    self._deleted += 1
+                self._positions[record["id"]] = row
+                self._ids.append(record["id"])
+                self._texts.append(record["text"])
+                self._metadatas.append(record["metadata"])
+                live.append(True)
+                codes.append(self._source_code(record["metadata"]))
+
+        # Bytes past these lengths belong to a write interrupted before its log
+        # line landed; they are cut off before the next append. Tombstones are
+        # likewise only compacted away on a write.
+        self._size = len(self._ids)
+        self._valid_lengths = (log_size, self._size * self._dim * 4)
+
+        self._live = np.asarray(live, dtype=bool)
+        self._source_codes = np.asarray(codes, dtype=np.int32)
+        if self._size:
+            self._matrix = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r",
+                                     shape=(self._size, self._dim))
+
+    @contextlib.contextmanager
+    def _writing(self):
+        """Hold both locks around a write, starting from the current on-disk state."""
+        with self._lock, self._file_lock():
+            self._sync()
+            yield
+            if self._deleted > len(self._positions):
+                self._compact()
+            self._seen = self._file_state()
+
+    def _migrate(self) -> None:
+        """Convert an index saved as `vectors.npy` + `records.json` to the append-only layout."""
+        records = json.loads(self._path("records.json").read_text(encoding="utf-8"))
+        vectors = np.load(self._path("vectors.npy"))
+        if len(records["ids"]):
+            self._insert(records["texts"], vectors, records["metadatas"], records["ids"])
+        self._compact()
+        self._path("vectors.npy").unlink()
+        self._path("records.json").unlink()
+
+    def _append(self, vectors: np.ndarray, records: List[dict]) -> None:
+        """Persist newly inserted rows (vectors first, so a logged row always has its vector).
+
+        Caller holds the file lock.
+        """
+        if not self.persist_dir:
+            return
+        if not self._path("meta.json").exists():
+            self._path("meta.json").write_text(json.dumps({"dim": self._dim}))
+        if self._valid_lengths:
+            os.truncate(self._path("records.jsonl"), self._valid_lengths[0])
+            os.truncate(self._path("vectors.f32"), self._valid_lengths[1])
+            self._valid_lengths = None
+        if len(vectors):
+            with open(self._path("vectors.f32"), "ab") as vectors_file:
+                vectors_file.write(np.ascontiguousarray(vectors).tobytes())
+        with open(self._path("records.jsonl"), "a", encoding="utf-8") as log:
+            log.writelines(json.dumps(record) + "\n" for record in records)
+
+    def _compact(self) -> None:
+        """Drop tombstoned rows from memory and rewrite the files with only live rows.
+
+        Caller holds the file lock.
+        """
+        rows = np.flatnonzero(self._live[:self._size])
+        self._matrix = np.ascontiguousarray(np.asarray(self._matrix)[rows])
+        self._live = np.ones(len(rows), dtype=bool)
+        self._source_codes = self._source_codes[rows]
+        self._ids = [self._ids[i] for i in rows]
+        self._texts = [self._texts[i] for i in rows]
+        self._metadatas = [self._metadatas[i] for i in rows]
+        self._positions = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self._size = len(rows)
+        self._deleted = 0
+        self._valid_lengths = None
+
+        if not self.persist_dir or self._dim is None:
+            return
+        self._path("meta.json").write_text(json.dumps({"dim": self._dim}))
+        vectors_next, records_next = self._path("vectors.next.f32"), self._path("records.next.jsonl")
+        vectors_next.write_bytes(self._matrix.tobytes())
+        with open(records_next, "w", encoding="utf-8") as log:
+            log.writelines(
+                json.dumps({"id": doc_id, "text": text, "metadata": metadata}) + "\n"
+                for doc_id, text, metadata in zip(self._ids, self._texts, self._metadatas)
+            )
+        os.replace(vectors_next, self._path("vectors.f32"))
+        os.replace(records_next, self._path("records.jsonl"))
+
+    # Writes
+
+    def _source_code(self, metadata: dict) -> int:
+        source = metadata.get("source")
+        if source is None:
+            return -1
+        return self._source_lookup.setdefault(source, len(self._source_lookup))
+
+    @staticmethod
+    def _normalize(vectors: Any) -> np.ndarray:
+        matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _reserve(self, rows: int) -> None:
+        """Make room for `rows` more rows, growing the buffers geometrically.
+
+        A memory-mapped matrix is read-only, so the first write after a load
+        copies it into a growable buffer. New buffers are allocated rather
+        than resized in place, so searches holding the old one stay valid.
+        """
+        needed = self._size + rows
+        capacity = len(self._matrix) if self._matrix.shape[1:] == (self._dim,) else 0
+        if needed <= capacity and self._matrix.flags.writeable:
+            return
+        capacity = max(needed, 2 * capacity, 64)
+        matrix = np.empty((capacity, self._dim), dtype=np.float32)
+        if self._size:
+            matrix[:self._size] = self._matrix[:self._size]
+        live = np.zeros(capacity, dtype=bool)
+        live[:self._size] = self._live[:self._size]
+        codes = np.full(capacity, -1, dtype=np.int32)
+        codes[:self._size] = self._source_codes[:self._size]
+        self._matrix, self._live, self._source_codes = matrix, live, codes
+
+    def _tombstone(self, ids: Iterable[str]) -> List[str]:
+        """Mark the rows of `ids` deleted; returns the ids that were present."""
+        removed = []
+        for doc_id in ids:
+            row = self._positions.pop(doc_id, None)
+            if row is not None:
+                self._live[row] = False
+                self._deleted += 1
+                removed.append(doc_id)
+        return removed
+
+    def _insert(
+            self,
+            texts: Sequence[str],
+            vectors: np.ndarray,
+            metadatas: Sequence[dict],
+            ids: Sequence[str],
+    ) -> None:
+        """Append rows in memory, tombstoning earlier rows with the same ids. Caller holds the lock."""
+        if self._dim is None:
+            self._dim = int(vectors.shape[1])
+        elif vectors.shape[1] != self._dim:
+            raise ValueError(f"Expected {self._dim}-dimensional vectors, got {vectors.shape[1]}.")
+
+        first, count = self._size, len(ids)
+        self._reserve(count)
+        self._matrix[first:first + count] = vectors
+        self._live[first:first + count] = True
+        self._source_codes[first:first + count] = [self._source_code(m) for m in metadatas]
+        self._ids.extend(ids)
+        self._texts.extend(texts)
+        self._metadatas.extend(dict(m) for m in metadatas)
+        self._size += count
+        for row, doc_id in enumerate(ids, start=first):
+            self._tombstone([doc_id])
+            self._positions[doc_id] = row
+
+    def add_embeddings(
+            self,
+            texts: Sequence[str],
+            embeddings: Sequence[Sequence[float]],
+            metadatas: Optional[Sequence[dict]] = None,
+            ids: Optional[Sequence[str]] = None,
+    ) -> List[str]:
+        """Insert precomputed vectors; existing ids are overwritten (upsert)."""
+        if not texts:
+            return []
+        texts = list(texts)
+        metadatas = list(metadatas) if metadatas else [{} for _ in texts]
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        vectors = self._normalize(embeddings)
+
+        with self._writing():
+            self._insert(texts, vectors, metadatas, ids)
+            self._append(vectors, [
+                {"id": doc_id, "text": text, "metadata": dict(metadata)}
+                for doc_id, text, metadata in zip(ids, texts, metadatas)
+            ])
+        return ids
+
+    def add_texts(
+            self,
+            texts: Iterable[str],
+            metadatas: Optional[List[dict]] = None,
+            *,
+            ids: Optional[List[str]] = None,
+            **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        return self.add_embeddings(texts, self._embedding.embed_documents(texts), metadatas, ids)
+
+    async def aadd_texts(
+            self,
+            texts: Iterable[str],
+            metadatas: Optional[List[dict]] = None,
+            *,
+            ids: Optional[List[str]] = None,
+            **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        vectors = await self._embedding.aembed_documents(texts)
+        return self.add_embeddings(texts, vectors, metadatas, ids)
+
+    def delete(
+            self,
+            ids: Optional[List[str]] = None,
+            delete_all: Optional[bool] = None,
+            filter: Optional[dict] = None,
+            **kwargs: Any,
+    ) -> None:
+        """Delete by ids, by metadata filter, or everything (mirrors `PineconeVectorStore.delete`)."""
+        if delete_all:
+            with self._lock, self._file_lock():
+                self._reset()
+                if self.persist_dir:
+                    for name in ("meta.json", "vectors.f32", "records.jsonl", "lock"):
+                        self._path(name).unlink(missing_ok=True)
+            return
+
+        with self._writing():
+            if ids is None:
+                if filter is None:
+                    raise ValueError("Either ids, delete_all, or filter must be provided.")
+                rows = np.flatnonzero(self._filter_mask(filter) & self._live[:self._size])
+                ids = [self._ids[row] for row in rows]
+
+            removed = self._tombstone(ids)
+            if removed:
+                self._append(np.empty((0, self._dim), dtype=np.float32), [{"delete": removed}])
+
+    def ids(self, filter: Optional[dict] = None) -> List[str]:
+        """Ids of the stored chunks, optionally restricted by a metadata filter."""
+        with self._lock:
+            live = self._live[:self._size]
+            rows = np.flatnonzero(self._filter_mask(filter) & live if filter else live)
+            return [self._ids[row] for row in rows]
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        with self._lock:
+            return [
+                Document(id=doc_id, page_content=self._texts[self._positions[doc_id]],
+                         metadata=dict(self._metadatas[self._positions[doc_id]]))
+                for doc_id in ids if doc_id in self._positions
+            ]
+
+    # Search
+
+    def _filter_mask(self, filter: dict) -> np.ndarray:
+        """Evaluate a Pinecone-style metadata filter (`$eq`/`$in`/`$ne`, implicit equality)."""
+        mask = np.ones(self._size, dtype=bool)
+        for field, condition in filter.items():
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for op, value in condition.items():
+                if field == "source" and op in ("$eq", "$in", "$ne"):
+                    values = value if op == "$in" else [value]
+                    codes = [self._source_lookup[v] for v in values if v in self._source_lookup]
+                    field_mask = np.isin(self._source_codes[:self._size], codes)
+                    mask &= ~field_mask if op == "$ne" else field_mask
+                    continue
+                column = [m.get(field) for m in self._metadatas]
+                if op == "$eq":
+                    mask &= np.asarray([v == value for v in column], dtype=bool)
+                elif op == "$in":
+                    mask &= np.asarray([v in value for v in column], dtype=bool)
+                elif op == "$ne":
+                    mask &= np.asarray([v != value for v in column], dtype=bool)
+                else:
+                    raise ValueError(f"Unsupported filter operator: {op}")
+        return mask
+
+    def similarity_search_with_score_by_vector(
+            self,
+            embedding: List[float],
+            k: int = 4,
+            filter: Optional[dict] = None,
+            **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        with self._lock:
+            if not self._positions:
+                return []
+            matrix, ids, texts, metadatas = self._matrix[:self._size], self._ids, self._texts, self._metadatas
+            # Only score live rows that pass the filter, so filtered search cost
+            # scales with the matching subset rather than the whole index.
+            rows = None
+            if filter:
+                rows = np.flatnonzero(self._filter_mask(filter) & self._live[:self._size])
+            elif self._deleted:
+                rows = np.flatnonzero(self._live[:self._size])
+
+        if rows is not None and not len(rows):
+            return []
+        candidates = np.asarray(matrix) if rows is None else np.asarray(matrix)[rows]
+        scores = candidates @ self._normalize(embedding)[0]
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        positions = top if rows is None else rows[top]
+
+        return [
+            (Document(id=ids[i], page_content=texts[i], metadata=dict(metadatas[i])), float(score))
+            for i, score in zip(positions, scores[top])
+        ]
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self._embedding.embed_query(query), k, **kwargs)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self._embedding.embed_query(query), k, **kwargs)
+
+    async def asimilarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        vector = await self._embedding.aembed_query(query)
+        return self.similarity_search_by_vector(vector, k, **kwargs)
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # Scores are already cosine similarities in [-1, 1].
+        return lambda score: (score + 1.0) / 2.0
+
+    @classmethod
+    def from_texts(
+            cls,
+            texts: List[str],
+            embedding: Embeddings,
+            metadatas: Optional[List[dict]] = None,
+            *,
+            ids: Optional[List[str]] = None,
+            persist_dir: Path | None = None,
+            **kwargs: Any,
+    ) -> "LocalVectorStore":
+        store = cls(embedding=embedding, persist_dir=persist_dir)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
@@ -0,0 +1,111 @@
+"""Streaming, page-parallel PDF parsing and splitting for ingestion.
+
+Pages are extracted with `pypdf` in a shared process pool, a few pages per
+task, and yielded in page order while only a bounded window of tasks is in
+flight. Each page is split on its own, so every chunk carries the page it
+came from and peak memory stays flat regardless of document length.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple, TypeVar
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+T = TypeVar("T")
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _extract_page_range(path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """Extract text for pages `[start, end)`; runs inside a worker process."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return [(number + 1, reader.pages[number].extract_text() or "") for number in range(start, end)]
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Shared parsing pool, created on first use.
+
+    Uses the spawn start method because ingestion runs on worker threads,
+    where forking the server process is unsafe.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def count_pages(file_path: Path) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(str(file_path)).pages)
+
+
+def iter_pages(file_path: Path, workers: int = 2, pages_per_task: int = 16) -> Iterator[Tuple[int, str]]:
+    """Yield `(page_number, text)` pairs in order, 1-based.
+
+    With `workers <= 1` (or a document that fits in one task) pages are read
+    in-process; otherwise page ranges are fanned out to the process pool with
+    at most `2 * workers` ranges outstanding.
+    """
+    path = str(file_path)
+    total = count_pages(file_path)
+
+    if workers <= 1 or total <= pages_per_task:
+        for start in range(0, total, pages_per_task):
+            yield from _extract_page_range(path, start, min(start + pages_per_task, total))
+        return
+
+    pool = _get_pool(workers)
+    ranges = iter(range(0, total, pages_per_task))
+    in_flight: deque[Future] = deque()
+
+    def submit_next() -> None:
+        start = next(ranges, None)
+        if start is not None:
+            in_flight.append(pool.submit(_extract_page_range, path, start, min(start + pages_per_task, total)))
+
+    for _ in range(2 * workers):
+        submit_next()
+    while in_flight:
+        pages = in_flight.popleft().result()
+        submit_next()
+        yield from pages
+
+
+def iter_chunks(
+        file_path: Path,
+        chunk_size: int = 500,
+        chunk_overlap: int = 50,
+        workers: int = 2,
+        pages_per_task: int = 16,
+) -> Iterator[Document]:
+    """Yield chunks page by page, each tagged with `source`, `page` and `start_index`.
+
+    `start_index` is the chunk's character offset within its page text.
+    """
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        add_start_index=True,
+    )
+    source = str(file_path)
+    for page, text in iter_pages(file_path, workers=workers, pages_per_task=pages_per_task):
+        if text.strip():
+            yield from splitter.create_documents([text], [{"source": source, "page": page}])
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Group an iterable into lists of at most `size` items."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
@@ -1,9 +1,74 @@
 """Utilities for serializing retrieved document chunks."""
 
-from typing import List
+from typing import List, TypedDict
 
 from langchain_core.documents import Document
 
+# Chunk fields kept when a chunk is cited from a session turn (no text).
+CITATION_FIELDS = ("id", "source", "page", "start_index", "end_index", "score")
+
+
+class ChunkRef(TypedDict):
+    """A retrieved chunk as carried through the QA graph.
+
+    `start_index`/`end_index` are character offsets within the source page,
+    and `score` is the fusion score of hybrid retrieval (None without it).
+    """
+    id: str | None
+    source: str | None
+    page: int | None
+    start_index: int | None
+    end_index: int | None
+    score: float | None
+    text: str
+
+
+def chunk_refs(docs: List[Document]) -> List[ChunkRef]:
+    """Convert retrieved Documents, in rank order, into chunk references."""
+    refs = []
+    for doc in docs:
+        text = doc.page_content.strip()
+        start = doc.metadata.get("start_index")
+        refs.append({
+            "id": doc.id,
+            "source": doc.metadata.get("source"),
+            "page": doc.metadata.get("page"),
+            "start_index": start,
+            "end_index": start + len(doc.page_content) if start is not None else None,
+            "score": doc.metadata.get("score"),
+            "text": text,
+        })
+    return refs
+
+
+def citations(chunks: List[ChunkRef]) -> List[dict]:
+    """The chunk references without their text, as stored on session turns."""
+    return [{field: chunk.get(field) for field in CITATION_FIELDS} for chunk in chunks]
+
+
+def format_chunks(chunks: List[ChunkRef]) -> List[str]:
+    """Format each chunk reference as its own "Chunk N (page=X)" block.
+
+    Keeping the blocks separate lets prompt assembly drop the lowest-ranked
+    chunks when the context budget is exceeded.
+
+    Args:
+        chunks: Chunk references in rank order.
+
+    Returns:
+        One formatted string per chunk.
+    """
+    context_parts = []
+
+    for idx, chunk in enumerate(chunks, start=1):
+        # Format chunk with index and page number
+        page = chunk.get("page")
+        chunk_header = f"Chunk {idx} (page={page})" if page is not None else f"Chunk {idx}"
+
+        context_parts.append(f"{chunk_header}\n{chunk['text']}")
+
+    return context_parts
+
 
 def serialize_chunks(docs: List[Document]) -> str:
     """Serialize a list of Document objects into a formatted CONTEXT string.
@@ -19,13 +84,4 @@ def serialize_chunks(docs: List[Document]) -> str:
     Returns:
         Formatted string with all chunks serialized.
     """
-    context_parts = []
-
-    for idx, doc in enumerate(docs, start=1):
-        # Format chunk with index and page number
-        chunk_header = f"Chunk {idx}"
-        chunk_content = doc.page_content.strip()
-
-        context_parts.append(f"{chunk_header}\n{chunk_content}")
-
-    return "\n\n".join(context_parts)
+    return "\n\n".join(format_chunks(chunk_refs(docs)))
@@ -1,114 +1,615 @@
-"""Vector store wrapper for Pinecone integration with LangChain."""
+"""Vector store wrapper for Pinecone (or the local index) with LangChain.
 
+Every chunk written to the vector store is also added to a local BM25 index,
+and `retrieve` fuses both rankings when hybrid retrieval is enabled.
+
+Documents belong to a workspace, and each workspace has its own corpus: a
+Pinecone namespace, or its own local vector and BM25 index directory. A
+search only ever touches the asking workspace's index, so its cost grows
+with that workspace's documents rather than with everything indexed.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import Callable, List, Sequence, Set
 
-from langchain_community.document_loaders import PyPDFLoader
 from langchain_core.documents import Document
-from langchain_openai import OpenAIEmbeddings
-from langchain_pinecone import PineconeVectorStore
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from pinecone import Pinecone
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
 
+from .bm25 import BM25Index
+from .dedup import drop_near_duplicates
+from .embedding_cache import CachedEmbeddings, EmbeddingStore
+from .hybrid import reciprocal_rank_fusion, rerank
+from .local_store import LocalVectorStore
+from .ingestion import IngestionWriter, chunk_id, file_fingerprint, source_hash
+from .pdf_loader import count_pages, iter_chunks
+from ..cache.answer_cache import get_answer_cache
+from ..clients import get_async_http_client, get_http_client, get_pinecone_index
 from ..config import get_settings
+from ..telemetry import vector_timer
+from ..workspaces import DEFAULT_WORKSPACE, check_workspace
+
+
+def _workspace_dir(base_dir: str, workspace: str) -> Path:
+    """Index directory of `workspace` under `base_dir`.
+
+    The default workspace keeps the top-level directory, so indexes built
+    before workspaces existed stay where they are.
+    """
+    if workspace == DEFAULT_WORKSPACE:
+        return Path(base_dir)
+    return Path(base_dir) / "workspaces" / workspace
 
 
 @lru_cache(maxsize=1)
-def _get_vector_store() -> PineconeVectorStore:
-    """Create a PineconeVectorStore instance configured from settings."""
-    settings = get_settings()
+def _create_embeddings() -> Embeddings:
+    """Create the OpenAI embedding model, behind the on-disk cache if enabled.
 
-    pc = Pinecone(api_key=settings.pinecone_api_key)
-    index = pc.Index(settings.pinecone_index_name)
+    One instance is shared by every workspace's vector store.
+    """
+    from langchain_openai import OpenAIEmbeddings
+
+    settings = get_settings()
 
     embeddings = OpenAIEmbeddings(
         model=settings.openai_embedding_model_name,
         api_key=settings.openai_api_key,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
     )
 
+    if settings.embedding_cache_dir:
+        store = EmbeddingStore(Path(settings.embedding_cache_dir), settings.openai_embedding_model_name)
+        return CachedEmbeddings(embeddings, store)
+    return embeddings
+
+
+class _KnownWorkspaces:
+    """Names from `list_workspaces`, re-listed at most every `workspace_list_ttl_seconds`.
+
+    On Pinecone listing is a network call, so requests naming an unknown
+    workspace are answered from the last listing rather than each asking again.
+    """
+
+    def __init__(self):
+        self._names: Set[str] = set()
+        self._listed_at: float | None = None
+        self._lock = threading.Lock()
+
+    def _current(self) -> Set[str]:
+        listed_at = self._listed_at
+        if listed_at is None or time.monotonic() - listed_at > get_settings().workspace_list_ttl_seconds:
+            names = set(list_workspaces())
+            with self._lock:
+                self._names, self._listed_at = names, time.monotonic()
+        return self._names
+
+    def __contains__(self, workspace: str) -> bool:
+        return workspace in self._current()
+
+    def add(self, workspace: str) -> None:
+        with self._lock:
+            self._names = self._names | {workspace}
+
+    def discard(self, workspace: str) -> None:
+        with self._lock:
+            self._names = self._names - {workspace}
+
+
+_known_workspaces = _KnownWorkspaces()
+
+
+class _WorkspaceRegistry:
+    """Per-workspace instances (vector stores or BM25 indexes), least recently used evicted first.
+
+    Workspace names come from clients, so only workspaces that already have
+    an index, or that are being written to (`create`), are registered; any
+    other name gets a fresh, empty instance that is not kept. At most
+    `workspace_index_cache_size` workspaces stay loaded; an evicted one is
+    loaded from disk again on its next use.
+
+    Building an instance and checking that the workspace exists happen
+    outside the lock, which is only held to look up and publish entries.
+    """
+
+    def __init__(self, build: Callable[[str], object]):
+        self._build = build
+        self._entries: OrderedDict[str, object] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, workspace: str, create: bool = False):
+        check_workspace(workspace)
+        with self._lock:
+            if workspace in self._entries:
+                self._entries.move_to_end(workspace)
+                return self._entries[workspace]
+
+        if create:
+            _known_workspaces.add(workspace)
+        register = create or workspace == DEFAULT_WORKSPACE or workspace in _known_workspaces
+        instance = self._build(workspace)
+        if not register:
+            return instance
+
+        with self._lock:
+            # Another thread may have published the workspace meanwhile; keep its instance.
+            instance = self._entries.setdefault(workspace, instance)
+            self._entries.move_to_end(workspace)
+            while len(self._entries) > max(1, get_settings().workspace_index_cache_size):
+                self._entries.popitem(last=False)
+            return instance
+
+    def evict(self, workspace: str) -> None:
+        with self._lock:
+            self._entries.pop(workspace, None)
+
+
+def _build_vector_store(workspace: str) -> VectorStore:
+    """Create the vector store of `workspace`, for `Settings.vector_store_backend`."""
+    settings = get_settings()
+
+    if settings.vector_store_backend == "local":
+        return LocalVectorStore(
+            embedding=_create_embeddings(),
+            persist_dir=_workspace_dir(settings.local_index_dir, workspace),
+        )
+
+    from langchain_pinecone import PineconeVectorStore
+
+    # The default workspace is Pinecone's default ("") namespace.
     return PineconeVectorStore(
-        index=index,
-        embedding=embeddings,
+        index=get_pinecone_index(),
+        embedding=_create_embeddings(),
+        namespace=None if workspace == DEFAULT_WORKSPACE else workspace,
     )
 
 
-def get_retriever(k: int | None = None):
-    """Get a Pinecone retriever instance.
+def _build_bm25_index(workspace: str) -> BM25Index:
+    settings = get_settings()
+    return BM25Index(_workspace_dir(settings.bm25_index_dir, workspace) if settings.bm25_index_dir else None)
+
+
+_vector_stores = _WorkspaceRegistry(_build_vector_store)
+_bm25_indexes = _WorkspaceRegistry(_build_bm25_index)
+
+
+def _get_vector_store(workspace: str = DEFAULT_WORKSPACE, create: bool = False) -> VectorStore:
+    """Get the vector store of `workspace`; `create` registers a workspace that has no index yet."""
+    return _vector_stores.get(workspace, create)
+
+
+def get_bm25_index(workspace: str = DEFAULT_WORKSPACE, create: bool = False) -> BM25Index:
+    """Get the local BM25 index kept alongside the vector store of `workspace` (one per workspace)."""
+    return _bm25_indexes.get(workspace, create)
+
+
+def list_workspaces() -> List[str]:
+    """Names of the workspaces that have an index, the default one first."""
+    settings = get_settings()
+    found = set()
+    if settings.vector_store_backend == "local":
+        base_dirs = [settings.local_index_dir, settings.bm25_index_dir]
+    else:
+        base_dirs = [settings.bm25_index_dir]
+        found.update(name or DEFAULT_WORKSPACE for name in get_pinecone_index().describe_index_stats().namespaces)
+    for base_dir in filter(None, base_dirs):
+        workspaces_dir = Path(base_dir) / "workspaces"
+        if workspaces_dir.is_dir():
+            found.update(path.name for path in workspaces_dir.iterdir() if path.is_dir())
+    found.discard(DEFAULT_WORKSPACE)
+    return [DEFAULT_WORKSPACE, *sorted(found)]
+
+
+def get_embeddings() -> Embeddings:
+    """Get the embedding model shared with the vector store."""
+    return _get_vector_store().embeddings
+
+
+def get_retriever(k: int | None = None, workspace: str = DEFAULT_WORKSPACE):
+    """Get a retriever over the configured vector store.
 
     Args:
         k: Number of documents to retrieve (defaults to config value).
+        workspace: Workspace whose documents are searched.
 
     Returns:
-        PineconeVectorStore instance configured as a retriever.
+        Vector store instance configured as a retriever.
     """
     settings = get_settings()
     if k is None:
         k = settings.retrieval_k
 
-    vector_store = _get_vector_store()
+    vector_store = _get_vector_store(workspace)
     return vector_store.as_retriever(search_kwargs={"k": k})
 
 
-def retrieve(query: str, k: int | None = None) -> List[Document]:
-    """Retrieve documents from Pinecone for a given query.
+def _dedupe(docs: List[Document], limit: int) -> List[Document]:
+    """The first `limit` documents that are not near-duplicates of a higher-ranked one."""
+    max_distance = get_settings().near_duplicate_max_distance
+    if max_distance < 0:
+        return docs[:limit]
+    return drop_near_duplicates(docs, max_distance, limit)
+
+
+def _fuse(query: str, dense: List[Document], k: int, workspace: str) -> List[Document]:
+    """Fuse dense candidates with BM25 candidates, drop near-duplicates, rerank, and keep the top `k`."""
+    settings = get_settings()
+    with vector_timer("fuse"):
+        sparse = [doc for doc, _ in get_bm25_index(workspace).search(query, settings.retrieval_candidate_pool)]
+        fused = reciprocal_rank_fusion([dense, sparse], k=settings.rrf_k)
+        return rerank(query, _dedupe(fused, settings.retrieval_candidate_pool))[:k]
+
+
+def retrieve(query: str, k: int | None = None, workspace: str = DEFAULT_WORKSPACE) -> List[Document]:
+    """Retrieve documents from the vector store for a given query.
+
+    With hybrid retrieval enabled, `retrieval_candidate_pool` dense results
+    are fused with as many BM25 results and optionally reranked first.
 
     Args:
         query: Search query string.
         k: Number of documents to retrieve (defaults to config value).
+        workspace: Workspace whose documents are searched.
 
     Returns:
         List of Document objects with metadata (including page numbers).
     """
-    retriever = get_retriever(k=k)
-    return retriever.invoke(query)
+    k = k or get_settings().retrieval_k
+    with vector_timer("embed"):
+        vector = get_embeddings().embed_query(query)
+    return _search_by_vector(query, vector, k, workspace)
 
 
-def index_documents(file_path: Path) -> int:
-    """Index a list of Document objects into the Pinecone vector store.
+async def aretrieve(query: str, k: int | None = None, workspace: str = DEFAULT_WORKSPACE) -> List[Document]:
+    """Async variant of `retrieve` that does not block the event loop.
 
     Args:
-        docs: Documents to embed and upsert into the vector index.
+        query: Search query string.
+        k: Number of documents to retrieve (defaults to config value).
+        workspace: Workspace whose documents are searched.
+
+    Returns:
+        List of Document objects with metadata (including page numbers).
+    """
+    k = k or get_settings().retrieval_k
+    with vector_timer("embed"):
+        vector = await get_embeddings().aembed_query(query)
+    return await _asearch_by_vector(query, vector, k, workspace)
+
+
+def _search_by_vector(query: str, vector: List[float], k: int, workspace: str) -> List[Document]:
+    """Top `k` documents of `workspace` for an already embedded `query`."""
+    settings = get_settings()
+    vector_store = _get_vector_store(workspace)
+    if not settings.hybrid_retrieval_enabled:
+        with vector_timer("search"):
+            return vector_store.similarity_search_by_vector(vector, k=k)
+
+    with vector_timer("search"):
+        dense = vector_store.similarity_search_by_vector(vector, k=settings.retrieval_candidate_pool)
+    return _fuse(query, dense, k, workspace)
+
+
+async def _asearch_by_vector(query: str, vector: List[float], k: int, workspace: str) -> List[Document]:
+    settings = get_settings()
+    vector_store = _get_vector_store(workspace)
+    if not settings.hybrid_retrieval_enabled:
+        with vector_timer("search"):
+            return await vector_store.asimilarity_search_by_vector(vector, k=k)
+
+    with vector_timer("search"):
+        dense = await vector_store.asimilarity_search_by_vector(vector, k=settings.retrieval_candidate_pool)
+    # BM25 scoring and cross-encoder reranking are CPU-bound.
+    return await asyncio.to_thread(_fuse, query, dense, k, workspace)
+
+
+def _merge_rankings(rankings: List[List[Document]], k: int) -> List[Document]:
+    """Dedupe the per-query results, ranking chunks found by several queries first."""
+    if len(rankings) == 1:
+        return rankings[0][:k]
+    return _dedupe(reciprocal_rank_fusion(rankings, k=get_settings().rrf_k), k)
+
+
+def retrieve_many(
+        queries: Sequence[str],
+        k: int | None = None,
+        workspace: str = DEFAULT_WORKSPACE,
+) -> List[Document]:
+    """Retrieve for several phrasings of one question and merge the results.
+
+    All queries are embedded in a single batched call and searched
+    concurrently, so the wall-clock cost stays close to that of one query.
+
+    Args:
+        queries: Search query strings (duplicates are ignored).
+        k: Number of documents to return (defaults to config value).
+        workspace: Workspace whose documents are searched.
+
+    Returns:
+        The top `k` merged documents.
+    """
+    k = k or get_settings().retrieval_k
+    queries = list(dict.fromkeys(queries))
+    if not queries:
+        return []
+
+    with vector_timer("embed"):
+        vectors = get_embeddings().embed_documents(queries)
+    # Each search runs in a copy of this context so it is timed into the request's trace.
+    with ThreadPoolExecutor(max_workers=len(queries), thread_name_prefix="search") as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run, _search_by_vector, query, vector, k, workspace)
+            for query, vector in zip(queries, vectors)
+        ]
+        rankings = [future.result() for future in futures]
+    return _merge_rankings(rankings, k)
+
+
+async def aretrieve_many(
+        queries: Sequence[str],
+        k: int | None = None,
+        workspace: str = DEFAULT_WORKSPACE,
+) -> List[Document]:
+    """Async variant of `retrieve_many`."""
+    k = k or get_settings().retrieval_k
+    queries = list(dict.fromkeys(queries))
+    if not queries:
+        return []
+
+    with vector_timer("embed"):
+        vectors = await get_embeddings().aembed_documents(queries)
+    rankings = await asyncio.gather(*(
+        _asearch_by_vector(query, vector, k, workspace) for query, vector in zip(queries, vectors)
+    ))
+    return _merge_rankings(list(rankings), k)
+
+
+def get_chunks(ids: Sequence[str], workspace: str = DEFAULT_WORKSPACE) -> List[Document]:
+    """Look up chunks indexed in `workspace` by id, in the order given.
+
+    Chunks are served from the local BM25 index, falling back to the vector
+    store (a Pinecone fetch) for ids it does not hold, such as chunks indexed
+    by another replica. Ids that no longer exist are skipped.
+    """
+    found = {doc.id: doc for doc in get_bm25_index(workspace).get(ids)}
+    missing = [doc_id for doc_id in ids if doc_id not in found]
+    if missing:
+        found.update({doc.id: doc for doc in _stored_documents(_get_vector_store(workspace), missing)})
+    return [found[doc_id] for doc_id in ids if doc_id in found]
+
+
+# Called as `progress(phase, **counts)` while a document is being indexed.
+ProgressCallback = Callable[..., None]
+
+
+def _upsert_embeddings(
+        workspace: str,
+        docs: Sequence[Document],
+        vectors: Sequence[Sequence[float]],
+) -> None:
+    """Write precomputed embeddings for `docs` into the vector store of `workspace` in one request.
+
+    The chunks are added to the workspace's BM25 index under the same ids afterwards.
+    """
+    vector_store = _get_vector_store(workspace, create=True)
+    texts = [doc.page_content for doc in docs]
+    metadatas = [dict(doc.metadata) for doc in docs]
+    ids = [doc.id or str(uuid.uuid4()) for doc in docs]
+
+    if isinstance(vector_store, LocalVectorStore):
+        vector_store.add_embeddings(texts, vectors, metadatas, ids)
+    else:
+        # Pinecone keeps the chunk text in metadata under the store's text key.
+        text_key = getattr(vector_store, "_text_key", "text")
+        vector_store.index.upsert(
+            vectors=[
+                {"id": doc_id, "values": list(vector), "metadata": {**metadata, text_key: text}}
+                for doc_id, vector, metadata, text in zip(ids, vectors, metadatas, texts)
+            ],
+            namespace=getattr(vector_store, "_namespace", None),
+        )
+
+    get_bm25_index(workspace, create=True).add_documents([
+        Document(id=doc_id, page_content=text, metadata=metadata)
+        for doc_id, text, metadata in zip(ids, texts, metadatas)
+    ])
+
+
+def _fetch_documents(vector_store: VectorStore, ids: Sequence[str]) -> List[Document]:
+    """Chunks stored in Pinecone under `ids`, rebuilt from their metadata (unknown ids are skipped)."""
+    if not ids:
+        return []
+    text_key = getattr(vector_store, "_text_key", "text")
+    namespace = getattr(vector_store, "_namespace", None)
+    fetched = vector_store.index.fetch(ids=list(ids), namespace=namespace).vectors
+    docs = []
+    for doc_id in ids:
+        if doc_id in fetched:
+            metadata = dict(fetched[doc_id].metadata or {})
+            docs.append(Document(id=doc_id, page_content=metadata.pop(text_key, ""), metadata=metadata))
+    return docs
+
+
+def _stored_documents(vector_store: VectorStore, ids: Sequence[str]) -> List[Document]:
+    """Chunks of `ids` held by `vector_store`."""
+    if isinstance(vector_store, LocalVectorStore):
+        return vector_store.get_by_ids(list(ids))
+    return _fetch_documents(vector_store, ids)
+
+
+def _stored_source_ids(vector_store: VectorStore, source: str) -> Set[str]:
+    """Ids of every chunk of `source` in `vector_store`.
+
+    On Pinecone the ids are listed by their `<source hash>-` prefix, so chunks
+    indexed by another replica (and absent from this one's BM25 log) are found.
+    """
+    if isinstance(vector_store, LocalVectorStore):
+        return set(vector_store.ids({"source": source}))
+    namespace = getattr(vector_store, "_namespace", None)
+    return {
+        doc_id
+        for page in vector_store.index.list(prefix=f"{source_hash(source)}-", namespace=namespace)
+        for doc_id in page
+    }
+
+
+def _existing_ids(workspace: str, ids: Sequence[str]) -> Set[str]:
+    """Which of `ids` are already in the vector store of `workspace`.
+
+    Stored chunks missing from the workspace's BM25 index (written by another
+    replica, or before a restart) are added to it from their stored text, so
+    they need not be embedded or upserted again.
+    """
+    stored = _stored_documents(_get_vector_store(workspace, create=True), ids)
+    bm25 = get_bm25_index(workspace, create=True)
+    indexed = {doc.id for doc in bm25.get([doc.id for doc in stored])}
+    missing = [doc for doc in stored if doc.id not in indexed]
+    if missing:
+        bm25.add_documents(missing)
+    return {doc.id for doc in stored}
+
+
+def get_ingestion_writer(workspace: str = DEFAULT_WORKSPACE) -> IngestionWriter:
+    """Build an `IngestionWriter` for the vector store of `workspace` and the settings."""
+    settings = get_settings()
+    return IngestionWriter(
+        embeddings=_get_vector_store(workspace, create=True).embeddings,
+        upsert=lambda docs, vectors: _upsert_embeddings(workspace, docs, vectors),
+        existing=lambda ids: _existing_ids(workspace, ids),
+        embedding_batch_size=settings.ingestion_batch_size,
+        upsert_batch_size=settings.ingestion_upsert_batch_size,
+        max_in_flight=settings.ingestion_max_in_flight,
+        requests_per_minute=settings.embedding_requests_per_minute,
+        tokens_per_minute=settings.embedding_tokens_per_minute,
+        max_retries=settings.ingestion_max_retries,
+        checkpoint_dir=Path(settings.ingestion_checkpoint_dir) if settings.ingestion_checkpoint_dir else None,
+    )
+
+
+def index_documents(
+        file_path: Path,
+        progress: ProgressCallback | None = None,
+        workspace: str = DEFAULT_WORKSPACE,
+) -> int:
+    """Index a PDF file into the vector store of `workspace`.
+
+    Pages are parsed lazily in a process pool and split as they arrive;
+    the `IngestionWriter` embeds and upserts the chunks in concurrent,
+    rate-limited batches and resumes from its checkpoint if an earlier
+    attempt on the same file failed part-way. Each phase is reported
+    through `progress`.
+
+    Chunk ids are content-addressed, so chunks already indexed for this
+    file are not embedded or upserted again, and chunks of an earlier
+    version that are no longer in the file are deleted afterwards.
+
+    Args:
+        file_path: Path to the PDF file on disk.
+        progress: Optional callback receiving the current phase
+            ("parsing", "splitting", "embedding", "upserting") and counts.
+        workspace: Workspace the document is added to.
 
     Returns:
         The number of documents indexed.
     """
-    loader = PyPDFLoader(str(file_path), mode="single")
-    docs = loader.load()
+    report = progress or (lambda phase, **counts: None)
+    settings = get_settings()
+
+    report("parsing", pages_total=count_pages(file_path))
+    chunks = iter_chunks(
+        file_path,
+        workers=settings.ingestion_parse_workers,
+        pages_per_task=settings.ingestion_pages_per_task,
+    )
 
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    texts = text_splitter.split_documents(docs)
+    source = str(file_path)
+    current_ids: Set[str] = set()
 
-    vector_store = _get_vector_store()
-    vector_store.add_documents(texts)
-    return len(texts)
+    def track_pages(docs):
+        last_page = 0
+        for doc in docs:
+            if doc.metadata["page"] != last_page:
+                last_page = doc.metadata["page"]
+                report("parsing", pages_parsed=last_page)
+            doc.id = chunk_id(source, doc.page_content)
+            current_ids.add(doc.id)
+            yield doc
 
+    indexed = get_ingestion_writer(workspace).write(
+        source,
+        track_pages(chunks),
+        fingerprint=file_fingerprint(file_path),
+        progress=report,
+    )
 
-def delete_document_vectors(file_path: Path) -> bool:
-    try:
-        settings = get_settings()
-        pc = Pinecone(api_key=settings.pinecone_api_key)
-        index = pc.Index(settings.pinecone_index_name)
-        source_id = str(file_path)
+    bm25 = get_bm25_index(workspace, create=True)
+    vector_store = _get_vector_store(workspace, create=True)
+    previous = _stored_source_ids(vector_store, source).union(bm25.ids({"source": source}))
+    stale = [doc_id for doc_id in previous if doc_id not in current_ids]
+    if stale:
+        vector_store.delete(ids=stale)
+        bm25.delete(ids=stale)
 
-        index.delete(filter={"source": {"$eq": source_id}})
+    # Any cached answer of this workspace may be stale now, not only those
+    # citing an earlier version of this file: the new chunks may answer
+    # questions that were cached as unanswerable or from other documents.
+    get_answer_cache().clear(workspace)
+    return indexed
+
+
+def delete_document_vectors(file_path: Path, workspace: str = DEFAULT_WORKSPACE) -> bool:
+    """Delete every chunk of `file_path` from the indexes of `workspace`.
+
+    Vectors are deleted by id (serverless Pinecone cannot delete by metadata
+    filter). The BM25 entries and cached answers are dropped even if that fails.
+    """
+    source_id = str(file_path)
+    bm25 = get_bm25_index(workspace)
+    try:
+        vector_store = _get_vector_store(workspace)
+        ids = _stored_source_ids(vector_store, source_id).union(bm25.ids({"source": source_id}))
+        if ids:
+            vector_store.delete(ids=list(ids))
         return True
     except Exception as e:
         print(f"Error deleting vectors for {file_path}: {e}")
         return False
+    finally:
+        bm25.delete(filter={"source": {"$eq": source_id}})
+        get_answer_cache().invalidate_source(source_id, workspace)
+
 
+def delete_all_vectors(workspace: str | None = None) -> bool:
+    """Wipe the index of `workspace`, or of every workspace when None (used on server startup).
 
-def delete_all_vectors() -> bool:
-    """Wipe the entire Pinecone index. Used on server startup."""
+    Wiped workspaces are released from memory and, except the default one,
+    no longer count as existing.
+    """
     try:
         settings = get_settings()
-        pc = Pinecone(api_key=settings.pinecone_api_key)
-        index = pc.Index(settings.pinecone_index_name)
-
-        # This deletes every single vector in the namespace
-        index.delete(delete_all=True)
-        print("Pinecone Index Wiped Successfully.")
+        for name in list_workspaces() if workspace is None else [workspace]:
+            # This deletes every single vector in the workspace's namespace
+            _get_vector_store(name).delete(delete_all=True)
+            get_bm25_index(name).delete(delete_all=True)
+            _vector_stores.evict(name)
+            _bm25_indexes.evict(name)
+            if name != DEFAULT_WORKSPACE:
+                _known_workspaces.discard(name)
+                for base_dir in filter(None, [settings.local_index_dir, settings.bm25_index_dir]):
+                    with contextlib.suppress(OSError):
+                        _workspace_dir(base_dir, name).rmdir()
+        get_answer_cache().clear(workspace)
+        print("Vector Index Wiped Successfully.")
         return True
     except Exception as e:
-        print(f"Error wiping Pinecone index: {e}")
+        print(f"Error wiping vector index: {e}")
         return False
@@ -0,0 +1,323 @@
+"""Hot-path instrumentation for the QA flow.
+
+Three kinds of measurement are taken:
+- wall time per graph node (`qa_node_seconds`),
+- every LLM call: model, input/output tokens and latency (`llm_call_seconds`,
+  `llm_tokens_total`, and `llm_cost_usd_total` when prices are configured),
+- every vector query, split into embedding, search and fusion time
+  (`vector_query_seconds`).
+
+Each measurement feeds process-wide Prometheus histograms and counters,
+rendered by `render_metrics` for `/metrics`. Inside a `request_trace()` scope
+it is also added to that request's `RequestTrace`, whose `breakdown()` can be
+returned with the response. The trace lives in a context variable, so it
+follows the request into asyncio tasks and `asyncio.to_thread`; work handed
+to a thread pool must be run through `contextvars.copy_context()`.
+"""
+
+import bisect
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+
+from .config import get_settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_str(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Prometheus-style histogram with a fixed set of labels."""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # Label values -> (per-bucket counts incl. +Inf, count, sum).
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], int, float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, count, total = self._series.get(key) or ([0] * (len(self.buckets) + 1), 0, 0.0)
+            counts[index] += 1
+            self._series[key] = (counts, count + 1, total + value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: (list(counts), count, total) for key, (counts, count, total) in self._series.items()}
+        for key, (counts, count, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_label_str(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_str(self.labels, key)} {_format_number(total)}")
+            lines.append(f"{self.name}_count{_label_str(self.labels, key)} {count}")
+        return lines
+
+
+class Counter:
+    """Prometheus-style monotonically increasing counter with a fixed set of labels."""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_label_str(self.labels, key)} {_format_number(value)}")
+        return lines
+
+
+QA_REQUEST_SECONDS = Histogram("qa_request_seconds", "Wall time of a QA request.", ("cache_hit",))
+NODE_SECONDS = Histogram("qa_node_seconds", "Wall time per QA graph node.", ("node",))
+LLM_CALL_SECONDS = Histogram("llm_call_seconds", "Latency per LLM call.", ("model", "node"))
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens by direction (input/output).", ("model", "node", "direction"))
+LLM_COST = Counter("llm_cost_usd_total", "Estimated LLM cost in USD from the configured prices.", ("model",))
+VECTOR_SECONDS = Histogram(
+    "vector_query_seconds", "Vector query time by phase (embed, search, fuse).", ("phase",)
+)
+
+_METRICS = (QA_REQUEST_SECONDS, NODE_SECONDS, LLM_CALL_SECONDS, LLM_TOKENS, LLM_COST, VECTOR_SECONDS)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join(line for metric in _METRICS for line in metric.render()) + "\n"
+
+
+class RequestTrace:
+    """Timings collected for one QA request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.nodes: Dict[str, float] = {}
+        self.llm_calls: List[dict] = []
+        self.vector: Dict[str, List[float]] = {}
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def add_node(self, node: str, seconds: float) -> None:
+        with self._lock:
+            self.nodes[node] = self.nodes.get(node, 0.0) + seconds
+
+    def add_llm_call(self, call: dict) -> None:
+        with self._lock:
+            self.llm_calls.append(call)
+
+    def add_vector(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.vector.setdefault(phase, []).append(seconds)
+
+    def breakdown(self) -> dict:
+        """Per-node, per-LLM-call and per-vector-phase timings of the request so far.
+
+        Vector phases sum their operations, so concurrent searches of one
+        multi-query retrieval can add up to more than the retrieval node took.
+        """
+        with self._lock:
+            return {
+                "total_seconds": round(self.elapsed(), 4),
+                "nodes": {node: round(seconds, 4) for node, seconds in self.nodes.items()},
+                "llm_calls": list(self.llm_calls),
+                "vector": {
+                    phase: {"count": len(values), "seconds": round(sum(values), 4)}
+                    for phase, values in self.vector.items()
+                },
+            }
+
+
+_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar("qa_request_trace", default=None)
+_node: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("qa_graph_node", default=None)
+# Holds the LLM callback handler while a trace is active; LangChain attaches
+# it to every run started in that context (see `register_configure_hook`).
+_llm_handler: contextvars.ContextVar[Optional[BaseCallbackHandler]] = contextvars.ContextVar(
+    "qa_llm_handler", default=None
+)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _trace.get()
+
+
+@contextmanager
+def request_trace() -> Iterator[RequestTrace]:
+    """Collect the timings of everything run inside the block into a new trace."""
+    trace = RequestTrace()
+    trace_token = _trace.set(trace)
+    handler_token = _llm_handler.set(_LLM_HANDLER)
+    try:
+        yield trace
+    finally:
+        _llm_handler.reset(handler_token)
+        _trace.reset(trace_token)
+
+
+@contextmanager
+def vector_timer(phase: str) -> Iterator[None]:
+    """Time one vector-query phase ("embed", "search" or "fuse")."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        VECTOR_SECONDS.observe(seconds, phase=phase)
+        trace = _trace.get()
+        if trace is not None:
+            trace.add_vector(phase, seconds)
+
+
+def _record_node(node: str, seconds: float) -> None:
+    NODE_SECONDS.observe(seconds, node=node)
+    trace = _trace.get()
+    if trace is not None:
+        trace.add_node(node, seconds)
+
+
+def timed_node(node: str, func: Callable) -> Callable:
+    """Wrap a sync or async graph node so its wall time is recorded under `node`.
+
+    LLM calls made while the node runs are attributed to it.
+    """
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            token = _node.set(node)
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _record_node(node, time.perf_counter() - started)
+                _node.reset(token)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _node.set(node)
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _record_node(node, time.perf_counter() - started)
+            _node.reset(token)
+
+    return wrapper
+
+
+def _token_usage(response: LLMResult) -> Tuple[int, int]:
+    """Input and output tokens reported by the provider (0 when not reported)."""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+
+class LLMTelemetryHandler(BaseCallbackHandler):
+    """Callback handler timing every chat-model call and counting its tokens."""
+
+    # Run in the caller's thread and context, so the current node is visible.
+    run_inline = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs: Dict[UUID, Tuple[float, str, str, Optional[RequestTrace]]] = {}
+
+    def on_chat_model_start(
+            self,
+            serialized: Dict[str, Any],
+            messages: Any,
+            *,
+            run_id: UUID,
+            metadata: Optional[Dict[str, Any]] = None,
+            **kwargs: Any,
+    ) -> None:
+        metadata = metadata or {}
+        params = kwargs.get("invocation_params") or {}
+        model = metadata.get("ls_model_name") or params.get("model") or params.get("model_name") or "unknown"
+        node = _node.get() or metadata.get("langgraph_node") or "other"
+        with self._lock:
+            self._runs[run_id] = (time.perf_counter(), model, node, _trace.get())
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        started, model, node, trace = run
+        seconds = time.perf_counter() - started
+        input_tokens, output_tokens = _token_usage(response)
+
+        LLM_CALL_SECONDS.observe(seconds, model=model, node=node)
+        LLM_TOKENS.inc(input_tokens, model=model, node=node, direction="input")
+        LLM_TOKENS.inc(output_tokens, model=model, node=node, direction="output")
+
+        call = {
+            "model": model,
+            "node": node,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "seconds": round(seconds, 4),
+        }
+        settings = get_settings()
+        if settings.llm_input_price_per_million or settings.llm_output_price_per_million:
+            cost = (
+                input_tokens * settings.llm_input_price_per_million
+                + output_tokens * settings.llm_output_price_per_million
+            ) / 1_000_000
+            LLM_COST.inc(cost, model=model)
+            call["cost_usd"] = round(cost, 6)
+        if trace is not None:
+            trace.add_llm_call(call)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+
+_LLM_HANDLER = LLMTelemetryHandler()
+register_configure_hook(_llm_handler, inheritable=True)
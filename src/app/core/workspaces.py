@@ -0,0 +1,20 @@
+"""Workspaces: isolated document corpora.
+
+Every indexed document, cached answer and conversation session belongs to
+one workspace, and questions are only answered from the documents of their
+own workspace. Requests that do not name one use `DEFAULT_WORKSPACE`.
+"""
+
+import re
+
+DEFAULT_WORKSPACE = "default"
+
+# Workspace names double as directory and Pinecone namespace names.
+WORKSPACE_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
+
+
+def check_workspace(workspace: str) -> str:
+    """Return `workspace` if it is a valid workspace name, else raise `ValueError`."""
+    if not re.fullmatch(WORKSPACE_PATTERN, workspace):
+        raise ValueError(f"Invalid workspace name: {workspace!r}")
+    return workspace
@@ -1,6 +1,8 @@
-from typing import Optional, List
+from typing import Dict, Optional, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from .core.workspaces import DEFAULT_WORKSPACE, WORKSPACE_PATTERN
 
 
 class QuestionRequest(BaseModel):
@@ -28,16 +30,29 @@ class QAResponse(BaseModel):
 class ConversationalQARequest(BaseModel):
     question: str
     session_id: Optional[str] = None
+    # Documents the question is answered from; a session stays in one workspace.
+    workspace: str = Field(default=DEFAULT_WORKSPACE, pattern=WORKSPACE_PATTERN)
+    # By default only the new turn is returned in `history`.
+    include_history: bool = False
+    # Attach the per-node, LLM-call and vector-query timing breakdown.
+    include_timings: bool = False
 
 
 class ConversationalQAResponse(BaseModel):
     answer: str
     session_id: str
+    workspace: str = DEFAULT_WORKSPACE
     session_title: Optional[str] = None
     history: List[dict]
+    turn_count: int = 0
     conversation_summary: Optional[str] = None
+    prompt_tokens: Dict[str, int] = {}
+    # "full", "targeted" or "skipped"; None when answered from the cache.
+    verification_path: Optional[str] = None
+    timings: Optional[dict] = None
 
 
 class ConversationHistory(BaseModel):
     session_id: str
     history: List[dict]
+    turn_count: int = 0
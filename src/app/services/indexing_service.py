@@ -2,20 +2,20 @@
 
 from pathlib import Path
 
-from langchain_community.document_loaders import PyPDFLoader
-
 from ..core.retrieval.vector_store import index_documents
+from ..core.workspaces import DEFAULT_WORKSPACE
 
 
-def index_pdf_file(file_path: Path) -> int:
+def index_pdf_file(file_path: Path, workspace: str = DEFAULT_WORKSPACE) -> int:
     """Load a PDF from disk and index it into the vector DB.
 
     Args:
         file_path: Path to the PDF file on disk.
+        workspace: Workspace the document is added to.
 
     Returns:
         Number of document chunks indexed.
     """
     # loader = PyPDFLoader(str(file_path))
     # docs = loader.load()
-    return index_documents(file_path)
+    return index_documents(file_path, workspace=workspace)
@@ -0,0 +1,138 @@
+"""Background ingestion jobs for uploaded PDFs.
+
+`/index-pdf` hands uploads to an `IngestionJobManager`, which indexes them on
+a bounded thread pool and records per-job progress for `/jobs/{id}`. At most
+`ingestion_max_workers` documents are indexed at once and at most
+`ingestion_max_pending` more may wait, so a burst of uploads cannot exhaust
+memory or embedding rate limits.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict
+
+from ..core.config import get_settings
+from ..core.retrieval.vector_store import index_documents
+from ..core.workspaces import DEFAULT_WORKSPACE
+
+# Finished jobs kept around for polling before the oldest are forgotten.
+_MAX_FINISHED_JOBS = 200
+
+
+class IngestionQueueFullError(RuntimeError):
+    """Raised when every worker is busy and the pending queue is full."""
+
+
+@dataclass
+class IngestionJob:
+    id: str
+    filename: str
+    workspace: str = DEFAULT_WORKSPACE
+    status: str = "queued"  # queued | running | succeeded | failed
+    phase: str | None = None  # parsing | splitting | embedding | upserting
+    pages_total: int = 0
+    pages_parsed: int = 0
+    chunks_total: int = 0
+    chunks_embedded: int = 0
+    chunks_upserted: int = 0
+    chunks_skipped: int = 0
+    chunks_unchanged: int = 0
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    def update(self, phase: str, **counts: int) -> None:
+        self.phase = phase
+        for name, value in counts.items():
+            setattr(self, name, value)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        data["elapsed_seconds"] = round(elapsed, 3)
+        data["chunks_per_second"] = round(self.chunks_upserted / elapsed, 2) if elapsed else 0.0
+        return data
+
+
+class IngestionJobManager:
+    """Runs `index_documents` on a bounded worker pool and tracks progress."""
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._jobs: Dict[str, IngestionJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+            self,
+            file_path: Path,
+            workspace: str = DEFAULT_WORKSPACE,
+            save: Callable[[], None] | None = None,
+    ) -> IngestionJob:
+        """Queue `file_path` for indexing into `workspace` and return its job immediately.
+
+        `save`, if given, writes the file once a queue slot is reserved, so a
+        full queue rejects an upload before anything is written to disk.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise IngestionQueueFullError("Too many documents are being indexed; try again shortly.")
+        if save is not None:
+            try:
+                save()
+            except BaseException:
+                self._slots.release()
+                raise
+
+        job = IngestionJob(id=str(uuid.uuid4()), filename=file_path.name, workspace=workspace)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, file_path)
+        return job
+
+    def get(self, job_id: str) -> IngestionJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: IngestionJob, file_path: Path) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.chunks_total = index_documents(file_path, progress=job.update, workspace=job.workspace)
+            job.status = "succeeded"
+        except Exception as e:
+            print(f"Indexing failed for {file_path}: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            self._slots.release()
+
+    def _prune(self) -> None:
+        finished = [job for job in self._jobs.values() if job.finished_at]
+        for job in sorted(finished, key=lambda j: j.finished_at)[:-_MAX_FINISHED_JOBS]:
+            del self._jobs[job.id]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_job_manager: IngestionJobManager | None = None
+
+
+def get_ingestion_jobs() -> IngestionJobManager:
+    """Get the process-wide ingestion job manager (singleton pattern)."""
+    global _job_manager
+    if _job_manager is None:
+        settings = get_settings()
+        _job_manager = IngestionJobManager(
+            max_workers=settings.ingestion_max_workers,
+            max_pending=settings.ingestion_max_pending,
+        )
+    return _job_manager
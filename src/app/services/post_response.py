@@ -0,0 +1,72 @@
+"""Post-response work for conversation sessions.
+
+Title generation and memory summarization do not affect the answer a user is
+waiting for, so the QA endpoints hand them to a `PostResponseScheduler` and
+return immediately. The scheduler runs at most `max_concurrency` tasks at
+once, runs each kind of task at most once per session at a time, and logs
+failures instead of letting them propagate. Clients see the results on the
+session (`/sessions/{id}`) once they land; `pending` lists the work still
+in flight.
+"""
+
+import asyncio
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from ..core.config import get_settings
+
+# Seconds `shutdown` waits for in-flight tasks before cancelling them.
+_SHUTDOWN_GRACE_SECONDS = 10.0
+
+
+class PostResponseScheduler:
+    """Bounded, error-isolated runner for per-session background tasks."""
+
+    def __init__(self, max_concurrency: int):
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    def schedule(self, session_id: str, kind: str, work: Callable[[], Awaitable[None]]) -> bool:
+        """Run `work()` in the background as the `kind` task of `session_id`.
+
+        Returns False without scheduling if that task is already pending;
+        tasks read the session when they start, and the next turn schedules
+        another one if there is more to do.
+        """
+        key = (session_id, kind)
+        if key in self._tasks:
+            return False
+
+        task = asyncio.get_running_loop().create_task(self._run(key, work))
+        self._tasks[key] = task
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return True
+
+    async def _run(self, key: Tuple[str, str], work: Callable[[], Awaitable[None]]) -> None:
+        async with self._slots:
+            try:
+                await work()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Post-response task {key[1]} failed for session {key[0]}: {e}")
+
+    def pending(self, session_id: str) -> List[str]:
+        """Kinds of task still queued or running for `session_id`."""
+        return sorted(kind for sid, kind in self._tasks if sid == session_id)
+
+    async def shutdown(self) -> None:
+        """Give in-flight tasks a grace period to finish, then cancel the rest."""
+        tasks = list(self._tasks.values())
+        if not tasks:
+            return
+        _, still_running = await asyncio.wait(tasks, timeout=_SHUTDOWN_GRACE_SECONDS)
+        for task in still_running:
+            task.cancel()
+        await asyncio.gather(*still_running, return_exceptions=True)
+
+
+@lru_cache(maxsize=1)
+def get_post_response_scheduler() -> PostResponseScheduler:
+    """Get the post-response scheduler instance (singleton via LRU cache)."""
+    return PostResponseScheduler(get_settings().post_response_max_concurrency)
@@ -0,0 +1,446 @@
+"""Conversation session storage.
+
+Sessions are plain dicts with `title`, `workspace`, `history` (list of turn
+dicts), `conversation_summary`, `summarized_turns` and `last_updated`. Two backends
+implement the same `SessionStore` interface:
+
+- `InMemorySessionStore`: a per-process LRU with idle expiry, so memory stays
+  bounded. Only suitable for a single worker.
+- `SQLiteSessionStore`: a durable WAL-mode database that any number of
+  workers on the host can share. Turns are stored as rows and only new turns
+  are written on save.
+
+`SessionStore.lock` serializes turns on one session. The SQLite backend also
+holds a lease row for the duration, so the lock spans worker processes.
+
+Both backends keep sessions ordered by `(last_updated, id)` as they are
+written, so a page of `list_sessions` costs the same at any session count.
+"""
+
+import asyncio
+import base64
+import bisect
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Tuple
+from weakref import WeakValueDictionary
+
+from ..core.config import get_settings
+from ..core.workspaces import DEFAULT_WORKSPACE
+
+# How long a cross-process session lease lasts if its holder dies, and how
+# often a waiting worker retries it.
+_LEASE_SECONDS = 300.0
+_LEASE_POLL_SECONDS = 0.05
+
+# Position in the `(last_updated, id)` ordering of sessions.
+SessionKey = Tuple[str, str]
+
+
+def new_session(timestamp: str, workspace: str = DEFAULT_WORKSPACE) -> Dict[str, Any]:
+    """An empty session in `workspace` created at `timestamp`."""
+    return {
+        "title": "New Chat",
+        "workspace": workspace,
+        "history": [],
+        "conversation_summary": None,
+        "summarized_turns": 0,
+        "last_updated": timestamp,
+    }
+
+
+def _copy(session: Dict[str, Any]) -> Dict[str, Any]:
+    return {**session, "history": list(session.get("history") or [])}
+
+
+def _meta(session: Dict[str, Any]) -> Dict[str, Any]:
+    meta = {key: value for key, value in session.items() if key != "history"}
+    meta["turn_count"] = len(session.get("history") or [])
+    return meta
+
+
+def encode_cursor(key: SessionKey) -> str:
+    """Opaque pagination cursor for the session at `key`."""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> SessionKey:
+    """Inverse of `encode_cursor`; raises ValueError for malformed cursors."""
+    try:
+        last_updated, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    return str(last_updated), str(session_id)
+
+
+class SessionStore(ABC):
+    """Storage for conversation sessions, keyed by session id."""
+
+    def __init__(self):
+        self._locks: WeakValueDictionary[str, asyncio.Lock] = WeakValueDictionary()
+
+    @abstractmethod
+    def get(self, session_id: str) -> Dict[str, Any] | None:
+        """Return a copy of the session, or None if it does not exist."""
+
+    @abstractmethod
+    def get_meta(self, session_id: str) -> Dict[str, Any] | None:
+        """Like `get`, but with `turn_count` in place of the history."""
+
+    @abstractmethod
+    def get_turns(
+            self, session_id: str, since_turn: int = 0, limit: int | None = None
+    ) -> List[Dict[str, Any]] | None:
+        """Up to `limit` turns numbered after `since_turn`, or None if the session does not exist."""
+
+    @abstractmethod
+    def save(self, session_id: str, session: Dict[str, Any]) -> None:
+        """Create or replace the session."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        """Delete the session; returns False if it did not exist."""
+
+    @abstractmethod
+    def list_sessions(
+            self, limit: int, after: SessionKey | None = None
+    ) -> Tuple[List[Dict[str, Any]], SessionKey | None]:
+        """One page of sessions, most recently updated first.
+
+        Returns `id`, `title` and `last_updated` of up to `limit` sessions
+        ordered after the `after` key, plus the key to continue from (None on
+        the last page).
+        """
+
+    @asynccontextmanager
+    async def lock(self, session_id: str) -> AsyncIterator[None]:
+        """Hold exclusive access to `session_id` for one read-modify-write turn."""
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[session_id] = lock
+
+        async with lock:
+            async with self._shared_lock(session_id):
+                yield
+
+    @asynccontextmanager
+    async def _shared_lock(self, session_id: str) -> AsyncIterator[None]:
+        """Cross-process part of `lock`; backends shared by workers override it."""
+        yield
+
+
+class InMemorySessionStore(SessionStore):
+    """Per-process LRU of sessions that also forgets sessions idle for `ttl_seconds`."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._sessions: OrderedDict[str, tuple[float, Dict[str, Any]]] = OrderedDict()
+        # Session keys sorted ascending, maintained on every write.
+        self._order: List[SessionKey] = []
+        self._mutex = threading.Lock()
+
+    @staticmethod
+    def _key(session_id: str, session: Dict[str, Any]) -> SessionKey:
+        return session.get("last_updated") or "", session_id
+
+    def _remove(self, session_id: str) -> bool:
+        entry = self._sessions.pop(session_id, None)
+        if entry is None:
+            return False
+        key = self._key(session_id, entry[1])
+        position = bisect.bisect_left(self._order, key)
+        if position < len(self._order) and self._order[position] == key:
+            del self._order[position]
+        return True
+
+    def _purge_expired(self, now: float) -> None:
+        while self._sessions:
+            session_id, (touched, _) = next(iter(self._sessions.items()))
+            if now - touched <= self.ttl_seconds:
+                break
+            self._remove(session_id)
+
+    def _touch(self, session_id: str, now: float) -> Dict[str, Any] | None:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        self._sessions[session_id] = (now, entry[1])
+        self._sessions.move_to_end(session_id)
+        return entry[1]
+
+    def get(self, session_id: str) -> Dict[str, Any] | None:
+        now = time.monotonic()
+        with self._mutex:
+            self._purge_expired(now)
+            session = self._touch(session_id, now)
+            return _copy(session) if session is not None else None
+
+    def get_meta(self, session_id: str) -> Dict[str, Any] | None:
+        now = time.monotonic()
+        with self._mutex:
+            self._purge_expired(now)
+            session = self._touch(session_id, now)
+            return _meta(session) if session is not None else None
+
+    def get_turns(
+            self, session_id: str, since_turn: int = 0, limit: int | None = None
+    ) -> List[Dict[str, Any]] | None:
+        now = time.monotonic()
+        with self._mutex:
+            self._purge_expired(now)
+            session = self._touch(session_id, now)
+            if session is None:
+                return None
+            end = None if limit is None else since_turn + limit
+            return session["history"][since_turn:end]
+
+    def save(self, session_id: str, session: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        with self._mutex:
+            self._remove(session_id)
+            self._sessions[session_id] = (now, _copy(session))
+            bisect.insort(self._order, self._key(session_id, session))
+            while len(self._sessions) > self.max_entries:
+                self._remove(next(iter(self._sessions)))
+
+    def delete(self, session_id: str) -> bool:
+        with self._mutex:
+            return self._remove(session_id)
+
+    def list_sessions(
+            self, limit: int, after: SessionKey | None = None
+    ) -> Tuple[List[Dict[str, Any]], SessionKey | None]:
+        with self._mutex:
+            self._purge_expired(time.monotonic())
+            end = len(self._order) if after is None else bisect.bisect_left(self._order, after)
+            start = max(0, end - limit)
+            keys = self._order[start:end][::-1]
+            sessions = [
+                {"id": session_id, "title": self._sessions[session_id][1].get("title"), "last_updated": last_updated}
+                for last_updated, session_id in keys
+            ]
+        return sessions, (keys[-1] if start > 0 and keys else None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Durable session store in a WAL-mode SQLite database."""
+
+    def __init__(self, path: Path):
+        super().__init__()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._mutex = threading.Lock()
+        self._owner = uuid.uuid4().hex
+
+        with self._mutex:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    title TEXT,
+                    conversation_summary TEXT,
+                    summarized_turns INTEGER NOT NULL DEFAULT 0,
+                    last_updated TEXT
+                );
+                CREATE INDEX IF NOT EXISTS sessions_last_updated ON sessions (last_updated, id);
+                CREATE TABLE IF NOT EXISTS turns (
+                    session_id TEXT NOT NULL,
+                    turn INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (session_id, turn)
+                );
+                CREATE TABLE IF NOT EXISTS session_locks (
+                    session_id TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+                """
+            )
+            # Databases created before workspaces existed lack the column.
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+            if "workspace" not in columns:
+                self._conn.execute(
+                    f"ALTER TABLE sessions ADD COLUMN workspace TEXT NOT NULL DEFAULT '{DEFAULT_WORKSPACE}'"
+                )
+
+    def get(self, session_id: str) -> Dict[str, Any] | None:
+        with self._mutex:
+            row = self._conn.execute(
+                "SELECT title, conversation_summary, summarized_turns, last_updated, workspace"
+                " FROM sessions WHERE id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            turns = self._conn.execute(
+                "SELECT data FROM turns WHERE session_id = ? ORDER BY turn", (session_id,)
+            ).fetchall()
+
+        return {
+            "title": row[0],
+            "workspace": row[4],
+            "history": [json.loads(data) for (data,) in turns],
+            "conversation_summary": row[1],
+            "summarized_turns": row[2],
+            "last_updated": row[3],
+        }
+
+    def get_meta(self, session_id: str) -> Dict[str, Any] | None:
+        with self._mutex:
+            row = self._conn.execute(
+                """
+                SELECT title, conversation_summary, summarized_turns, last_updated,
+                       (SELECT COUNT(*) FROM turns WHERE session_id = sessions.id), workspace
+                FROM sessions WHERE id = ?
+                """,
+                (session_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "title": row[0],
+            "workspace": row[5],
+            "conversation_summary": row[1],
+            "summarized_turns": row[2],
+            "last_updated": row[3],
+            "turn_count": row[4],
+        }
+
+    def get_turns(
+            self, session_id: str, since_turn: int = 0, limit: int | None = None
+    ) -> List[Dict[str, Any]] | None:
+        with self._mutex:
+            exists = self._conn.execute("SELECT 1 FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if exists is None:
+                return None
+            turns = self._conn.execute(
+                "SELECT data FROM turns WHERE session_id = ? AND turn > ? ORDER BY turn LIMIT ?",
+                (session_id, since_turn, -1 if limit is None else limit),
+            ).fetchall()
+        return [json.loads(data) for (data,) in turns]
+
+    def save(self, session_id: str, session: Dict[str, Any]) -> None:
+        history = session.get("history") or []
+        with self._mutex:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    """
+                    INSERT INTO sessions (id, title, conversation_summary, summarized_turns, last_updated, workspace)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (id) DO UPDATE SET
+                        title = excluded.title,
+                        conversation_summary = excluded.conversation_summary,
+                        summarized_turns = excluded.summarized_turns,
+                        last_updated = excluded.last_updated
+                    """,
+                    (
+                        session_id,
+                        session.get("title"),
+                        session.get("conversation_summary"),
+                        session.get("summarized_turns", 0),
+                        session.get("last_updated") or "",
+                        session.get("workspace") or DEFAULT_WORKSPACE,
+                    ),
+                )
+                # History is append-only, so only turns past the stored ones are new.
+                (stored,) = self._conn.execute(
+                    "SELECT COUNT(*) FROM turns WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO turns (session_id, turn, data) VALUES (?, ?, ?)",
+                    [
+                        (session_id, position, json.dumps(turn))
+                        for position, turn in enumerate(history[stored:], start=stored + 1)
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, session_id: str) -> bool:
+        with self._mutex:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                deleted = self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount
+                self._conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return deleted > 0
+
+    def list_sessions(
+            self, limit: int, after: SessionKey | None = None
+    ) -> Tuple[List[Dict[str, Any]], SessionKey | None]:
+        # One extra row tells whether another page follows.
+        query = "SELECT id, title, last_updated FROM sessions"
+        params: tuple = ()
+        if after is not None:
+            query += " WHERE (last_updated, id) < (?, ?)"
+            params = after
+        query += " ORDER BY last_updated DESC, id DESC LIMIT ?"
+
+        with self._mutex:
+            rows = self._conn.execute(query, (*params, limit + 1)).fetchall()
+
+        sessions = [{"id": row[0], "title": row[1], "last_updated": row[2]} for row in rows[:limit]]
+        next_key = (rows[limit - 1][2], rows[limit - 1][0]) if len(rows) > limit else None
+        return sessions, next_key
+
+    def _try_lease(self, session_id: str) -> bool:
+        now = time.time()
+        with self._mutex:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM session_locks WHERE session_id = ? AND expires_at < ?", (session_id, now)
+                )
+                acquired = self._conn.execute(
+                    "INSERT OR IGNORE INTO session_locks (session_id, owner, expires_at) VALUES (?, ?, ?)",
+                    (session_id, self._owner, now + _LEASE_SECONDS),
+                ).rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return acquired > 0
+
+    def _release_lease(self, session_id: str) -> None:
+        with self._mutex:
+            self._conn.execute(
+                "DELETE FROM session_locks WHERE session_id = ? AND owner = ?", (session_id, self._owner)
+            )
+
+    @asynccontextmanager
+    async def _shared_lock(self, session_id: str) -> AsyncIterator[None]:
+        while not self._try_lease(session_id):
+            await asyncio.sleep(_LEASE_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            self._release_lease(session_id)
+
+
+@lru_cache(maxsize=1)
+def get_session_store() -> SessionStore:
+    """Get the configured session store (singleton via LRU cache)."""
+    settings = get_settings()
+    if settings.session_store_backend == "sqlite":
+        return SQLiteSessionStore(Path(settings.session_db_path))
+    return InMemorySessionStore(settings.session_max_entries, settings.session_ttl_seconds)
@@ -1,9 +1,18 @@
+import json
+import time
 from datetime import datetime
 
 import requests
 import streamlit as st
 
 API_URL = "http://localhost:8000"
+SESSIONS_PAGE_SIZE = 30
+
+NODE_LABELS = {
+    "retrieval": "Searching documents...",
+    "summarization": "Drafting answer...",
+    "verification": "Verifying answer...",
+}
 
 st.set_page_config(
     page_title="IKMS Multi Agent RAG",
@@ -167,6 +176,12 @@ if "uploader_key" not in st.session_state:
     st.session_state.uploader_key = 0
 if "pending_delete_id" not in st.session_state:
     st.session_state.pending_delete_id = None
+if "sessions_limit" not in st.session_state:
+    st.session_state.sessions_limit = SESSIONS_PAGE_SIZE
+if "sessions_has_more" not in st.session_state:
+    st.session_state.sessions_has_more = False
+if "chunk_text" not in st.session_state:
+    st.session_state.chunk_text = {}
 
 
 def fetch_documents():
@@ -193,12 +208,52 @@ def delete_document_api(filename):
         st.error(f"Error: {e}")
 
 
+def wait_for_index_job(job_id, status, poll_interval=0.5):
+    """Poll an ingestion job until it finishes, mirroring progress into `status`."""
+    while True:
+        job = requests.get(f"{API_URL}/jobs/{job_id}").json()
+        if job.get("status") in ("succeeded", "failed"):
+            return job
+        if job.get("phase"):
+            done = job.get("chunks_upserted", 0) + job.get("chunks_skipped", 0) + job.get("chunks_unchanged", 0)
+            status.update(label=f"{job['phase'].capitalize()}... "
+                                f"({done}/{job.get('chunks_total', 0)} chunks)")
+        time.sleep(poll_interval)
+
+
+def wait_for_session_title(session_id, timeout=5.0, poll_interval=0.5):
+    """Poll a new session until its title has been generated; None on timeout."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = requests.get(f"{API_URL}/sessions/{session_id}", params={"include_history": False})
+            if response.status_code == 200 and "title" not in response.json().get("pending", []):
+                return response.json().get("title")
+        except Exception:
+            return None
+        time.sleep(poll_interval)
+    return None
+
+
 def fetch_chat_sessions():
     try:
-        response = requests.get(f"{API_URL}/sessions")
+        sessions_list = []
+        cursor = None
+        while len(sessions_list) < st.session_state.sessions_limit:
+            params = {"limit": SESSIONS_PAGE_SIZE}
+            if cursor:
+                params["after"] = cursor
+            response = requests.get(f"{API_URL}/sessions", params=params)
+            if response.status_code != 200:
+                break
+            sessions_list.extend(response.json().get("sessions", []))
+            cursor = response.json().get("next_cursor")
+            if not cursor:
+                break
+        st.session_state.sessions_has_more = cursor is not None
+
         if response.status_code == 200:
-            sessions_list = response.json().get("sessions", [])
-            current_ids = set()
+            current_ids = {st.session_state.active_session_id}
             for s in sessions_list:
                 s_id = s["id"]
                 current_ids.add(s_id)
@@ -222,20 +277,51 @@ def fetch_chat_sessions():
         pass
 
 
+def merge_history(session_id, turns):
+    """Merge server turns into the local copy of a session's history, by turn number."""
+    history = st.session_state.chat_sessions[session_id]["history"]
+    known = {turn.get("turn") for turn in history}
+    history.extend(turn for turn in turns if turn.get("turn") not in known)
+    history.sort(key=lambda turn: turn.get("turn", 0))
+
+
 def fetch_session_history(session_id):
+    """Fetch only the turns missing from the local copy of a session."""
     try:
-        response = requests.get(f"{API_URL}/sessions/{session_id}")
+        if session_id not in st.session_state.chat_sessions:
+            return False
+        local_turns = len(st.session_state.chat_sessions[session_id]["history"])
+        response = requests.get(f"{API_URL}/sessions/{session_id}", params={"since_turn": local_turns})
         if response.status_code == 200:
             data = response.json()
-            if session_id in st.session_state.chat_sessions:
-                st.session_state.chat_sessions[session_id]["history"] = data.get("history", [])
-                st.session_state.chat_sessions[session_id]["summary"] = data.get("conversation_summary")
-                return True
+            merge_history(session_id, data.get("history", []))
+            st.session_state.chat_sessions[session_id]["summary"] = data.get("conversation_summary")
+            return True
     except Exception:
         return False
     return False
 
 
+def fetch_chunk_text(chunk_ids):
+    """Fetch the text of cited chunks not fetched yet; turns only store chunk ids."""
+    missing = [chunk_id for chunk_id in chunk_ids if chunk_id not in st.session_state.chunk_text]
+    if not missing:
+        return
+    try:
+        response = requests.get(f"{API_URL}/chunks", params={"ids": missing})
+        if response.status_code == 200:
+            for chunk in response.json().get("chunks", []):
+                st.session_state.chunk_text[chunk["id"]] = chunk["text"]
+    except Exception:
+        pass
+
+
+def format_citation(chunk):
+    page = chunk.get("page")
+    source = chunk.get("source") or "Unknown source"
+    return f"{source} (page {page})" if page is not None else source
+
+
 def delete_chat_session_api(session_id):
     try:
         response = requests.delete(f"{API_URL}/sessions/{session_id}")
@@ -256,6 +342,19 @@ def delete_chat_session_api(session_id):
         st.error(f"Error: {e}")
 
 
+def stream_conversation(payload):
+    """Yield `(event, data)` pairs from the SSE conversational endpoint."""
+    with requests.post(f"{API_URL}/qa/conversation/stream", json=payload, stream=True) as response:
+        response.raise_for_status()
+        event = None
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:") and event:
+                yield event, json.loads(line[len("data:"):].strip())
+                event = None
+
+
 def start_new_chat():
     st.session_state.active_session_id = None
 
@@ -350,12 +449,17 @@ with st.sidebar:
                         files = {"file": (uploaded_file.name, uploaded_file, "application/pdf")}
                         status.write("Uploading...")
                         response = requests.post(f"{API_URL}/index-pdf", files=files)
-                        if response.status_code == 200:
-                            status.update(label="Indexed!", state="complete", expanded=False)
-                            st.toast(f"Indexed {uploaded_file.name}", icon="✅")
-                            st.session_state.uploader_key += 1
-                            fetch_documents()
-                            st.rerun()
+                        if response.status_code == 202:
+                            job = wait_for_index_job(response.json()["job_id"], status)
+                            if job.get("status") == "succeeded":
+                                status.update(label="Indexed!", state="complete", expanded=False)
+                                st.toast(f"Indexed {uploaded_file.name}", icon="✅")
+                                st.session_state.uploader_key += 1
+                                fetch_documents()
+                                st.rerun()
+                            else:
+                                status.update(label="Failed", state="error")
+                                st.error(f"Error: {job.get('error', 'Indexing failed')}")
                         else:
                             status.update(label="Failed", state="error")
                             st.error(f"Error: {response.text}")
@@ -412,6 +516,11 @@ with st.sidebar:
 
         st.markdown(html_content, unsafe_allow_html=True)
 
+    if st.session_state.sessions_has_more:
+        if st.button("Show more", use_container_width=True, type="tertiary"):
+            st.session_state.sessions_limit += SESSIONS_PAGE_SIZE
+            st.rerun()
+
 if not st.session_state.documents:
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
@@ -457,7 +566,7 @@ for i, turn in enumerate(current_history):
     with st.chat_message("assistant"):
         st.markdown(turn["answer"])
 
-        if turn.get("used_history") or turn.get("context_used"):
+        if turn.get("used_history") or turn.get("context_used") or turn.get("chunks"):
             if turn.get("used_history"):
                 st.markdown(
                     """
@@ -469,7 +578,16 @@ for i, turn in enumerate(current_history):
                 )
 
             with st.expander("View Retrieval Context"):
-                if turn.get("context_used"):
+                if turn.get("chunks"):
+                    st.markdown("**Retrieved Document Chunks:**")
+                    chunk_ids = [chunk["id"] for chunk in turn["chunks"] if chunk.get("id")]
+                    if st.button("Show chunk text", key=f"chunk_text_{i}"):
+                        fetch_chunk_text(chunk_ids)
+                    for n, chunk in enumerate(turn["chunks"], start=1):
+                        st.markdown(f"{n}. {format_citation(chunk)}")
+                        if chunk.get("id") in st.session_state.chunk_text:
+                            st.code(st.session_state.chunk_text[chunk["id"]], language="text")
+                elif turn.get("context_used"):
                     st.markdown("**Retrieved Document Chunks:**")
                     st.code(turn["context_used"], language="text")
                 else:
@@ -491,48 +609,70 @@ if st.session_state.active_session_id:
                 st.info(sess["summary"])
             else:
                 st.markdown("### No Summary Yet")
-                st.caption("A summary will be generated after 3 human messages.")
+                st.caption("Older turns are summarized here once the conversation grows long.")
 
 if prompt := st.chat_input("Ask a question..."):
     with st.chat_message("user"):
         st.markdown(prompt)
 
     with st.chat_message("assistant"):
-        with st.status("Thinking...", expanded=True) as status:
-            try:
-                payload = {
-                    "question": prompt,
-                    "session_id": st.session_state.active_session_id
+        status = st.status("Thinking...", expanded=True)
+        answer_placeholder = st.empty()
+        try:
+            payload = {
+                "question": prompt,
+                "session_id": st.session_state.active_session_id
+            }
+
+            streamed_answer = ""
+            data = None
+            for event, body in stream_conversation(payload):
+                if event == "node":
+                    status.write(NODE_LABELS.get(body["node"], body["node"]))
+                elif event == "token":
+                    streamed_answer += body["content"]
+                    answer_placeholder.markdown(streamed_answer + "▌")
+                elif event == "done":
+                    data = body
+                elif event == "error":
+                    raise RuntimeError(body.get("detail", "Streaming failed"))
+
+            if data is None:
+                raise RuntimeError("Stream ended before the answer was saved")
+
+            status.update(label="Response generated", state="complete", expanded=False)
+            answer_placeholder.markdown(data["answer"])
+
+            new_session_id = data["session_id"]
+            st.session_state.active_session_id = new_session_id
+
+            if new_session_id not in st.session_state.chat_sessions:
+                st.session_state.chat_sessions[new_session_id] = {
+                    "history": [],
+                    "title": data.get("session_title", "New Chat"),
+                    "summary": None,
+                    "last_updated": ""
                 }
 
-                status.write("Generating Response...")
-                response = requests.post(f"{API_URL}/qa/conversation", json=payload)
-                response.raise_for_status()
-
-                data = response.json()
-                status.update(label="Response generated", state="complete", expanded=False)
+            # The response carries only the new turn; fill any gap left by
+            # turns added from elsewhere before merging it.
+            if len(st.session_state.chat_sessions[new_session_id]["history"]) + len(data["history"]) < data["turn_count"]:
+                fetch_session_history(new_session_id)
+            merge_history(new_session_id, data["history"])
+            st.session_state.chat_sessions[new_session_id]["summary"] = data.get("conversation_summary")
+            st.session_state.chat_sessions[new_session_id]["title"] = data.get("session_title", "New Chat")
+            if data["turn_count"] == 1:
+                # Titles are generated after the answer is returned.
+                title = wait_for_session_title(new_session_id)
+                if title:
+                    st.session_state.chat_sessions[new_session_id]["title"] = title
+
+            if data["history"]:
+                st.session_state.chat_sessions[new_session_id]["last_updated"] = data["history"][-1].get(
+                    "timestamp", "")
 
-                new_session_id = data["session_id"]
-                st.session_state.active_session_id = new_session_id
-
-                if new_session_id not in st.session_state.chat_sessions:
-                    st.session_state.chat_sessions[new_session_id] = {
-                        "history": [],
-                        "title": data.get("session_title", "New Chat"),
-                        "summary": None,
-                        "last_updated": ""
-                    }
-
-                st.session_state.chat_sessions[new_session_id]["history"] = data["history"]
-                st.session_state.chat_sessions[new_session_id]["summary"] = data.get("conversation_summary")
-                st.session_state.chat_sessions[new_session_id]["title"] = data.get("session_title", "New Chat")
-
-                if data["history"]:
-                    st.session_state.chat_sessions[new_session_id]["last_updated"] = data["history"][-1].get(
-                        "timestamp", "")
-
-                st.rerun()
+            st.rerun()
 
-            except Exception as e:
-                status.update(label="Error", state="error")
-                st.error(f"Connection Error: {str(e)}")
+        except Exception as e:
+            status.update(label="Error", state="error")
+            st.error(f"Connection Error: {str(e)}")